@@ -0,0 +1,85 @@
+"""Micro-benchmark for LanguageAnalyzer per-file parse plus extraction time.
+
+Usage: python benchmarks/bench_analyzer.py [--language py|js] [--size N] [--repeat N]
+
+The JavaScript case needs tree-sitter and its JavaScript grammar installed.
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from projectscanner.language_analyzer import LanguageAnalyzer  # noqa: E402
+
+
+def synthetic_module(num_classes: int) -> str:
+    parts = ["import os\n\n"]
+    for i in range(num_classes):
+        parts.append(
+            f"class Service{i}(base.Handler):\n"
+            f'    """Service {i}."""\n'
+            f"    def __init__(self):\n"
+            f"        self.items = []\n"
+            f"    def run(self, data):\n"
+            f"        for item in data:\n"
+            f"            if item:\n"
+            f"                try:\n"
+            f"                    self.items.append(item)\n"
+            f"                except ValueError:\n"
+            f"                    pass\n"
+            f"        while self.items:\n"
+            f"            self.items.pop()\n\n"
+            f"@app.route('/svc/{i}', methods=['GET', 'POST'])\n"
+            f"def handler_{i}():\n"
+            f"    return Service{i}().run([1, 2, 3])\n\n"
+        )
+    return "".join(parts)
+
+
+def synthetic_bundle(num_modules: int) -> str:
+    """Webpack-style bundle with long member-call chains and nested closures."""
+    parts = ["(function(modules){var cache={};"]
+    for i in range(num_modules):
+        parts.append(
+            f"modules[{i}]=function(module,exports,require){{"
+            f"function helper{i}(t){{return t.map(function(n){{return n+{i}}})"
+            f".filter(function(n){{return n%2}}).reduce(function(a,b){{return a+b}},0)}}"
+            f"class Widget{i}{{render(){{return helper{i}([1,2,3])}}}}"
+            f"const handler{i}=(req,res)=>res.send(helper{i}(req.body));"
+            f"app.get('/widgets/{i}',handler{i});"
+            f"module.exports={{Widget{i}:Widget{i}}};}};"
+        )
+    parts.append("})([]);\n")
+    return "".join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--language", choices=["py", "js"], default="py")
+    parser.add_argument("--size", type=int, default=500, help="Classes or bundle modules to generate.")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.language == "py":
+        source = synthetic_module(args.size)
+    else:
+        source = synthetic_bundle(args.size)
+    file_path = Path(f"bench.{args.language}")
+    analyzer = LanguageAnalyzer()
+    analyzer.analyze_file(file_path, source)
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        analyzer.analyze_file(file_path, source)
+        timings.append(time.perf_counter() - start)
+    print(
+        f"{file_path.name} {len(source) // 1024} KiB: median {statistics.median(timings) * 1000:.2f} ms, "
+        f"min {min(timings) * 1000:.2f} ms over {args.repeat} runs"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Peak memory of scan_project on a generated synthetic repository.
+
+Usage: python benchmarks/bench_memory.py [--files N] [--mix py=6,js=3,rs=1] [--stream] [--output results.json]
+
+One tree is generated (see bench_scan.py), then a cold scan (no caches) and a
+warm scan (everything served from the caches) each run in a fresh
+interpreter. Both report the peak RSS of the whole process, which includes
+the parsers and the report write, and the deep size of ``scanner.analysis``.
+The deep size counts each shared object once, so interned strings and shared
+empty containers count once too. ``--stream`` scans as ``--stream-report``
+does and reports the deep size of the result cache instead.
+"""
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_scan import generate_project, git_commit, parse_mix  # noqa: E402
+
+SCENARIOS = ("cold", "warm")
+# Generated names made unique per file: (text, replacement template).
+RENAMES = (
+    ("Service", "Service{}_"),
+    ("handler_", "handler{}_"),
+    ("/svc/", "/svc{}/"),
+    ("Item", "Item{}_"),
+    ("helper_", "helper{}_"),
+)
+
+
+def deep_size(root) -> int:
+    """Bytes held by ``root`` and everything it references, each object counted once."""
+    seen = set()
+    todo = [root]
+    total = 0
+    while todo:
+        obj = todo.pop()
+        if id(obj) in seen or obj is None or isinstance(obj, (bool, int, float)) and -5 <= obj <= 256:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            todo.extend(obj.keys())
+            todo.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            todo.extend(obj)
+        else:
+            slots = [name for cls in type(obj).__mro__ for name in getattr(cls, "__slots__", ())]
+            todo.extend(getattr(obj, name) for name in slots if hasattr(obj, name))
+            if hasattr(obj, "__dict__"):
+                todo.append(obj.__dict__)
+    return total
+
+
+def make_unique(paths):
+    """Give every file its own class, function and route names.
+
+    Generated files with the same item count are otherwise identical and
+    would share one cached result. Names such as ``__init__``, ``run`` and
+    ``GET`` stay common to all files, as they are in real projects.
+    """
+    stat = os.stat(paths[0])
+    for number, path in enumerate(paths):
+        text = path.read_text()
+        for name, template in RENAMES:
+            text = text.replace(name, template.format(number))
+        path.write_text(text)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+
+def child(project: str, workdir: str, stream: bool = False):
+    from projectscanner.scanner import ProjectScanner
+
+    os.chdir(workdir)
+    scanner = ProjectScanner(project_root=project, output_dir=workdir, spill_results=stream)
+    scanner.scan_project(backend="inline", keep_results=not stream)
+    if stream:
+        held = {"result_cache_mb": round(deep_size(scanner.result_cache) / 2**20, 2)}
+    else:
+        held = {"analysis_mb": round(deep_size(scanner.analysis) / 2**20, 2)}
+    print(
+        json.dumps(
+            {
+                "files": scanner.files_discovered,
+                # ru_maxrss is KiB on Linux.
+                "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+                **held,
+            }
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=10000, help="Source files to generate.")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("py=6,js=3,rs=1"), help="Language weights.")
+    parser.add_argument("--depth", type=int, default=8, help="Maximum directory nesting.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stream", action="store_true", help="Scan as --stream-report does.")
+    parser.add_argument("--output", help="Write results JSON here instead of stdout.")
+    parser.add_argument("--child", nargs=2, metavar=("PROJECT", "WORKDIR"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(*args.child, stream=args.stream)
+        return
+
+    base = Path(tempfile.mkdtemp(prefix="projectscanner-mem-"))
+    try:
+        project = base / "project"
+        workdir = base / "work"
+        project.mkdir()
+        workdir.mkdir()
+        paths = generate_project(project, args.files, args.mix, args.depth, venvs=0, large_files=0, seed=args.seed)
+        make_unique(paths)
+        scenarios = {}
+        command = [sys.executable, __file__, "--child", str(project), str(workdir)]
+        if args.stream:
+            command.append("--stream")
+        for scenario in SCENARIOS:
+            completed = subprocess.run(
+                command,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                check=True,
+            )
+            scenarios[scenario] = json.loads(completed.stdout.splitlines()[-1])
+    finally:
+        shutil.rmtree(base, ignore_errors=True)
+
+    results = {
+        "meta": {"commit": git_commit(), "python": sys.version.split()[0], "files": args.files, "stream": args.stream},
+        "scenarios": scenarios,
+    }
+    text = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
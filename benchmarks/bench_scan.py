@@ -0,0 +1,348 @@
+"""End-to-end ProjectScanner benchmark on a generated synthetic repository.
+
+Usage: python benchmarks/bench_scan.py [--files N] [--mix py=6,js=3,rs=1] [--repeat N]
+                                       [--output results.json] [--compare baseline.json]
+
+Each repeat generates a fresh tree (deterministic for a given --seed) and runs
+four scenarios in order: cold (no caches), warm (nothing changed), changed (one
+file edited) and renamed (a few files moved). Every phase of scan_project is
+timed by wrapping the scanner's own methods for the duration of the run; the
+inline backend is used by default so the phases are single-threaded and add
+up to the wall time.
+Results are written as JSON, and --compare prints the change against an
+earlier results file.
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_analyzer import synthetic_bundle, synthetic_module  # noqa: E402
+
+from projectscanner import file_processor, language_analyzer, report_generator, scanner  # noqa: E402
+
+SCENARIOS = ("cold", "warm", "changed", "renamed")
+PHASES = (
+    "cache load",
+    "walk",
+    "exclusion",
+    "stat",
+    "read",
+    "hashing",
+    "analysis",
+    "rename detection",
+    "report write",
+    "cache save",
+)
+
+
+# --- synthetic repository ---
+def synthetic_rust(num_items: int) -> str:
+    parts = []
+    for i in range(num_items):
+        parts.append(
+            f"pub struct Item{i} {{ value: u32 }}\n"
+            f"impl Item{i} {{\n"
+            f"    pub fn new() -> Self {{ Item{i} {{ value: {i} }} }}\n"
+            f"    pub fn get(&self) -> u32 {{ self.value }}\n"
+            f"}}\n"
+            f"fn helper_{i}(x: u32) -> u32 {{ x + {i} }}\n\n"
+        )
+    return "".join(parts)
+
+
+GENERATORS = {"py": synthetic_module, "js": synthetic_bundle, "rs": synthetic_rust}
+
+
+def parse_mix(text: str) -> dict:
+    mix = {}
+    for part in text.split(","):
+        language, _, weight = part.partition("=")
+        if language not in GENERATORS:
+            raise argparse.ArgumentTypeError(f"unknown language {language!r}")
+        mix[language] = float(weight or 1)
+    return mix
+
+
+def generate_project(root: Path, files: int, mix: dict, depth: int, venvs: int, large_files: int, seed: int):
+    """Write a synthetic project under ``root`` and return its source file paths."""
+    rng = random.Random(seed)
+    languages = list(mix)
+    weights = [mix[language] for language in languages]
+    paths = []
+    for i in range(files):
+        language = rng.choices(languages, weights)[0]
+        nesting = rng.randint(0, depth)
+        directory = root.joinpath(*(f"pkg{rng.randint(0, 3)}_{level}" for level in range(nesting)))
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"mod_{i}.{language}"
+        path.write_text(GENERATORS[language](rng.randint(1, 8)))
+        paths.append(path)
+    for i in range(large_files):
+        path = root / f"large_{i}.py"
+        path.write_text(synthetic_module(4000))
+        paths.append(path)
+
+    # Directories the scanner must prune without reading.
+    for i in range(venvs):
+        venv = root / (".venv" if i == 0 else f"sandbox_{i}")
+        site = venv / "lib" / "python3" / "site-packages" / "dep"
+        site.mkdir(parents=True, exist_ok=True)
+        (venv / "pyvenv.cfg").write_text("home = /usr/bin\n")
+        for j in range(20):
+            (site / f"vendored_{j}.py").write_text(synthetic_module(2))
+    modules = root / "web" / "node_modules" / "lib"
+    modules.mkdir(parents=True, exist_ok=True)
+    for j in range(20):
+        (modules / f"index_{j}.js").write_text(synthetic_bundle(2))
+
+    # Age everything past the racy-mtime window so warm scans can trust stat.
+    old = time.time() - 3600
+    for path in root.rglob("*"):
+        os.utime(path, (old, old))
+    return paths
+
+
+def change_one(paths: list, rng: random.Random):
+    path = rng.choice([p for p in paths if p.suffix == ".py"] or paths)
+    with path.open("a", encoding="utf-8") as f:
+        f.write("\n\ndef benchmark_edit():\n    return 1\n")
+
+
+def rename_some(root: Path, paths: list, rng: random.Random, count: int):
+    target = root / "renamed"
+    target.mkdir(exist_ok=True)
+    for path in rng.sample(paths, min(count, len(paths))):
+        path.rename(target / path.name)
+
+
+# --- phase timing ---
+class PhaseTimer:
+    """Temporarily wraps scanner methods to attribute wall time to phases."""
+
+    def __init__(self):
+        self.totals = defaultdict(float)
+        self._active = set()
+        self._patches = []
+
+    def wrap(self, owner, name: str, phase: str):
+        original = owner.__dict__[name]
+        totals = self.totals
+        active = self._active
+
+        def timed(*args, **kwargs):
+            if phase in active:  # nested call within the same phase
+                return original(*args, **kwargs)
+            active.add(phase)
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                totals[phase] += time.perf_counter() - start
+                active.discard(phase)
+
+        self._patch(owner, name, timed)
+
+    def wrap_generator(self, owner, name: str, phase: str):
+        original = owner.__dict__[name]
+        totals = self.totals
+
+        def timed(*args, **kwargs):
+            iterator = iter(original(*args, **kwargs))
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    totals[phase] += time.perf_counter() - start
+                yield item
+
+        self._patch(owner, name, timed)
+
+    def wrap_context(self, owner, name: str, phase: str):
+        original = owner.__dict__[name]
+        totals = self.totals
+
+        @contextlib.contextmanager
+        def timed(*args, **kwargs):
+            with contextlib.ExitStack() as stack:
+                start = time.perf_counter()
+                try:
+                    value = stack.enter_context(original(*args, **kwargs))
+                finally:
+                    totals[phase] += time.perf_counter() - start
+                yield value
+
+        self._patch(owner, name, timed)
+
+    def _patch(self, owner, name, replacement):
+        self._patches.append((owner, name, getattr(owner, name)))
+        setattr(owner, name, replacement)
+
+    def __enter__(self):
+        self.wrap_generator(os, "walk", "walk")
+        matcher = file_processor.ExclusionMatcher
+        for name in ("excludes", "excludes_path", "is_venv_listing"):
+            self.wrap(matcher, name, "exclusion")
+        processor = file_processor.FileProcessor
+        for name in ("stat_signature", "_stat_hit"):
+            self.wrap(processor, name, "stat")
+        self.wrap_context(processor, "read_buffer", "read")
+        for name in ("hash_buffer", "hash_file"):
+            self.wrap(processor, name, "hashing")
+        self.wrap(language_analyzer.LanguageAnalyzer, "analyze_file", "analysis")
+        project_scanner = scanner.ProjectScanner
+        for name in ("load_cache", "load_result_cache"):
+            self.wrap(project_scanner, name, "cache load")
+        self.wrap(project_scanner, "_detect_moves", "rename detection")
+        self.wrap(project_scanner, "save_cache", "cache save")
+        self.wrap(report_generator.ReportGenerator, "save_report", "report write")
+        return self
+
+    def __exit__(self, *exc):
+        while self._patches:
+            owner, name, original = self._patches.pop()
+            setattr(owner, name, original)
+        return False
+
+
+def run_scenario(project: Path, workdir: Path, backend: str, workers) -> dict:
+    previous = os.getcwd()
+    os.chdir(workdir)
+    try:
+        with PhaseTimer() as timer:
+            start = time.perf_counter()
+            project_scanner = scanner.ProjectScanner(project_root=project, output_dir=workdir)
+            project_scanner.scan_project(backend=backend, num_workers=workers)
+            total = time.perf_counter() - start
+    finally:
+        os.chdir(previous)
+    phases = {phase: round(timer.totals.get(phase, 0.0), 6) for phase in PHASES}
+    phases["other"] = round(max(total - sum(timer.totals.values()), 0.0), 6)
+    return {
+        "total": round(total, 6),
+        "files": len(project_scanner.analysis),
+        "moved": len(project_scanner.moved_files),
+        "phases": phases,
+        "stats": project_scanner.stats.to_dict(),
+    }
+
+
+def run_benchmark(args) -> dict:
+    best = {}
+    for repeat in range(args.repeat):
+        base = Path(tempfile.mkdtemp(prefix="projectscanner-bench-"))
+        try:
+            project = base / "project"
+            workdir = base / "work"
+            project.mkdir()
+            workdir.mkdir()
+            paths = generate_project(
+                project, args.files, args.mix, args.depth, args.venvs, args.large_files, args.seed
+            )
+            rng = random.Random(args.seed + repeat)
+            for scenario in SCENARIOS:
+                if scenario == "changed":
+                    change_one(paths, rng)
+                elif scenario == "renamed":
+                    rename_some(project, paths, rng, args.renames)
+                result = run_scenario(project, workdir, args.backend, args.workers)
+                if scenario not in best or result["total"] < best[scenario]["total"]:
+                    best[scenario] = result
+        finally:
+            shutil.rmtree(base, ignore_errors=True)
+    return best
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).resolve().parent,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def compare(results: dict, baseline: dict):
+    for scenario, result in results["scenarios"].items():
+        old = baseline.get("scenarios", {}).get(scenario)
+        if not old:
+            continue
+        print(f"{scenario}: {old['total']:.3f}s -> {result['total']:.3f}s ({_delta(old['total'], result['total'])})")
+        for phase, seconds in result["phases"].items():
+            before = old["phases"].get(phase, 0.0)
+            if max(before, seconds) >= 0.001:
+                print(f"  {phase:<17} {before:.3f}s -> {seconds:.3f}s ({_delta(before, seconds)})")
+
+
+def _delta(before: float, after: float) -> str:
+    return f"{(after - before) / before * 100:+.0f}%" if before else "new"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=2000, help="Source files to generate.")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("py=6,js=3,rs=1"), help="Language weights.")
+    parser.add_argument("--depth", type=int, default=8, help="Maximum directory nesting.")
+    parser.add_argument("--venvs", type=int, default=3, help="Virtualenv-like directories to prune.")
+    parser.add_argument("--large-files", type=int, default=2, help="Multi-megabyte Python files.")
+    parser.add_argument("--renames", type=int, default=20, help="Files moved in the renamed scenario.")
+    parser.add_argument("--backend", default="inline", help="Scanner backend (inline keeps phases exact).")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per scenario; the fastest is kept.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write results JSON here instead of stdout.")
+    parser.add_argument("--compare", help="Earlier results JSON to compare against.")
+    args = parser.parse_args()
+
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "params": {
+                "files": args.files,
+                "mix": args.mix,
+                "depth": args.depth,
+                "venvs": args.venvs,
+                "large_files": args.large_files,
+                "renames": args.renames,
+                "backend": args.backend,
+                "workers": args.workers,
+                "repeat": args.repeat,
+                "seed": args.seed,
+            },
+        },
+        "scenarios": run_benchmark(args),
+    }
+    text = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    else:
+        print(text)
+    if args.compare:
+        compare(results, json.loads(Path(args.compare).read_text()))
+
+
+if __name__ == "__main__":
+    main()
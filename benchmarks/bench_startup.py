@@ -0,0 +1,100 @@
+"""CLI startup benchmark: import cost of projectscanner.cli measured with -X importtime.
+
+Usage: python benchmarks/bench_startup.py [--repeat N] [--budget-ms MS] [--output results.json]
+
+Each run is a fresh interpreter. The median cumulative import time of
+``projectscanner.cli`` is compared with the budget and the script exits
+non-zero when it is exceeded or when a heavy optional dependency (PyQt5,
+tree-sitter, sqlite3, multiprocessing, watchdog, ...) is imported on the CLI
+path. The wall time of ``--help`` and of a bare interpreter are reported
+alongside for context.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+# About 70 ms on a single shared core (Python 3.11) when set; ~2x headroom for noisy machines.
+STARTUP_BUDGET_MS = 150
+# Modules that must only be imported once a scan actually needs them.
+DEFERRED_MODULES = (
+    "PyQt5",
+    "tree_sitter",
+    "sqlite3",
+    "multiprocessing",
+    "concurrent.futures.process",
+    "watchdog",
+    "subprocess",
+    "jinja2",
+    "tiktoken",
+    "projectscanner.gui",
+)
+
+
+def _run(args) -> subprocess.CompletedProcess:
+    env = {**os.environ, "PYTHONPATH": str(REPO_ROOT)}
+    return subprocess.run(
+        [sys.executable, *args], cwd=REPO_ROOT, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+    )
+
+
+def import_time_ms(module: str) -> float:
+    """Cumulative import time of ``module`` in a fresh interpreter, in milliseconds."""
+    stderr = _run(["-X", "importtime", "-c", f"import {module}"]).stderr
+    for line in reversed(stderr.splitlines()):
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1]) / 1000
+    raise RuntimeError(f"no importtime record for {module}:\n{stderr}")
+
+
+def wall_time_ms(args) -> float:
+    start = time.perf_counter()
+    _run(args)
+    return (time.perf_counter() - start) * 1000
+
+
+def loaded_deferred_modules() -> list:
+    code = (
+        "import sys, projectscanner, projectscanner.cli; "
+        f"print(','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+    )
+    return [name for name in _run(["-c", code]).stdout.strip().split(",") if name]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS)
+    parser.add_argument("--output", help="Write results JSON here instead of stdout.")
+    args = parser.parse_args()
+
+    _run(["-c", "import projectscanner.cli"])  # warm the bytecode cache
+    imports = [import_time_ms("projectscanner.cli") for _ in range(args.repeat)]
+    help_runs = [wall_time_ms(["-m", "projectscanner.cli", "--help"]) for _ in range(args.repeat)]
+    bare_runs = [wall_time_ms(["-c", "pass"]) for _ in range(args.repeat)]
+    deferred = loaded_deferred_modules()
+    results = {
+        "python": sys.version.split()[0],
+        "budget_ms": args.budget_ms,
+        "import_ms": round(statistics.median(imports), 2),
+        "help_wall_ms": round(statistics.median(help_runs), 2),
+        "bare_interpreter_ms": round(statistics.median(bare_runs), 2),
+        "deferred_modules_loaded": deferred,
+    }
+    text = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    else:
+        print(text)
+    if results["import_ms"] > args.budget_ms or deferred:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,36 @@
-"""ProjectScanner package."""
-from .scanner import ProjectScanner
-from .language_analyzer import LanguageAnalyzer
-from .file_processor import FileProcessor
-from .report_generator import ReportGenerator
-from .bots import BotWorker, MultibotManager
+"""ProjectScanner package.
 
-try:
-    from .gui import AnalysisViewer
-except Exception:  # pragma: no cover - optional dependency
-    AnalysisViewer = None
+Exports are imported on first attribute access, so ``import projectscanner``
+(and the CLI) never pays for modules it does not use, PyQt5 in particular.
+"""
+import importlib
 
-__all__ = [
-    "ProjectScanner",
-    "LanguageAnalyzer",
-    "FileProcessor",
-    "ReportGenerator",
-    "BotWorker",
-    "MultibotManager",
-    "AnalysisViewer",
-]
+_EXPORTS = {
+    "ProjectScanner": ".scanner",
+    "LanguageAnalyzer": ".language_analyzer",
+    "FileProcessor": ".file_processor",
+    "ReportGenerator": ".report_generator",
+    "BotWorker": ".bots",
+    "MultibotManager": ".bots",
+    "AnalysisViewer": ".gui",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    try:
+        value = getattr(importlib.import_module(module_name, __name__), name)
+    except Exception:  # pragma: no cover - optional dependency
+        if name != "AnalysisViewer":
+            raise
+        value = None
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
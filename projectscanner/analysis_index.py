@@ -0,0 +1,133 @@
+import bisect
+import json
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+SEARCH_KINDS = ("file", "class", "function", "route")
+
+
+def load_report(path: Path):
+    """Load a JSON report, or a JSON Lines one back into the same shape."""
+    path = Path(path)
+    with path.open("r", encoding="utf-8") as f:
+        if path.suffix != ".jsonl":
+            return json.load(f)
+        entries = {}
+        extra = {}
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if set(record) == {"path", "analysis"}:
+                entries[record["path"]] = record["analysis"]
+            else:
+                extra.update(record)
+    return {**extra, "analysis_details": entries} if extra else entries
+
+
+class LazyNode:
+    """One key/value of a loaded JSON document; child nodes are created on demand."""
+
+    __slots__ = ("key", "value", "parent", "row", "children", "_keys")
+
+    def __init__(self, key, value, parent: Optional["LazyNode"] = None, row: int = 0):
+        self.key = key
+        self.value = value
+        self.parent = parent
+        self.row = row
+        self.children: List["LazyNode"] = []
+        self._keys = None
+
+    @property
+    def is_container(self) -> bool:
+        return isinstance(self.value, (dict, list))
+
+    def child_count(self) -> int:
+        return len(self.value) if self.is_container else 0
+
+    def can_fetch_more(self) -> bool:
+        return len(self.children) < self.child_count()
+
+    def fetch(self, count: int) -> int:
+        """Create up to ``count`` more children; returns how many were created."""
+        start = len(self.children)
+        stop = min(start + count, self.child_count())
+        if isinstance(self.value, dict):
+            if self._keys is None:
+                self._keys = list(self.value)
+            for row in range(start, stop):
+                key = self._keys[row]
+                self.children.append(LazyNode(key, self.value[key], self, row))
+        else:
+            for row in range(start, stop):
+                self.children.append(LazyNode(row, self.value[row], self, row))
+        return stop - start
+
+    def row_of(self, key) -> int:
+        if isinstance(self.value, dict):
+            if self._keys is None:
+                self._keys = list(self.value)
+            return self._keys.index(key)
+        return int(key)
+
+    @property
+    def label(self) -> str:
+        return f"[{self.key}]" if isinstance(self.key, int) else str(self.key)
+
+    @property
+    def preview(self) -> str:
+        if isinstance(self.value, dict):
+            return f"{{{len(self.value)} keys}}"
+        if isinstance(self.value, list):
+            return f"[{len(self.value)} items]"
+        return str(self.value)
+
+
+class AnalysisIndex:
+    """Sorted name index over an analysis report for files, classes, functions and routes.
+
+    Each hit carries the key path from the report root to the matching node,
+    so a viewer can expand straight to it without building the whole tree.
+    """
+
+    def __init__(self, analysis: Dict[str, Dict]):
+        entries = []
+        for file_path, result in analysis.items():
+            if not isinstance(result, Mapping):
+                continue
+            entries.append((file_path.lower(), "file", file_path, (file_path,)))
+            for class_name in result.get("classes", {}) or {}:
+                entries.append((class_name.lower(), "class", class_name, (file_path, "classes", class_name)))
+            for position, function in enumerate(result.get("functions", []) or []):
+                entries.append((function.lower(), "function", function, (file_path, "functions", position)))
+            for position, route in enumerate(result.get("routes", []) or []):
+                label = f"{route.get('method', '')} {route.get('path', '')}".strip()
+                entries.append((label.lower(), "route", label, (file_path, "routes", position)))
+        entries.sort(key=lambda entry: (entry[0], SEARCH_KINDS.index(entry[1]), entry[3]))
+        self._keys = [entry[0] for entry in entries]
+        self._entries = entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def search(self, query: str, limit: int = 50) -> List[Tuple[str, str, tuple]]:
+        """Return ``(kind, label, key_path)`` hits: prefix matches first, then substrings."""
+        needle = query.strip().lower()
+        if not needle:
+            return []
+        hits = []
+        seen = set()
+        start = bisect.bisect_left(self._keys, needle)
+        for position in range(start, len(self._keys)):
+            if len(hits) >= limit or not self._keys[position].startswith(needle):
+                break
+            hits.append(self._entries[position][1:])
+            seen.add(position)
+        if len(hits) < limit:
+            for position, key in enumerate(self._keys):
+                if needle in key and position not in seen:
+                    hits.append(self._entries[position][1:])
+                    if len(hits) >= limit:
+                        break
+        return hits
@@ -1,53 +1,550 @@
+import itertools
+import math
+import os
+import signal
 import threading
 import queue
 import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, BrokenExecutor, wait
 from pathlib import Path
+from typing import Dict, Optional
+
+from .file_processor import FileProcessor
+from .language_analyzer import LanguageAnalyzer, ParserPool
+from .stats import ScanStats
 
 logger = logging.getLogger(__name__)
 
+BACKENDS = ("threads", "processes", "inline")
+# Pending tasks per worker before add_task blocks the producer.
+QUEUE_DEPTH_PER_WORKER = 64
+# Files smaller than this are handed to thread workers in batches of up to BATCH_FILES.
+SMALL_FILE_BYTES = 16 * 1024
+BATCH_FILES = 32
+# Files that keep the scan running this long after the first worker ran out of work.
+STRAGGLER_SECONDS = 0.5
+# Sorts after every file task, so workers stop only once the queue is drained.
+_STOP_PRIORITY = math.inf
+# How often blocked producers and waits look at the cancel event.
+CANCEL_POLL_SECONDS = 0.1
+# A process worker gets this long past max_parse_seconds on one file before it is
+# killed; the analyzer's own limit checks usually stop a slow file first.
+WATCHDOG_GRACE_SECONDS = 2.0
+WATCHDOG_POLL_SECONDS = 0.1
+
+class TailTracker:
+    """Measures the end of a scan, from the first worker running dry to the last file finishing.
+
+    Files that finish after the first worker went idle are the stragglers.
+    """
+
+    def __init__(self, num_workers: int):
+        self.num_workers = num_workers
+        self.closed = False
+        self.first_idle = None
+        self.last_finish = None
+        self._busy = 0
+        self._running: Dict[Path, tuple] = {}
+        self.stragglers = []
+        self._lock = threading.Lock()
+
+    def close(self, queue_empty: bool):
+        """No more tasks will be added."""
+        with self._lock:
+            self.closed = True
+            if queue_empty and self._busy < self.num_workers:
+                self._mark_idle()
+
+    def started(self, file_path: Path, size: int):
+        with self._lock:
+            self._running[file_path] = (time.perf_counter(), size)
+
+    def finished(self, file_path: Path):
+        ended = time.perf_counter()
+        with self._lock:
+            started, size = self._running.pop(file_path)
+            self.last_finish = ended
+            if self.first_idle is not None and ended > self.first_idle:
+                self.stragglers.append((ended - self.first_idle, ended - started, file_path, size))
+
+    def busy(self):
+        with self._lock:
+            self._busy += 1
+
+    def done(self, queue_empty: bool):
+        with self._lock:
+            self._busy -= 1
+            if self.closed and queue_empty:
+                self._mark_idle()
+
+    def _mark_idle(self):
+        if self.first_idle is None:
+            self.first_idle = time.perf_counter()
+
+    @property
+    def tail_seconds(self) -> float:
+        if self.first_idle is None or self.last_finish is None:
+            return 0.0
+        return max(0.0, self.last_finish - self.first_idle)
+
 class BotWorker(threading.Thread):
-    """Background worker processing files from a queue."""
+    """Background worker processing batches of ``(path, stat signature)`` from a priority queue."""
 
-    def __init__(self, task_queue: queue.Queue, results_list: list, scanner, status_callback=None):
+    def __init__(
+        self,
+        task_queue: queue.Queue,
+        scanner,
+        status_callback=None,
+        tracker: Optional[TailTracker] = None,
+        cancelled: Optional[threading.Event] = None,
+    ):
         super().__init__()
         self.task_queue = task_queue
-        self.results_list = results_list
         self.scanner = scanner
         self.status_callback = status_callback
+        self.tracker = tracker
+        self.cancelled = cancelled
         self.daemon = True
         self.start()
 
     def run(self):
+        tracker = self.tracker
         while True:
-            file_path = self.task_queue.get()
-            if file_path is None:
+            _, _, batch = self.task_queue.get()
+            if batch is None:
                 break
-            result = self.scanner._process_file(file_path)
-            if result is not None:
-                self.results_list.append(result)
-            if self.status_callback:
-                self.status_callback(file_path, result)
-            self.task_queue.task_done()
+            if tracker:
+                tracker.busy()
+            try:
+                for file_path, signature in batch:
+                    if self.cancelled is not None and self.cancelled.is_set():
+                        break
+                    if tracker:
+                        tracker.started(file_path, signature["size"] if signature else 0)
+                    try:
+                        result = self.scanner._process_file(file_path, signature)
+                    finally:
+                        if tracker:
+                            tracker.finished(file_path)
+                    if self.status_callback:
+                        self.status_callback(file_path, result)
+            finally:
+                if tracker:
+                    tracker.done(self.task_queue.empty())
+                self.task_queue.task_done()
 
 class MultibotManager:
-    """Manages a pool of BotWorker threads."""
+    """Manages a pool of BotWorker threads, largest files first.
+
+    Each file is stat'ed as it is added. Pending work is taken from a priority
+    queue by size, so large files found late still start before the small
+    ones queued ahead of them. Small files travel in batches to save queue
+    handoffs. Results are not collected; each one is handed to
+    ``status_callback`` as soon as its file finishes. Files that kept the
+    scan running after the first worker went idle are logged and recorded as
+    stragglers in the scan stats.
+    """
 
-    def __init__(self, scanner, num_workers=4, status_callback=None):
-        self.task_queue = queue.Queue()
-        self.results_list = []
+    def __init__(self, scanner, num_workers=4, status_callback=None, cancelled: Optional[threading.Event] = None):
+        self.task_queue = queue.PriorityQueue(maxsize=num_workers * QUEUE_DEPTH_PER_WORKER)
         self.scanner = scanner
         self.status_callback = status_callback
+        self.cancelled = cancelled or threading.Event()
+        self.tracker = TailTracker(num_workers)
+        self._order = itertools.count()
+        self._batch = []
+        self._batch_bytes = 0
         self.workers = [
-            BotWorker(self.task_queue, self.results_list, scanner, status_callback)
+            BotWorker(self.task_queue, scanner, status_callback, self.tracker, self.cancelled)
             for _ in range(num_workers)
         ]
 
-    def add_task(self, file_path: Path):
-        self.task_queue.put(file_path)
+    def add_task(self, file_path: Path, signature: Optional[Dict] = None):
+        if signature is None:
+            signature = self.scanner.file_processor.stat_signature(file_path)
+        size = signature["size"] if signature else 0
+        if size >= SMALL_FILE_BYTES:
+            self._put(size, [(file_path, signature)])
+            return
+        self._batch.append((file_path, signature))
+        self._batch_bytes += size
+        # A batch fills only while the workers have a backlog; starved workers get files at once.
+        if len(self._batch) >= BATCH_FILES or self.task_queue.empty():
+            self._flush_batch()
+
+    def _put(self, size: int, batch: list):
+        item = (-size, next(self._order), batch)
+        while not self.cancelled.is_set():
+            try:
+                self.task_queue.put(item, timeout=CANCEL_POLL_SECONDS)
+                return
+            except queue.Full:
+                continue
+
+    def _flush_batch(self):
+        if self._batch:
+            batch, self._batch = self._batch, []
+            self._put(self._batch_bytes, batch)
+            self._batch_bytes = 0
 
     def wait_for_completion(self):
-        self.task_queue.join()
+        """Block until every queued file is processed, or until the scan is cancelled."""
+        self._flush_batch()
+        self.tracker.close(self.task_queue.empty())
+        done = self.task_queue.all_tasks_done
+        with done:
+            while self.task_queue.unfinished_tasks and not self.cancelled.is_set():
+                done.wait(CANCEL_POLL_SECONDS)
+        if not self.cancelled.is_set():
+            self._report_tail()
+
+    def _report_tail(self):
+        tracker = self.tracker
+        root = self.scanner.project_root
+        stragglers = [
+            {"path": str(file_path.relative_to(root)), "seconds": seconds, "late_seconds": late, "size": size}
+            for late, seconds, file_path, size in sorted(tracker.stragglers, key=lambda item: item[0], reverse=True)
+            if late >= STRAGGLER_SECONDS
+        ]
+        if self.scanner.stats is not None:
+            self.scanner.stats.record_tail(tracker.tail_seconds, stragglers)
+        for straggler in stragglers:
+            logger.warning(
+                "🐢 Straggler: %s (%s bytes) ran %.2fs, %.2fs after the first worker went idle.",
+                straggler["path"],
+                straggler["size"],
+                straggler["seconds"],
+                straggler["late_seconds"],
+            )
 
     def stop_workers(self):
+        if self.cancelled.is_set():
+            # Queued files are dropped; each worker stops after its current file.
+            while True:
+                try:
+                    self.task_queue.get_nowait()
+                except queue.Empty:
+                    break
+                self.task_queue.task_done()
         for _ in self.workers:
-            self.task_queue.put(None)
+            self.task_queue.put((_STOP_PRIORITY, next(self._order), None))
+
+class InlineManager:
+    """Processes each file synchronously in the calling thread."""
+
+    def __init__(self, scanner, status_callback=None):
+        self.scanner = scanner
+        self.status_callback = status_callback
+
+    def add_task(self, file_path: Path, signature: Optional[Dict] = None):
+        result = self.scanner._process_file(file_path, signature)
+        if self.status_callback:
+            self.status_callback(file_path, result)
+
+    def wait_for_completion(self):
+        pass
+
+    def stop_workers(self):
+        pass
+
+# --- process backend ---
+_worker_analyzer = None
+_worker_progress = None
+_worker_known = frozenset()
+
+def _init_process_worker(progress=None, known_hashes=frozenset()):
+    global _worker_analyzer, _worker_progress, _worker_known
+    # A fresh pool: grammars and parsers are never inherited across fork.
+    _worker_analyzer = LanguageAnalyzer(ParserPool())
+    _worker_progress = progress
+    _worker_known = known_hashes
+
+class _ParentResult:
+    """Stands in for a result the parent already holds under ``file_hash``."""
+
+    __slots__ = ("file_hash",)
+
+    def __init__(self, file_hash: str):
+        self.file_hash = file_hash
+
+class _KnownResults(dict):
+    """A worker's result cache that also recognizes hashes only the parent holds.
+
+    Moved or duplicated files hash to a known result without being in the
+    chunk's cache entries; ``get`` answers those with a :class:`_ParentResult`
+    marker instead of letting the worker parse the file again.
+    """
+
+    def __init__(self, results: dict, known: frozenset):
+        super().__init__(results)
+        self.known = known
+
+    def get(self, file_hash, default=None):
+        result = super().get(file_hash)
+        if result is None and file_hash in self.known:
+            return _ParentResult(file_hash)
+        return default if result is None else result
+
+def _process_chunk(settings: dict, cache_entries: dict, result_entries: dict, file_paths: list):
+    result_cache = _KnownResults(result_entries, _worker_known)
+    processor = FileProcessor(
+        cache=cache_entries,
+        cache_lock=threading.Lock(),
+        additional_ignore_dirs=set(),
+        result_cache=result_cache,
+        **settings,
+    )
+    processor.stats = ScanStats()
+    pid = os.getpid()
+    results = []
+    for file_path in file_paths:
+        if _worker_progress is not None:
+            _worker_progress.put((pid, str(file_path)))
+        results.append((file_path, processor.process_file(file_path, _worker_analyzer)))
+    if _worker_progress is not None:
+        _worker_progress.put((pid, None))
+    return results, cache_entries, dict(result_cache), processor.stats.state()
+
+class WorkerWatchdog:
+    """Kills process workers that stay on one file for more than ``limit`` seconds.
+
+    Workers report every file they start on ``progress``, a SimpleQueue whose
+    writes are synchronous, so a worker stuck inside a C parser has already
+    said which file it is on. A monitoring thread kills overdue workers and
+    remembers their files in ``killed``.
+    """
+
+    def __init__(self, progress, limit: float):
+        self.progress = progress
+        self.limit = limit
+        self.killed = set()
+        self._running = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="worker-watchdog", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stopped.wait(WATCHDOG_POLL_SECONDS):
+            self.check()
+
+    def _drain(self, now: float):
+        while not self.progress.empty():
+            pid, path = self.progress.get()
+            if path is None:
+                self._running.pop(pid, None)
+            else:
+                self._running[pid] = (path, now)
+
+    def check(self):
+        now = time.monotonic()
+        with self._lock:
+            self._drain(now)
+            for pid, (path, started) in list(self._running.items()):
+                if now - started <= self.limit:
+                    continue
+                del self._running[pid]
+                self.killed.add(path)
+                logger.warning("⏱️ Worker %s spent over %.1fs on %s; killing it.", pid, self.limit, path)
+                try:
+                    os.kill(pid, getattr(signal, "SIGKILL", signal.SIGTERM))
+                except OSError:  # pragma: no cover - already gone
+                    pass
+
+    def claim(self, path: str) -> bool:
+        """True, once, if a worker was killed over ``path``."""
+        with self._lock:
+            if path not in self.killed:
+                return False
+            self.killed.discard(path)
+            return True
+
+    def reset(self) -> bool:
+        """Forget the workers of a pool that was torn down; True if the watchdog killed one."""
+        with self._lock:
+            self._drain(time.monotonic())
+            self._running.clear()
+            return bool(self.killed)
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+class ProcessPoolManager:
+    """Ships chunks of files to worker processes, each with its own LanguageAnalyzer.
+
+    With ``max_parse_seconds`` set, a :class:`WorkerWatchdog` kills workers
+    stuck on one file. The pool is then rebuilt: the overdue file gets a
+    metadata-only "time limit" record and the chunks lost with the pool are
+    resubmitted. Chunks lost to a crash the watchdog did not cause are
+    retried once, then logged and dropped.
+    """
+
+    def __init__(
+        self,
+        scanner,
+        num_workers=4,
+        status_callback=None,
+        chunk_size=32,
+        cancelled: Optional[threading.Event] = None,
+    ):
+        from concurrent.futures import ProcessPoolExecutor  # pulls in multiprocessing
+
+        self.scanner = scanner
+        self.status_callback = status_callback
+        self.cancelled = cancelled or threading.Event()
+        self.num_workers = num_workers
+        self.chunk_size = max(1, chunk_size)
+        self.max_in_flight = max(2, num_workers * QUEUE_DEPTH_PER_WORKER // self.chunk_size)
+        self.pending = []
+        self.futures = set()
+        # future -> (files, executor it ran on, attempt)
+        self.chunks = {}
+        self.watchdog = None
+        self._explained = {}
+        self._initargs = (None,)
+        limit = scanner.file_processor.max_parse_seconds
+        if limit:
+            import multiprocessing
+
+            progress = multiprocessing.SimpleQueue()
+            self.watchdog = WorkerWatchdog(progress, limit + WATCHDOG_GRACE_SECONDS)
+            self._initargs = (progress,)
+        self._executor_class = ProcessPoolExecutor
+        self.executor = self._new_executor()
+
+    def _new_executor(self):
+        # Each pool gets the hashes the parent holds results for, so workers
+        # recognize moved and duplicated files.
+        result_cache = self.scanner.file_processor.result_cache
+        known = frozenset(result_cache.hashes() if hasattr(result_cache, "hashes") else result_cache.keys())
+        return self._executor_class(
+            max_workers=self.num_workers,
+            initializer=_init_process_worker,
+            initargs=(*self._initargs, known),
+        )
+
+    def add_task(self, file_path: Path, signature: Optional[Dict] = None):
+        # Unchanged files are answered from the result cache without a round trip.
+        hit = self.scanner.file_processor.cached_result(file_path, signature)
+        if hit is not None:
+            self._record(file_path, hit)
+            return
+        self.pending.append(file_path)
+        if len(self.pending) >= self.chunk_size:
+            self._submit_chunk()
+
+    def _record(self, file_path: Path, result):
+        if self.status_callback:
+            self.status_callback(file_path, result)
+
+    def _submit_chunk(self):
+        chunk, self.pending = self.pending, []
+        while len(self.futures) >= self.max_in_flight and not self.cancelled.is_set():
+            self._collect_some()
+        self._submit(chunk)
+
+    def _collect_some(self):
+        done, self.futures = wait(self.futures, timeout=CANCEL_POLL_SECONDS, return_when=FIRST_COMPLETED)
+        for future in done:
+            self._collect(future)
+
+    def _submit(self, chunk: list, attempt: int = 0):
+        cache = self.scanner.cache
+        result_cache = self.scanner.file_processor.result_cache
+        with self.scanner.cache_lock:
+            entries = {}
+            results = {}
+            for file_path in chunk:
+                relative_path = str(file_path.relative_to(self.scanner.project_root))
+                if relative_path in cache:
+                    entries[relative_path] = dict(cache[relative_path])
+                    file_hash = entries[relative_path].get("hash")
+                    if file_hash in result_cache:
+                        results[file_hash] = result_cache[file_hash]
+        future = self.executor.submit(
+            _process_chunk, self.scanner.file_processor.settings(), entries, results, chunk
+        )
+        self.chunks[future] = (chunk, self.executor, attempt)
+        self.futures.add(future)
+
+    def _collect(self, future):
+        chunk, executor, attempt = self.chunks.pop(future)
+        try:
+            results, entries, result_entries, stats = future.result()
+        except BrokenExecutor:
+            self._recover(chunk, executor, attempt)
+            return
+        except Exception as exc:  # pragma: no cover - worker crash
+            logger.error("❌ Worker process failed: %s", exc)
+            return
+        with self.scanner.cache_lock:
+            self.scanner.cache.update(entries)
+            self.scanner.file_processor.result_cache.update(result_entries)
+        if self.scanner.stats is not None:
+            self.scanner.stats.merge(stats)
+        result_cache = self.scanner.file_processor.result_cache
+        for file_path, result in results:
+            if result is not None and isinstance(result[1], _ParentResult):
+                result = (result[0], result_cache.get(result[1].file_hash))
+            self._record(file_path, result)
+
+    def _recover(self, chunk: list, executor, attempt: int):
+        """Handle a chunk lost with a broken pool, rebuilding the pool first if needed."""
+        if executor is self.executor:
+            logger.warning("♻️ A worker process died; restarting the pool.")
+            executor.shutdown(wait=False, cancel_futures=True)
+            self._explained[executor] = bool(self.watchdog and self.watchdog.reset())
+            self.executor = self._new_executor()
+        retry = []
+        for file_path in chunk:
+            if self.watchdog and self.watchdog.claim(str(file_path)):
+                self._record(file_path, self.scanner.file_processor.degraded_result(file_path, "time limit"))
+            else:
+                retry.append(file_path)
+        if not retry:
+            return
+        if self._explained.get(executor):
+            self._submit(retry, attempt)  # lost alongside a killed worker
+        elif not attempt:
+            self._submit(retry, attempt + 1)
+        else:
+            logger.error("❌ Worker process failed twice on a chunk; %s files were not analyzed.", len(retry))
+
+    def wait_for_completion(self):
+        if self.pending:
+            self._submit_chunk()
+        while self.futures and not self.cancelled.is_set():
+            self._collect_some()
+
+    def stop_workers(self):
+        cancelled = self.cancelled.is_set()
+        # On cancel, queued chunks are dropped and running ones are not waited for.
+        self.executor.shutdown(wait=not cancelled, cancel_futures=cancelled)
+        if self.watchdog:
+            self.watchdog.stop()
+
+def create_manager(
+    backend: str,
+    scanner,
+    num_workers: int = 4,
+    status_callback=None,
+    chunk_size: int = 32,
+    cancelled: Optional[threading.Event] = None,
+):
+    if backend == "threads":
+        return MultibotManager(
+            scanner, num_workers=num_workers, status_callback=status_callback, cancelled=cancelled
+        )
+    if backend == "processes":
+        return ProcessPoolManager(
+            scanner,
+            num_workers=num_workers,
+            status_callback=status_callback,
+            chunk_size=chunk_size,
+            cancelled=cancelled,
+        )
+    if backend == "inline":
+        return InlineManager(scanner, status_callback=status_callback)
+    raise ValueError(f"Unknown backend {backend!r}; expected one of {', '.join(BACKENDS)}")
@@ -3,7 +3,20 @@ import json
 import logging
 from pathlib import Path
 
+from .bots import BACKENDS
+from .file_processor import (
+    DEFAULT_HASH_ALGORITHM,
+    DEFAULT_MAX_AST_NODES,
+    DEFAULT_MAX_FILE_SIZE,
+    DEFAULT_MAX_PARSE_SECONDS,
+)
+from .git_index import DISCOVERY_MODES
+from .report_generator import REPORT_FORMATS, ReportGenerator
 from .scanner import ProjectScanner
+from .shards import parse_shard
+from .stats import PROFILERS, WorkerProfiler
+from .store import QUERY_KINDS, STORAGE_BACKENDS, AnalysisStore
+from .watcher import DEFAULT_DEBOUNCE, DEFAULT_POLL_INTERVAL, ProjectWatcher
 
 logger = logging.getLogger(__name__)
 
@@ -32,12 +45,210 @@ def main():
         default=None,
         help="Directory to store generated JSON reports.",
     )
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default="threads",
+        help="Executor used for file analysis; 'processes' sidesteps the GIL on large trees.",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Number of workers (defaults to the CPU count)."
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=32,
+        help="Files sent to a worker process per task with --backend processes.",
+    )
+    parser.add_argument(
+        "--hash-algorithm",
+        default=DEFAULT_HASH_ALGORITHM,
+        help="Content hash for the cache: 'xxhash' (if installed) or any hashlib name.",
+    )
+    parser.add_argument(
+        "--max-file-size",
+        type=int,
+        default=DEFAULT_MAX_FILE_SIZE,
+        help="Files larger than this many bytes get a metadata-only record (0 disables the cap).",
+    )
+    parser.add_argument(
+        "--max-ast-nodes",
+        type=int,
+        default=DEFAULT_MAX_AST_NODES,
+        help="Files whose syntax tree has more nodes than this get a metadata-only record (0 disables).",
+    )
+    parser.add_argument(
+        "--max-parse-seconds",
+        type=float,
+        default=DEFAULT_MAX_PARSE_SECONDS,
+        help="Files taking longer than this to analyze get a metadata-only record; with --backend processes "
+        "a worker stuck inside a parser is killed and replaced (0 disables).",
+    )
+    parser.add_argument(
+        "--report-format",
+        choices=REPORT_FORMATS,
+        default="json",
+        help="Write reports as one JSON document or as JSON Lines (one file record per line).",
+    )
+    parser.add_argument(
+        "--compact", action="store_true", help="Write JSON reports without indentation."
+    )
+    parser.add_argument(
+        "--no-pipeline",
+        action="store_true",
+        help="Walk the whole tree before analysis instead of overlapping the two.",
+    )
+    parser.add_argument(
+        "--stream-report",
+        action="store_true",
+        help="Write results into the report as they finish instead of holding them in memory "
+        "(skips the ChatGPT context export).",
+    )
+    parser.add_argument(
+        "--storage",
+        choices=STORAGE_BACKENDS,
+        default="json",
+        help="Keep the cache and analysis in JSON files or in an indexed SQLite store.",
+    )
+    parser.add_argument(
+        "--discovery",
+        choices=DISCOVERY_MODES,
+        default="walk",
+        help="Find files by walking the tree, or from the git index (tracked plus untracked, "
+        "with blob IDs as content hashes so unchanged files are never read).",
+    )
+    parser.add_argument(
+        "--query",
+        nargs="+",
+        metavar=("KIND", "VALUE"),
+        help=f"Query the SQLite store instead of scanning. KIND is one of {', '.join(QUERY_KINDS)}; "
+        "e.g. '--query subclasses Base' or '--query routes POST'.",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="After the scan, keep running and re-analyze files as they change (Ctrl+C to stop).",
+    )
+    parser.add_argument(
+        "--watch-interval",
+        type=float,
+        default=DEFAULT_POLL_INTERVAL,
+        help="Seconds between stat polls when the optional watchdog package is not installed.",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=DEFAULT_DEBOUNCE,
+        help="Seconds of quiet before a batch of changes is applied in --watch mode.",
+    )
+    parser.add_argument(
+        "--shard",
+        type=_shard_arg,
+        metavar="K/N",
+        help="Scan only shard K of N (files split by a stable path hash) and write a shard fragment.",
+    )
+    parser.add_argument(
+        "--merge-shards",
+        nargs="+",
+        metavar="FRAGMENT",
+        help="Verify and merge shard fragments into the standard report, context and caches instead of scanning.",
+    )
+    parser.add_argument(
+        "--context-budget",
+        type=int,
+        metavar="TOKENS",
+        help="Export the ChatGPT context as ranked packs of at most TOKENS tokens each "
+        "(split by package) instead of one file.",
+    )
+    parser.add_argument(
+        "--context-changed",
+        nargs="+",
+        metavar="PATH",
+        help="With --context-budget, pack only files linked to these changed files by imports, nearest first.",
+    )
+    parser.add_argument(
+        "--context-max-packs",
+        type=int,
+        metavar="N",
+        help="With --context-budget, write at most N packs (the highest ranked).",
+    )
+    parser.add_argument(
+        "--affected",
+        nargs="+",
+        metavar="PATH",
+        help="After an incremental scan, print PATH plus every file that imports it, directly or "
+        "transitively, one per line (e.g. to pick the tests to run), and skip the context export.",
+    )
+    parser.add_argument(
+        "--stats",
+        nargs="?",
+        const="-",
+        metavar="PATH",
+        help="Write scan metrics (phase timers, cache hits, slowest files) as JSON to PATH or stdout.",
+    )
+    parser.add_argument(
+        "--profile",
+        choices=PROFILERS,
+        help="Profile the per-file worker function (threads and inline backends).",
+    )
+    parser.add_argument(
+        "--profile-output",
+        default=None,
+        help="Where to write the profile (default: scan_profile.prof or scan_profile.txt in the output dir).",
+    )
     args = parser.parse_args()
+    if args.query:
+        run_query(parser, args)
+        return
+    if args.stream_report and (args.categorize_agents or args.generate_init):
+        parser.error("--stream-report cannot be combined with --categorize-agents or --generate-init")
+    if args.shard and (
+        args.stream_report or args.watch or args.categorize_agents or args.generate_init or args.storage != "json"
+    ):
+        parser.error(
+            "--shard writes a fragment; categorize, generate files and pick storage when merging, "
+            "and do not combine it with --stream-report or --watch"
+        )
+    if args.merge_shards and (args.shard or args.stream_report):
+        parser.error("--merge-shards cannot be combined with --shard or --stream-report")
+    if (args.context_changed or args.context_max_packs) and not args.context_budget:
+        parser.error("--context-changed and --context-max-packs need --context-budget")
+    if args.context_budget and (args.stream_report or args.no_chatgpt_context):
+        parser.error("--context-budget exports from the in-memory analysis; drop --stream-report and --no-chatgpt-context")
+    if args.affected and (args.shard or args.watch):
+        parser.error("--affected needs the whole project's import graph; drop --shard and --watch")
+    if args.stream_report and args.watch:
+        parser.error("--watch keeps the analysis in memory and cannot be combined with --stream-report")
 
-    scanner = ProjectScanner(project_root=args.project_root, output_dir=args.output_dir)
+    scanner = ProjectScanner(
+        project_root=args.project_root,
+        output_dir=args.output_dir,
+        hash_algorithm=args.hash_algorithm,
+        max_file_size=args.max_file_size or None,
+        max_ast_nodes=args.max_ast_nodes or None,
+        max_parse_seconds=args.max_parse_seconds or None,
+        report_format=args.report_format,
+        report_indent=None if args.compact else 4,
+        storage=args.storage,
+        discovery=args.discovery,
+        shard=args.shard,
+        spill_results=args.stream_report,
+    )
     scanner.additional_ignore_dirs = set(args.ignore)
-
-    scanner.scan_project()
+    if args.merge_shards:
+        try:
+            summary = scanner.merge_shards(args.merge_shards)
+        except (OSError, ValueError) as exc:
+            parser.error(f"cannot merge shards: {exc}")
+        print(json.dumps(summary))
+    else:
+        run_scan(parser, args, scanner)
+        if args.shard:
+            return
+    if args.affected:
+        for file_path in scanner.affected_files(project_paths(scanner, args.affected)):
+            print(file_path)
+        return
 
     if args.generate_init:
         scanner.generate_init_files(overwrite=True)
@@ -45,22 +256,122 @@ def main():
     if args.categorize_agents:
         scanner.categorize_agents()
         scanner.report_generator.save_report()
+        generator = scanner.report_generator
         logging.info(
             "✅ Agent categorization complete. Updated %s",
-            scanner.report_generator.analysis_file,
+            generator.store_file if scanner.store else generator.analysis_file,
         )
 
-    if not args.no_chatgpt_context:
+    if args.context_budget:
+        export_context_packs(parser, args, scanner)
+    elif not args.no_chatgpt_context and not args.stream_report:
         scanner.export_chatgpt_context()
         logging.info("✅ ChatGPT context exported by default.")
 
-        context_path = scanner.output_dir / scanner.report_generator.context_file
-        if context_path.exists():
-            try:
-                with context_path.open("r", encoding="utf-8") as f:
-                    json.load(f)
-            except Exception as e:  # pragma: no cover
-                logger.error("❌ Error reading exported ChatGPT context: %s", e)
+    if args.watch:
+        watch(scanner, args)
+
+
+def export_context_packs(parser: argparse.ArgumentParser, args, scanner: ProjectScanner):
+    changed = project_paths(scanner, args.context_changed) if args.context_changed else None
+    try:
+        index = scanner.export_context_packs(args.context_budget, changed, args.context_max_packs)
+    except ValueError as exc:
+        parser.error(str(exc))
+    if index["summarized"]:
+        logging.info("✂️  %s files exceeded the budget on their own and were summarized.", len(index["summarized"]))
+    if index["omitted_files"]:
+        logging.info("✂️  %s lower-ranked files did not fit in %s packs.", index["omitted_files"], args.context_max_packs)
+
+
+def watch(scanner: ProjectScanner, args):
+    scanner.categorize_updates = args.categorize_agents
+
+    def on_update(updated, removed):
+        if args.context_budget:
+            changed = project_paths(scanner, args.context_changed) if args.context_changed else None
+            scanner.export_context_packs(args.context_budget, changed, args.context_max_packs)
+        elif not args.no_chatgpt_context:
+            scanner.export_chatgpt_context()
+
+    watcher = ProjectWatcher(
+        scanner, interval=args.watch_interval, debounce=args.debounce, on_update=on_update
+    )
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        logging.info("👋 Watch stopped.")
+
+
+def project_paths(scanner: ProjectScanner, paths) -> list:
+    """Map paths given on the command line (absolute, cwd- or project-relative) to cache keys."""
+    relative = []
+    for path in paths:
+        candidate = Path(path).resolve()
+        if not candidate.exists():
+            candidate = scanner.project_root / path
+        try:
+            relative.append(str(candidate.relative_to(scanner.project_root)))
+        except ValueError:
+            relative.append(path)
+    return relative
+
+
+def _shard_arg(text: str):
+    try:
+        return parse_shard(text)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from None
+
+
+def run_scan(parser: argparse.ArgumentParser, args, scanner: ProjectScanner):
+    if args.profile:
+        if args.backend == "processes":
+            parser.error("--profile covers the threads and inline backends")
+        try:
+            scanner.profiler = WorkerProfiler(args.profile)
+        except ImportError:
+            parser.error(f"--profile {args.profile} needs the {args.profile} package installed")
+
+    scanner.scan_project(
+        backend=args.backend,
+        num_workers=args.workers,
+        chunk_size=args.chunk_size,
+        pipelined=not args.no_pipeline,
+        keep_results=not args.stream_report,
+    )
+    if scanner.profiler:
+        suffix = "prof" if args.profile == "cprofile" else "txt"
+        scanner.profiler.dump(args.profile_output or scanner.output_dir / f"scan_profile.{suffix}")
+    if args.stats:
+        write_stats(scanner, args.stats)
+
+
+def write_stats(scanner: ProjectScanner, destination: str):
+    text = json.dumps(scanner.stats.to_dict(), indent=2)
+    if destination == "-":
+        print(text)
+    else:
+        Path(destination).write_text(text + "\n", encoding="utf-8")
+        logging.info("📊 Scan stats written to: %s", destination)
+
+
+def run_query(parser: argparse.ArgumentParser, args):
+    kind, *values = args.query
+    if kind not in QUERY_KINDS or len(values) > 1:
+        parser.error(f"--query expects KIND [VALUE] with KIND one of {', '.join(QUERY_KINDS)}")
+    if kind != "routes" and not values:
+        parser.error(f"--query {kind} needs a VALUE")
+    generator = ReportGenerator(Path(args.project_root), {}, args.output_dir)
+    store_path = generator.output_dir / generator.store_file
+    if not store_path.exists():
+        parser.error(f"No SQLite store at {store_path}; scan with --storage sqlite first.")
+    store = AnalysisStore(store_path)
+    try:
+        for row in store.query(kind, values[0] if values else None):
+            print(json.dumps(row))
+    finally:
+        store.close()
 
 
 if __name__ == "__main__":  # pragma: no cover
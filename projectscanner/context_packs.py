@@ -0,0 +1,176 @@
+import functools
+import json
+import os
+import posixpath
+import threading
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .records import json_default
+
+PACK_MODES = ("package", "changed")
+CHARS_PER_TOKEN = 4
+MAX_TITLE_LENGTH = 80
+
+
+@functools.lru_cache(maxsize=None)
+def _tiktoken_encoding():
+    """The cl100k_base encoding when tiktoken is installed (and has it), else None."""
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:  # pragma: no cover - optional dependency
+        return None
+
+
+def token_estimator() -> Tuple[str, Callable[[str], int]]:
+    """``(name, count)``: tiktoken when available, otherwise about four characters per token."""
+    encoding = _tiktoken_encoding()
+    if encoding is not None:  # pragma: no cover - optional dependency
+        return "tiktoken-cl100k_base", lambda text: len(encoding.encode(text, disallowed_special=()))
+    return f"chars/{CHARS_PER_TOKEN}", lambda text: -(-len(text) // CHARS_PER_TOKEN)
+
+
+def _compact(value) -> str:
+    return json.dumps(value, separators=(",", ":"), default=json_default)
+
+
+class TokenCounter:
+    """Per-file token estimates, cached in the scanner's cache entries.
+
+    An estimate is stored on the file's cache entry, which is replaced when
+    the content changes, so unchanged files are never re-measured.
+    """
+
+    def __init__(self, entries: Optional[Dict[str, Dict]] = None, lock: Optional[threading.Lock] = None):
+        self.estimator, self._count = token_estimator()
+        self.entries = entries if entries is not None else {}
+        self.lock = lock or threading.Lock()
+        self.measured = 0
+
+    def text(self, text: str) -> int:
+        return self._count(text)
+
+    def file(self, path: str, analysis: Dict) -> int:
+        with self.lock:
+            entry = self.entries.get(path)
+            cached = entry.get("tokens") if entry else None
+        if cached and cached.get("estimator") == self.estimator:
+            return cached["count"]
+        count = self._count(_compact({path: analysis}))
+        self.measured += 1
+        if entry is not None:
+            with self.lock:
+                entry["tokens"] = {"estimator": self.estimator, "count": count}
+        return count
+
+
+def package_of(path: str) -> str:
+    return posixpath.dirname(path.replace(os.sep, "/")) or "."
+
+
+def summary_record(analysis: Dict) -> Dict:
+    """Reduced record for a file too large for any pack on its own."""
+    return {
+        "language": analysis.get("language"),
+        "complexity": analysis.get("complexity", 0),
+        "classes": sorted(analysis.get("classes") or {}),
+        "functions": len(analysis.get("functions") or []),
+        "routes": len(analysis.get("routes") or []),
+        "imports": analysis.get("imports", []),
+        "truncated": True,
+    }
+
+
+def relevance(changed: Iterable[str], graph) -> Dict[str, int]:
+    """Import distance from the changed files, following edges in both directions."""
+    distance = {path: 0 for path in changed if path in graph}
+    todo = deque(distance)
+    while todo:
+        path = todo.popleft()
+        for neighbour in graph.dependencies(path) | graph.dependents(path):
+            if neighbour not in distance:
+                distance[neighbour] = distance[path] + 1
+                todo.append(neighbour)
+    return distance
+
+
+class PackPlanner:
+    """Splits an analysis into ranked packs that each fit a token budget.
+
+    ``package`` mode keeps each directory together, largest total complexity
+    first, and lets small packages share a pack. ``changed`` mode keeps only
+    files connected to the changed files in the import graph, nearest first.
+    """
+
+    def __init__(self, analysis: Dict[str, Dict], budget: int, counter: TokenCounter, header_tokens: int = 0):
+        if budget <= header_tokens:
+            raise ValueError(f"A token budget of {budget} leaves no room for files ({header_tokens} for the pack header)")
+        self.analysis = analysis
+        self.capacity = budget - header_tokens
+        self.counter = counter
+        self.packs: List[Dict] = []
+        self.summarized: List[str] = []
+
+    def by_package(self) -> List[Dict]:
+        packages: Dict[str, List[str]] = {}
+        for path in sorted(self.analysis):
+            packages.setdefault(package_of(path), []).append(path)
+        ranked = sorted(
+            packages.items(),
+            key=lambda item: (-sum(self.analysis[path].get("complexity", 0) for path in item[1]), item[0]),
+        )
+        for package, paths in ranked:
+            sized = [self._sized(path) for path in paths]
+            total = sum(tokens for _, tokens, _ in sized)
+            if not self.packs or (self.packs[-1]["files"] and self.packs[-1]["tokens"] + total > self.capacity):
+                self._new_pack()
+            for item in sized:
+                self._add(item, package)
+        for pack in self.packs:
+            groups = pack["groups"]
+            title = groups[0] if len(groups) == 1 else f"{groups[0]} +{len(groups) - 1} more"
+            pack["title"] = title[:MAX_TITLE_LENGTH]
+        return self.packs
+
+    def by_relevance(self, changed: Iterable[str], graph) -> List[Dict]:
+        distance = relevance(changed, graph)
+        ranked = sorted(
+            (path for path in distance if path in self.analysis),
+            key=lambda path: (distance[path], -self.analysis[path].get("complexity", 0), path),
+        )
+        self._new_pack()
+        for path in ranked:
+            self._add(self._sized(path), distance[path])
+            self.packs[-1]["distance"][path] = distance[path]
+        packs = [pack for pack in self.packs if pack["files"]]
+        for pack in packs:
+            nearest, farthest = pack["groups"][0], pack["groups"][-1]
+            pack["title"] = f"distance {nearest}" if nearest == farthest else f"distance {nearest}-{farthest}"
+        return packs
+
+    def _sized(self, path: str) -> Tuple[str, int, Optional[Dict]]:
+        tokens = self.counter.file(path, self.analysis[path])
+        if tokens <= self.capacity:
+            return path, tokens, None
+        record = summary_record(self.analysis[path])
+        self.summarized.append(path)
+        return path, self.counter.text(_compact({path: record})), record
+
+    def _new_pack(self):
+        self.packs.append({"groups": [], "files": [], "tokens": 0, "records": {}, "distance": {}})
+
+    def _add(self, item, group):
+        path, tokens, record = item
+        pack = self.packs[-1]
+        if pack["files"] and pack["tokens"] + tokens > self.capacity:
+            self._new_pack()
+            pack = self.packs[-1]
+        if group not in pack["groups"]:
+            pack["groups"].append(group)
+        pack["files"].append(path)
+        pack["tokens"] += tokens
+        if record is not None:
+            pack["records"][path] = record
+
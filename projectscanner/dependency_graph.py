@@ -0,0 +1,289 @@
+import os
+import posixpath
+import sys
+from collections import deque
+from typing import AbstractSet, Dict, Iterable, List, Mapping, Optional, Set
+
+JS_SUFFIXES = (".js", ".ts", ".tsx")
+_RUST_ROOT_FILES = {"lib.rs", "main.rs", "mod.rs"}
+# Absolute imports of these never resolve to project files, even when one shares the name.
+STDLIB_MODULES = frozenset(getattr(sys, "stdlib_module_names", ())) | frozenset(sys.builtin_module_names)
+
+
+def _posix(path: str) -> str:
+    return path.replace(os.sep, "/")
+
+
+def _rust_module_dir(path: str) -> str:
+    """Directory-style name of a Rust module: ``src/lib.rs`` -> ``src``, ``src/a.rs`` -> ``src/a``."""
+    directory, name = posixpath.split(path)
+    return directory if name in _RUST_ROOT_FILES else posixpath.splitext(path)[0]
+
+
+def _rust_crate_root(path: str) -> str:
+    parts = path.split("/")[:-1]
+    if "src" in parts:
+        return "/".join(parts[: len(parts) - parts[::-1].index("src")])
+    return "/".join(parts)
+
+
+def package_dir(path: str) -> Optional[str]:
+    """The directory an ``__init__.py`` makes a package, or None for other files."""
+    directory, name = posixpath.split(_posix(path))
+    return directory if name == "__init__.py" and directory else None
+
+
+def module_keys(path: str, packages: AbstractSet[str] = frozenset()) -> List[str]:
+    """Names a file answers to: ``pkg/mod.py`` -> ``py:pkg.mod``.
+
+    A Python module is named relative to each root it could be imported
+    from: the project top level, any ``src/`` directory, and the nearest
+    enclosing directory that is not in ``packages`` (directories holding an
+    ``__init__.py``), so ``tests/helpers.py`` is also ``py:helpers``.
+    """
+    path = _posix(path)
+    stem, suffix = posixpath.splitext(path)
+    parts = stem.split("/")
+    if suffix == ".py":
+        if parts[-1] == "__init__":
+            parts = parts[:-1]
+        starts = {0}
+        starts.update(index + 1 for index, part in enumerate(parts[:-1]) if part == "src")
+        depth = len(parts) - 1
+        while depth and "/".join(parts[:depth]) in packages:
+            depth -= 1
+        starts.add(depth)
+        return [f"py:{'.'.join(parts[start:])}" for start in sorted(starts) if start < len(parts)]
+    if suffix in JS_SUFFIXES:
+        keys = [f"js:{stem}"]
+        if parts[-1] == "index":
+            keys.append(f"js:{posixpath.dirname(stem)}")
+        return keys
+    if suffix == ".rs":
+        return [f"rs:{_rust_module_dir(path)}"]
+    return []
+
+
+def lookup_keys(source: str, specifier: str) -> List[str]:
+    """Keys that may satisfy ``specifier`` imported from ``source``, most specific first.
+
+    ``a.b.c`` tries ``a.b.c``, then ``a.b``, then ``a``, since the last parts
+    may name things defined inside a module. Standard library imports get no
+    keys; imports of third-party packages simply match nothing.
+    """
+    source = _posix(source)
+    suffix = posixpath.splitext(source)[1]
+    if suffix == ".py":
+        level = len(specifier) - len(specifier.lstrip("."))
+        parts = [part for part in specifier[level:].split(".") if part]
+        if level:
+            package = posixpath.dirname(source).split("/") if "/" in source else []
+            if level - 1 > len(package):
+                return []
+            base = package[: len(package) - (level - 1)]
+            parts = base + parts
+            minimum = max(len(base), 1)
+        elif parts and parts[0] in STDLIB_MODULES:
+            return []
+        else:
+            minimum = 1
+        return [f"py:{'.'.join(parts[:end])}" for end in range(len(parts), minimum - 1, -1)]
+    if suffix in JS_SUFFIXES:
+        if not specifier.startswith(("./", "../")):
+            return []
+        target = posixpath.normpath(posixpath.join(posixpath.dirname(source), specifier))
+        stem, target_suffix = posixpath.splitext(target)
+        return [f"js:{stem if target_suffix in JS_SUFFIXES else target}"]
+    if suffix == ".rs":
+        parts = specifier.split("::")
+        if parts[0] == "crate":
+            base = _rust_crate_root(source)
+        elif parts[0] in ("self", "super"):
+            base = _rust_module_dir(source)
+        else:
+            return []
+        parts = parts[1:] if parts[0] == "crate" else parts
+        while parts and parts[0] in ("self", "super"):
+            if parts.pop(0) == "super":
+                base = posixpath.dirname(base)
+        return [f"rs:{'/'.join(filter(None, [base, *parts[:end]]))}" for end in range(len(parts), -1, -1)]
+    return []
+
+
+def _shared_depth(a: List[str], b: List[str]) -> int:
+    depth = 0
+    for left, right in zip(a, b):
+        if left != right:
+            break
+        depth += 1
+    return depth
+
+
+class DependencyGraph:
+    """File-level import graph with forward and reverse adjacency.
+
+    Built from the ``imports`` each analyzer records. :meth:`update` and
+    :meth:`remove` re-resolve only the changed file and the files whose
+    imports could point at it, so keeping the graph current costs nothing
+    close to a rebuild.
+    """
+
+    def __init__(self):
+        self.imports: Dict[str, tuple] = {}
+        self.forward: Dict[str, Set[str]] = {}
+        self.reverse: Dict[str, Set[str]] = {}
+        self._names: Dict[str, Set[str]] = {}
+        self._keys: Dict[str, List[str]] = {}
+        # Directories holding an __init__.py; they decide where module names are anchored.
+        self._packages: Set[str] = set()
+        # lookup key -> files whose imports tried it, so new or removed files re-resolve just those.
+        self._lookups: Dict[str, Set[str]] = {}
+        self._tried: Dict[str, Set[str]] = {}
+
+    @classmethod
+    def from_analysis(cls, analysis: Mapping[str, Dict]) -> "DependencyGraph":
+        graph = cls()
+        graph._packages = {package for package in map(package_dir, analysis) if package}
+        for path, result in analysis.items():
+            graph.imports[path] = tuple(result.get("imports") or ())
+            graph._add_names(path)
+        for path in graph.imports:
+            graph._resolve(path)
+        return graph
+
+    def __len__(self) -> int:
+        return len(self.imports)
+
+    def __contains__(self, path) -> bool:
+        return path in self.imports
+
+    def update(self, path: str, imports: Iterable[str]) -> bool:
+        """Record ``path``'s imports; returns False when nothing changed."""
+        imports = tuple(imports or ())
+        is_new = path not in self.imports
+        if not is_new and self.imports[path] == imports:
+            return False
+        self.imports[path] = imports
+        affected = set()
+        if is_new:
+            for key in self._add_names(path):
+                affected |= self._lookups.get(key, set())
+        self._resolve(path)
+        for other in affected - {path}:
+            self._resolve(other)
+        return True
+
+    def remove(self, path: str) -> bool:
+        if path not in self.imports:
+            return False
+        del self.imports[path]
+        self._set_edges(path, set())
+        for key in self._tried.pop(path, ()):
+            self._discard(self._lookups, key, path)
+        changed = self._set_names(path)
+        package = package_dir(path)
+        if package in self._packages:
+            self._packages.discard(package)
+            changed |= self._rename_under(package)
+        affected = set()
+        for key in changed:
+            affected |= self._lookups.get(key, set())
+        for other in affected:
+            self._resolve(other)
+        return True
+
+    # --- queries ---
+    def dependencies(self, path: str) -> Set[str]:
+        """Files ``path`` imports."""
+        return set(self.forward.get(path, ()))
+
+    def dependents(self, path: str) -> Set[str]:
+        """Files that import ``path`` directly."""
+        return set(self.reverse.get(path, ()))
+
+    def affected(self, paths: Iterable[str]) -> List[str]:
+        """``paths`` plus every file importing one of them, directly or transitively, sorted."""
+        seen = set(paths)
+        todo = deque(seen)
+        while todo:
+            for dependent in self.reverse.get(todo.popleft(), ()):
+                if dependent not in seen:
+                    seen.add(dependent)
+                    todo.append(dependent)
+        return sorted(seen)
+
+    # --- internals ---
+    def _add_names(self, path: str) -> Set[str]:
+        """Register ``path``'s names; returns every key whose files changed."""
+        package = package_dir(path)
+        if package and package not in self._packages:
+            # A new package renames the modules inside it, this file included.
+            self._packages.add(package)
+            return self._rename_under(package)
+        return self._set_names(path)
+
+    def _rename_under(self, package: str) -> Set[str]:
+        prefix = package + "/"
+        changed = set()
+        for path in self.imports:
+            if _posix(path).startswith(prefix):
+                changed |= self._set_names(path)
+        return changed
+
+    def _set_names(self, path: str) -> Set[str]:
+        """Bring ``path``'s registered names up to date (none once it is removed)."""
+        old = self._keys.pop(path, [])
+        new = module_keys(path, self._packages) if path in self.imports else []
+        if new:
+            self._keys[path] = new
+        for key in set(old) - set(new):
+            self._discard(self._names, key, path)
+        for key in new:
+            self._names.setdefault(key, set()).add(path)
+        return set(old) ^ set(new)
+
+    def _resolve(self, path: str):
+        tried = set()
+        targets = set()
+        for specifier in self.imports[path]:
+            for key in lookup_keys(path, specifier):
+                tried.add(key)
+                files = self._names.get(key)
+                if files:
+                    targets |= self._nearest(path, files)
+                    break
+        targets.discard(path)
+        previous = self._tried.get(path, set())
+        for key in previous - tried:
+            self._discard(self._lookups, key, path)
+        for key in tried - previous:
+            self._lookups.setdefault(key, set()).add(path)
+        self._tried[path] = tried
+        self._set_edges(path, targets)
+
+    @staticmethod
+    def _nearest(source: str, files: Set[str]) -> Set[str]:
+        """Of several same-named candidates keep those sharing the most directories with ``source``."""
+        if len(files) == 1:
+            return set(files)
+        source_dirs = posixpath.dirname(_posix(source)).split("/")
+        depths = {path: _shared_depth(source_dirs, posixpath.dirname(_posix(path)).split("/")) for path in files}
+        best = max(depths.values())
+        return {path for path, depth in depths.items() if depth == best}
+
+    def _set_edges(self, path: str, targets: Set[str]):
+        previous = self.forward.pop(path, set())
+        for target in previous - targets:
+            self._discard(self.reverse, target, path)
+        for target in targets - previous:
+            self.reverse.setdefault(target, set()).add(path)
+        if targets:
+            self.forward[path] = targets
+
+    @staticmethod
+    def _discard(index: Dict[str, Set[str]], key: str, value: str):
+        values = index.get(key)
+        if values is not None:
+            values.discard(value)
+            if not values:
+                del index[key]
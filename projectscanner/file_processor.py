@@ -1,88 +1,428 @@
+import contextlib
 import hashlib
 import logging
+import mmap
+import os
+import re
 import threading
+import time
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Iterator, Optional
 
-from .language_analyzer import LanguageAnalyzer
+from .language_analyzer import AnalysisLimitExceeded, LanguageAnalyzer
+from .records import compact
+
+try:
+    import xxhash
+except ImportError:  # pragma: no cover - optional dependency
+    xxhash = None
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_HASH_ALGORITHM = "blake2b"
+DEFAULT_MAX_FILE_SIZE = 32 * 1024 * 1024
+# Per-file analysis limits; a file that trips one gets a metadata-only record.
+DEFAULT_MAX_AST_NODES = 1_000_000
+DEFAULT_MAX_PARSE_SECONDS = 30.0
+MMAP_THRESHOLD = 1024 * 1024
+HASH_CHUNK_SIZE = 1024 * 1024
+# Hashes matching git blob object IDs, so index entries can stand in for file hashes.
+GIT_HASH_ALGORITHMS = {"git": "sha1", "git-sha256": "sha256"}
+
+# Files modified this recently may change again within the same mtime tick,
+# so their stat signature is not trusted on the next scan.
+RACY_MTIME_WINDOW_NS = 2_000_000_000
+
+VENV_PATTERNS = {
+    "venv", "env", ".env", ".venv", "virtualenv",
+    "ENV", "VENV", ".ENV", ".VENV",
+    "python-env", "python-venv", "py-env", "py-venv",
+    "envs", "conda-env", ".conda-env",
+    ".poetry/venv", ".poetry-venv",
+}
+DEFAULT_EXCLUDE_DIRS = {
+    "__pycache__", "node_modules", "migrations", "build",
+    "target", ".git", "coverage", "chrome_profile",
+} | VENV_PATTERNS
+
+def _alternation(names) -> str:
+    return "|".join(re.escape(name) for name in sorted(names, key=len, reverse=True))
+
+class ExclusionMatcher:
+    """Exclusion rules compiled once per scan.
+
+    Name-based rules are matched against the path relative to the project
+    root with a single regex; venv detection is memoized per directory.
+    """
+
+    NAME_PATTERN = re.compile(
+        rf"(?:^|/)(?:{_alternation(DEFAULT_EXCLUDE_DIRS)}|(?i:{_alternation(VENV_PATTERNS)}))(?:/|$)"
+    )
+    VENV_MARKERS = (("bin", "activate"), ("Scripts", "activate.bat"))
+
+    def __init__(self, project_root: Path, additional_ignore_dirs: set):
+        self.project_root = Path(project_root).resolve()
+        self.ignore_dirs = frozenset(additional_ignore_dirs)
+        self.ignore_roots = []
+        for ignore in self.ignore_dirs:
+            ignore_path = Path(ignore)
+            if not ignore_path.is_absolute():
+                ignore_path = (self.project_root / ignore_path).resolve()
+            self.ignore_roots.append((str(ignore_path), str(ignore_path).rstrip(os.sep) + os.sep))
+        self._root = str(self.project_root)
+        self._root_prefix = self._root.rstrip(os.sep) + os.sep
+        self._own_file = str(Path(__file__).resolve())
+        self._venv_dirs: Dict[str, bool] = {}
+
+    def excludes(self, file_path: Path) -> bool:
+        path = os.path.abspath(file_path)
+        if self.excludes_path(path):
+            return True
+        return any(self.is_venv_dir(parent) for parent in self._ancestors(path))
+
+    def excludes_path(self, path: str) -> bool:
+        """Check ignore roots and name patterns for an absolute path string."""
+        if path == self._own_file:
+            return True
+        for ignore_root, ignore_prefix in self.ignore_roots:
+            if path == ignore_root or path.startswith(ignore_prefix):
+                return True
+        if path == self._root:
+            return False
+        relative = path[len(self._root_prefix):] if path.startswith(self._root_prefix) else path
+        return self.NAME_PATTERN.search(relative.replace(os.sep, "/")) is not None
+
+    def is_venv_dir(self, directory: str) -> bool:
+        cached = self._venv_dirs.get(directory)
+        if cached is None:
+            try:
+                cached = os.path.exists(os.path.join(directory, "pyvenv.cfg")) or any(
+                    os.path.exists(os.path.join(directory, *marker)) for marker in self.VENV_MARKERS
+                )
+            except (OSError, PermissionError):  # pragma: no cover
+                cached = False
+            self._venv_dirs[directory] = cached
+        return cached
+
+    def is_venv_listing(self, directory: str, dirs: list, files: list) -> bool:
+        """Venv check for a directory whose listing ``os.walk`` already produced."""
+        cached = self._venv_dirs.get(directory)
+        if cached is None:
+            cached = "pyvenv.cfg" in files or any(
+                sub in dirs and os.path.exists(os.path.join(directory, sub, name))
+                for sub, name in self.VENV_MARKERS
+            )
+            self._venv_dirs[directory] = cached
+        return cached
+
+    def _ancestors(self, path: str) -> Iterator[str]:
+        if not path.startswith(self._root_prefix):
+            return
+        parent = os.path.dirname(path)
+        while parent.startswith(self._root_prefix):
+            yield parent
+            parent = os.path.dirname(parent)
+
+def make_hasher(algorithm: str):
+    """Return a fresh hash object for ``algorithm`` ("xxhash", "git", "git-sha256" or any hashlib name)."""
+    if algorithm == "xxhash":
+        if xxhash is not None:
+            return xxhash.xxh3_128()
+        algorithm = DEFAULT_HASH_ALGORITHM
+    if algorithm == "blake2b":
+        return hashlib.blake2b(digest_size=16)
+    return hashlib.new(GIT_HASH_ALGORITHMS.get(algorithm, algorithm))
+
 class FileProcessor:
     """Handles file hashing, ignoring and caching."""
 
-    def __init__(self, project_root: Path, cache: Dict, cache_lock: threading.Lock, additional_ignore_dirs: set):
+    def __init__(
+        self,
+        project_root: Path,
+        cache: Dict,
+        cache_lock: threading.Lock,
+        additional_ignore_dirs: set,
+        result_cache: Optional[Dict] = None,
+        hash_algorithm: str = DEFAULT_HASH_ALGORITHM,
+        max_file_size: Optional[int] = DEFAULT_MAX_FILE_SIZE,
+        max_ast_nodes: Optional[int] = DEFAULT_MAX_AST_NODES,
+        max_parse_seconds: Optional[float] = DEFAULT_MAX_PARSE_SECONDS,
+    ):
         self.project_root = project_root
         self.cache = cache
         self.cache_lock = cache_lock
         self.additional_ignore_dirs = additional_ignore_dirs
+        self.result_cache = result_cache if result_cache is not None else {}
+        self.hash_algorithm = hash_algorithm
+        self.max_file_size = max_file_size
+        self.max_ast_nodes = max_ast_nodes
+        self.max_parse_seconds = max_parse_seconds
+        make_hasher(hash_algorithm)  # fail fast on unknown algorithms
+        self._matcher = None
+        self.stats = None
+
+    def settings(self) -> Dict:
+        """Constructor settings needed to rebuild this processor in a worker process."""
+        return {
+            "project_root": self.project_root,
+            "hash_algorithm": self.hash_algorithm,
+            "max_file_size": self.max_file_size,
+            "max_ast_nodes": self.max_ast_nodes,
+            "max_parse_seconds": self.max_parse_seconds,
+        }
+
+    def _hasher(self, size: int):
+        hasher = make_hasher(self.hash_algorithm)
+        if self.hash_algorithm in GIT_HASH_ALGORITHMS:
+            hasher.update(b"blob %d\0" % size)
+        return hasher
 
     def hash_file(self, file_path: Path) -> str:
         try:
             with file_path.open("rb") as f:
-                return hashlib.md5(f.read()).hexdigest()
+                hasher = self._hasher(os.fstat(f.fileno()).st_size)
+                for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                    hasher.update(chunk)
+            return hasher.hexdigest()
         except Exception:  # pragma: no cover - I/O errors
             return ""
 
-    def should_exclude(self, file_path: Path) -> bool:
-        venv_patterns = {
-            "venv", "env", ".env", ".venv", "virtualenv",
-            "ENV", "VENV", ".ENV", ".VENV",
-            "python-env", "python-venv", "py-env", "py-venv",
-            "envs", "conda-env", ".conda-env",
-            ".poetry/venv", ".poetry-venv",
-        }
-        default_exclude_dirs = {
-            "__pycache__", "node_modules", "migrations", "build",
-            "target", ".git", "coverage", "chrome_profile",
-        } | venv_patterns
+    def hash_buffer(self, buffer) -> str:
+        hasher = self._hasher(len(buffer))
+        hasher.update(buffer)
+        return hasher.hexdigest()
 
-        file_abs = file_path.resolve()
+    @contextlib.contextmanager
+    def read_buffer(self, file_path: Path):
+        """Read a file once, memory-mapping it when it is large."""
+        with file_path.open("rb") as f:
+            if os.fstat(f.fileno()).st_size >= MMAP_THRESHOLD:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    yield mapped
+            else:
+                yield f.read()
+
+    def stat_signature(self, file_path: Path) -> Optional[Dict]:
         try:
-            if file_abs == Path(__file__).resolve():
-                return True
-        except NameError:  # pragma: no cover
-            pass
+            st = os.stat(file_path)
+        except OSError:
+            return None
+        signature = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "inode": st.st_ino}
+        if time.time_ns() - st.st_mtime_ns < RACY_MTIME_WINDOW_NS:
+            signature["mtime_ns"] = None
+        return signature
 
-        for ignore in self.additional_ignore_dirs:
-            ignore_path = Path(ignore)
-            if not ignore_path.is_absolute():
-                ignore_path = (self.project_root / ignore_path).resolve()
-            try:
-                file_abs.relative_to(ignore_path)
-                return True
-            except ValueError:
-                continue
+    @staticmethod
+    def stat_matches(entry: Dict, signature: Optional[Dict]) -> bool:
+        if not signature or signature["mtime_ns"] is None:
+            return False
+        return all(entry.get(key) == value for key, value in signature.items())
 
-        try:
-            if any(p.name == "pyvenv.cfg" for p in file_abs.parents):
-                return True
-            for parent in file_abs.parents:
-                if (parent / "bin" / "activate").exists() or (parent / "Scripts" / "activate.bat").exists():
-                    return True
-        except (OSError, PermissionError):
-            pass
+    def compile_exclusions(self) -> "ExclusionMatcher":
+        self._matcher = ExclusionMatcher(self.project_root, self.additional_ignore_dirs)
+        return self._matcher
 
-        if any(excluded in file_path.parts for excluded in default_exclude_dirs):
-            return True
-        path_str = str(file_abs).lower()
-        if any(f"/{pattern}/" in path_str.replace("\\", "/") for pattern in venv_patterns):
-            return True
-        return False
+    @property
+    def matcher(self) -> "ExclusionMatcher":
+        matcher = self._matcher
+        if matcher is None or matcher.ignore_dirs != frozenset(self.additional_ignore_dirs):
+            matcher = self.compile_exclusions()
+        return matcher
+
+    def should_exclude(self, file_path: Path) -> bool:
+        return self.matcher.excludes(file_path)
 
-    def process_file(self, file_path: Path, language_analyzer: LanguageAnalyzer) -> Optional[tuple]:
-        file_hash_val = self.hash_file(file_path)
+    def walk_files(self, file_extensions: set, start: Optional[Path] = None) -> Iterator[Path]:
+        """Yield candidate files, pruning excluded directories before descending.
+
+        ``start`` limits the walk to one directory inside the project.
+        """
+        matcher = self.compile_exclusions()
+        root_dir = str(matcher.project_root)
+        walk_dir = root_dir
+        if start is not None:
+            walk_dir = str(Path(start).resolve())
+            if walk_dir != root_dir and (
+                not walk_dir.startswith(root_dir.rstrip(os.sep) + os.sep) or matcher.excludes(Path(walk_dir))
+            ):
+                return
+        clock = time.perf_counter
+        exclusion_time = 0.0
+        try:
+            for root, dirs, files in os.walk(walk_dir):
+                started = clock()
+                if root != root_dir and matcher.is_venv_listing(root, dirs, files):
+                    dirs[:] = []
+                    exclusion_time += clock() - started
+                    continue
+                dirs[:] = [d for d in dirs if not matcher.excludes_path(os.path.join(root, d))]
+                exclusion_time += clock() - started
+                for name in files:
+                    if os.path.splitext(name)[1].lower() not in file_extensions:
+                        continue
+                    path = os.path.join(root, name)
+                    started = clock()
+                    excluded = matcher.excludes_path(path)
+                    exclusion_time += clock() - started
+                    if not excluded:
+                        yield Path(path)
+        finally:
+            if self.stats is not None:
+                self.stats.add_phase("exclusion", exclusion_time)
+
+    def cached_result(self, file_path: Path, signature: Optional[Dict] = None) -> Optional[tuple]:
+        """Return the cached analysis when the file's stat signature is unchanged."""
         relative_path = str(file_path.relative_to(self.project_root))
+        started = time.perf_counter()
+        if signature is None:
+            signature = self.stat_signature(file_path)
+        hit = self._stat_hit(relative_path, signature)
+        if hit is not None:
+            self._record(relative_path, "stat_hit", {"stat": time.perf_counter() - started})
+        return hit
+
+    def over_size_limit(self, signature: Optional[Dict]) -> bool:
+        return bool(self.max_file_size and signature and signature["size"] > self.max_file_size)
+
+    def _stat_hit(self, relative_path: str, signature: Optional[Dict]) -> Optional[tuple]:
+        # A cached analysis may predate a lower size cap; the cap wins.
+        if self.over_size_limit(signature):
+            return None
+        with self.cache_lock:
+            entry = self.cache.get(relative_path)
+            if entry is not None and self.stat_matches(entry, signature):
+                result = self.result_cache.get(entry.get("hash"))
+                if result is not None:
+                    return (relative_path, result)
+        return None
+
+    def hash_hit(self, relative_path: str, file_hash: str) -> Optional[tuple]:
+        """Serve a file whose content hash is already known (a git blob ID) without reading it."""
+        if self.max_file_size and self.over_size_limit(self.stat_signature(self.project_root / relative_path)):
+            return None
         with self.cache_lock:
-            if relative_path in self.cache and self.cache[relative_path].get("hash") == file_hash_val:
+            result = self.result_cache.get(file_hash)
+            if result is None:
                 return None
-        try:
-            with file_path.open("r", encoding="utf-8") as f:
-                source_code = f.read()
-            analysis_result = language_analyzer.analyze_file(file_path, source_code)
+            if self.cache.get(relative_path, {}).get("hash") != file_hash:
+                self.cache[relative_path] = {"hash": file_hash}
+        self._record(relative_path, "blob_hit", {})
+        return (relative_path, result)
+
+    @staticmethod
+    def metadata_record(file_path: Path, size: int, reason: str) -> Dict:
+        return {
+            "language": file_path.suffix.lower(),
+            "functions": [],
+            "classes": {},
+            "routes": [],
+            "complexity": 0,
+            "size": size,
+            "skipped": reason,
+        }
+
+    def degraded_result(
+        self,
+        file_path: Path,
+        reason: str,
+        signature: Optional[Dict] = None,
+        file_hash_val: Optional[str] = None,
+        timings: Optional[Dict[str, float]] = None,
+    ) -> tuple:
+        """Build a metadata-only record for a file that tripped the ``reason`` limit.
+
+        The record is not put in the result cache: it reflects this scan's
+        limits (and, for the time limit, this machine's load), so the next
+        scan tries the file again under whatever limits it has.
+        """
+        relative_path = str(file_path.relative_to(self.project_root))
+        if signature is None:
+            signature = self.stat_signature(file_path)
+        timings = timings if timings is not None else {}
+        if file_hash_val is None:
             with self.cache_lock:
-                self.cache[relative_path] = {"hash": file_hash_val}
-            return (relative_path, analysis_result)
+                entry = self.cache.get(relative_path)
+            if entry is not None and self.stat_matches(entry, signature):
+                file_hash_val = entry.get("hash")  # unchanged: no need to read it again
+        if file_hash_val is None:
+            started = time.perf_counter()
+            file_hash_val = self.hash_file(file_path)
+            timings["hashing"] = time.perf_counter() - started
+        size = signature["size"] if signature else 0
+        if reason != "size limit":
+            logger.warning("⚠️ %s exceeded the %s; recording metadata only.", relative_path, reason)
+        self._record(relative_path, "skipped", timings, size)
+        with self.cache_lock:
+            self._set_entry(relative_path, file_hash_val, signature)
+        return (relative_path, compact(self.metadata_record(file_path, size, reason)))
+
+    def _store(self, relative_path: str, file_hash_val: str, signature: Optional[Dict], result: Dict) -> tuple:
+        result = compact(result)
+        with self.cache_lock:
+            self._set_entry(relative_path, file_hash_val, signature)
+            self.result_cache[file_hash_val] = result
+        return (relative_path, result)
+
+    def _set_entry(self, relative_path: str, file_hash_val: str, signature: Optional[Dict]):
+        """Replace the cache entry; call with ``cache_lock`` held."""
+        entry = {"hash": file_hash_val, **(signature or {})}
+        previous = self.cache.get(relative_path)
+        if previous and previous.get("hash") == file_hash_val and "tokens" in previous:
+            entry["tokens"] = previous["tokens"]  # same content, same context-pack estimate
+        self.cache[relative_path] = entry
+
+    def _record(self, relative_path: str, outcome: str, timings: Dict[str, float], bytes_read: int = 0):
+        if self.stats is not None:
+            self.stats.record_file(relative_path, outcome, timings, bytes_read)
+
+    def process_file(
+        self, file_path: Path, language_analyzer: LanguageAnalyzer, signature: Optional[Dict] = None
+    ) -> Optional[tuple]:
+        """Analyze one file, or serve it from the caches.
+
+        ``signature`` is a stat signature the caller already took (the thread
+        scheduler stats files to order them); otherwise the file is stat'ed here.
+        """
+        clock = time.perf_counter
+        relative_path = str(file_path.relative_to(self.project_root))
+        started = clock()
+        if signature is None:
+            signature = self.stat_signature(file_path)
+        if self.over_size_limit(signature):
+            timings = {"stat": clock() - started}
+            return self.degraded_result(file_path, "size limit", signature, timings=timings)
+        hit = self._stat_hit(relative_path, signature)
+        timings = {"stat": clock() - started}
+        if hit is not None:
+            self._record(relative_path, "stat_hit", timings)
+            return hit
+        try:
+            started = clock()
+            with self.read_buffer(file_path) as buffer:
+                size = len(buffer)
+                hashed = clock()
+                file_hash_val = self.hash_buffer(buffer)
+                timings["read"] = hashed - started
+                timings["hashing"] = clock() - hashed
+                with self.cache_lock:
+                    hit = self.result_cache.get(file_hash_val)
+                    if hit is not None:
+                        self._set_entry(relative_path, file_hash_val, signature)
+                if hit is not None:
+                    self._record(relative_path, "result_hit", timings, size)
+                    return (relative_path, hit)
+                started = clock()
+                source_code = str(buffer, "utf-8")
+            analysis_result = language_analyzer.analyze_file(
+                file_path, source_code, self.max_ast_nodes, self.max_parse_seconds
+            )
+            timings["analysis"] = clock() - started
+        except AnalysisLimitExceeded as exc:
+            timings["analysis"] = clock() - started
+            return self.degraded_result(file_path, exc.reason, signature, file_hash_val, timings)
         except Exception as exc:  # pragma: no cover
             logger.error("❌ Error analyzing %s: %s", file_path, exc)
+            self._record(relative_path, "error", timings)
             return None
+        self._record(relative_path, "analyzed", timings, size)
+        return self._store(relative_path, file_hash_val, signature, analysis_result)
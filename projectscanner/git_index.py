@@ -0,0 +1,119 @@
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DISCOVERY_MODES = ("walk", "git")
+# Index modes that do not hold file content: symlinks and submodules.
+_SKIPPED_MODES = {"120000", "160000"}
+
+class GitIndex:
+    """File listing and content hashes read from a local git checkout.
+
+    Tracked files whose work-tree copy matches the index carry their blob ID,
+    which equals a ``git`` hash of the content, so they need not be read.
+    Modified and untracked files map to ``None``. Only local plumbing commands
+    are run; nothing touches the network or takes the index lock.
+    """
+
+    def __init__(self, project_root: Path, prefix: str, object_format: str = "sha1"):
+        self.project_root = Path(project_root).resolve()
+        self.prefix = prefix
+        self.object_format = object_format
+
+    @classmethod
+    def open(cls, project_root: Path) -> Optional["GitIndex"]:
+        """Return an index for ``project_root``, or None outside a git work tree."""
+        import subprocess
+
+        try:
+            prefix = cls._git(project_root, "rev-parse", "--show-prefix").strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+        try:
+            object_format = cls._git(project_root, "rev-parse", "--show-object-format").strip()
+        except subprocess.CalledProcessError:  # pragma: no cover - git < 2.25
+            object_format = "sha1"
+        return cls(project_root, prefix, object_format or "sha1")
+
+    @property
+    def hash_algorithm(self) -> str:
+        return "git" if self.object_format == "sha1" else f"git-{self.object_format}"
+
+    def files(self) -> Tuple[Dict[str, Optional[str]], Dict[str, str]]:
+        """Return ``({relative_path: blob_id or None}, {old_path: new_path})``.
+
+        Paths are relative to the project root. Renames are the ones git's
+        rename detection reports between HEAD and the index.
+        """
+        entries: Dict[str, Optional[str]] = {}
+        listing = self._git(self.project_root, "ls-files", "-z", "--stage", "--full-name", "--", ".")
+        for record in listing.split("\0"):
+            if not record:
+                continue
+            info, path = record.split("\t", 1)
+            mode, blob, stage = info.split(" ")
+            if mode in _SKIPPED_MODES:
+                continue
+            entries[path] = blob if stage == "0" and path not in entries else None
+
+        renames = {}
+        status = self._git(
+            self.project_root,
+            "--no-optional-locks",
+            "status",
+            "--porcelain=v1",
+            "-z",
+            "--untracked-files=all",
+            "--renames",
+            "--",
+            ".",
+        ).split("\0")
+        records = iter(status)
+        for record in records:
+            if not record:
+                continue
+            index_state, tree_state, path = record[0], record[1], record[3:]
+            if index_state in "RC":
+                original = next(records, "")
+                if index_state == "R":
+                    renames[original] = path
+            if index_state == "?":
+                entries[path] = None
+            elif tree_state == "D":
+                entries.pop(path, None)
+            elif tree_state != " ":
+                entries[path] = None
+
+        files = {}
+        for path, blob in entries.items():
+            relative = self._relative(path)
+            if relative is not None:
+                files[relative] = blob
+        moved = {}
+        for old_path, new_path in renames.items():
+            old_relative, new_relative = self._relative(old_path), self._relative(new_path)
+            if old_relative is not None and new_relative is not None:
+                moved[old_relative] = new_relative
+        return files, moved
+
+    def _relative(self, path: str) -> Optional[str]:
+        if not path.startswith(self.prefix):
+            return None
+        return os.path.normpath(path[len(self.prefix):])
+
+    @staticmethod
+    def _git(cwd: Path, *args) -> str:
+        import subprocess  # only git discovery needs it; keeps CLI startup lean
+
+        completed = subprocess.run(
+            ["git", *args],
+            cwd=str(cwd),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            check=True,
+            env={**os.environ, "GIT_TERMINAL_PROMPT": "0"},
+        )
+        return completed.stdout.decode("utf-8", "surrogateescape")
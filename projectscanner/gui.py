@@ -2,7 +2,114 @@ import json
 import sys
 import re
 from pathlib import Path
-from PyQt5 import QtWidgets
+from PyQt5 import QtCore, QtWidgets
+
+if not __package__:  # run as a script: python projectscanner/gui.py
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from projectscanner.analysis_index import AnalysisIndex, LazyNode, load_report
+
+# Rows created per fetchMore call; the view asks for more as it scrolls.
+FETCH_BATCH = 256
+SEARCH_LIMIT = 50
+
+
+class JsonTreeModel(QtCore.QAbstractItemModel):
+    """Item model over a loaded JSON document that creates rows only when expanded."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.root = LazyNode("root", {})
+
+    def set_data(self, data):
+        self.beginResetModel()
+        self.root = LazyNode("root", data)
+        self.endResetModel()
+
+    def _node(self, index: QtCore.QModelIndex) -> LazyNode:
+        return index.internalPointer() if index.isValid() else self.root
+
+    def index(self, row, column, parent=QtCore.QModelIndex()):
+        if not self.hasIndex(row, column, parent):
+            return QtCore.QModelIndex()
+        return self.createIndex(row, column, self._node(parent).children[row])
+
+    def parent(self, index):
+        if not index.isValid():
+            return QtCore.QModelIndex()
+        parent = index.internalPointer().parent
+        if parent is None or parent is self.root:
+            return QtCore.QModelIndex()
+        return self.createIndex(parent.row, 0, parent)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        return len(self._node(parent).children)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 2
+
+    def hasChildren(self, parent=QtCore.QModelIndex()):
+        return self._node(parent).child_count() > 0
+
+    def canFetchMore(self, parent):
+        return self._node(parent).can_fetch_more()
+
+    def fetchMore(self, parent):
+        node = self._node(parent)
+        start = len(node.children)
+        count = min(FETCH_BATCH, node.child_count() - start)
+        if count <= 0:
+            return
+        self.beginInsertRows(parent, start, start + count - 1)
+        node.fetch(count)
+        self.endInsertRows()
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid() or role not in (QtCore.Qt.DisplayRole, QtCore.Qt.ToolTipRole):
+            return None
+        node = index.internalPointer()
+        return node.label if index.column() == 0 else node.preview
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if orientation == QtCore.Qt.Horizontal and role == QtCore.Qt.DisplayRole:
+            return ("Key", "Value")[section]
+        return None
+
+    def index_for_key_path(self, key_path) -> QtCore.QModelIndex:
+        """Fetch just the rows along ``key_path`` and return the index at its end."""
+        index = QtCore.QModelIndex()
+        node = self.root
+        for key in key_path:
+            try:
+                row = node.row_of(key)
+            except (ValueError, TypeError):
+                return QtCore.QModelIndex()
+            while len(node.children) <= row:
+                before = len(node.children)
+                self.fetchMore(index)
+                if len(node.children) == before:
+                    return QtCore.QModelIndex()
+            node = node.children[row]
+            index = self.index(row, 0, index)
+        return index
+
+
+class ReportLoader(QtCore.QThread):
+    """Parses the reports and builds the search index off the GUI thread."""
+
+    loaded = QtCore.pyqtSignal(object, object, object)
+
+    def __init__(self, analysis_path: Path, context_path: Path, parent=None):
+        super().__init__(parent)
+        self.analysis_path = analysis_path
+        self.context_path = context_path
+
+    def run(self):
+        analysis = AnalysisViewer.load_json(self.analysis_path)
+        context = AnalysisViewer.load_json(self.context_path)
+        self.loaded.emit(analysis, context, AnalysisIndex(analysis) if "error" not in analysis else None)
 
 
 class AnalysisViewer(QtWidgets.QMainWindow):
@@ -17,15 +124,33 @@ class AnalysisViewer(QtWidgets.QMainWindow):
         self.setWindowTitle("ProjectScanner Viewer")
         self.analysis_data = {}
         self.context_data = {}
+        self.search_index = None
+        self.loader = None
 
         self.tabs = QtWidgets.QTabWidget()
-        self.analysis_tree = QtWidgets.QTreeWidget()
-        self.context_tree = QtWidgets.QTreeWidget()
-        for tree in (self.analysis_tree, self.context_tree):
-            tree.setHeaderHidden(True)
+        self.analysis_model = JsonTreeModel(self)
+        self.context_model = JsonTreeModel(self)
+        self.analysis_tree = QtWidgets.QTreeView()
+        self.context_tree = QtWidgets.QTreeView()
+        for tree, model in ((self.analysis_tree, self.analysis_model), (self.context_tree, self.context_model)):
+            tree.setModel(model)
+            tree.setUniformRowHeights(True)
         self.tabs.addTab(self.analysis_tree, "Project Analysis")
         self.tabs.addTab(self.context_tree, "ChatGPT Context")
 
+        self.search_box = QtWidgets.QLineEdit()
+        self.search_box.setPlaceholderText("Search files, classes, functions, routes…")
+        self.search_results = QtWidgets.QListWidget()
+        self.search_results.setMaximumHeight(150)
+        self.search_results.hide()
+        self.search_timer = QtCore.QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(150)
+        self.search_timer.timeout.connect(self.run_search)
+        self.search_box.textChanged.connect(lambda _: self.search_timer.start())
+        self.search_box.returnPressed.connect(self.jump_to_first_result)
+        self.search_results.itemActivated.connect(self.jump_to_result)
+
         refresh_btn = QtWidgets.QPushButton("Refresh")
         refresh_btn.clicked.connect(self.refresh)
 
@@ -41,6 +166,8 @@ class AnalysisViewer(QtWidgets.QMainWindow):
 
         container = QtWidgets.QWidget()
         main_layout = QtWidgets.QVBoxLayout(container)
+        main_layout.addWidget(self.search_box)
+        main_layout.addWidget(self.search_results)
         main_layout.addWidget(self.tabs)
         main_layout.addLayout(btn_layout)
         self.setCentralWidget(container)
@@ -48,42 +175,68 @@ class AnalysisViewer(QtWidgets.QMainWindow):
         self.refresh()
 
     def refresh(self):
-        analysis_path = self.project_root / self.analysis_file
-        context_path = self.project_root / self.context_file
-        self.analysis_data = self.load_json(analysis_path)
-        self.context_data = self.load_json(context_path)
-        self.populate_tree(self.analysis_tree, self.analysis_data)
-        self.populate_tree(self.context_tree, self.context_data)
-
-    def load_json(self, path: Path):
+        if self.loader is not None and self.loader.isRunning():
+            return
+        self.statusBar().showMessage("Loading reports…")
+        self.loader = ReportLoader(
+            self._report_path(self.analysis_file), self._report_path(self.context_file), self
+        )
+        self.loader.loaded.connect(self.on_loaded)
+        self.loader.start()
+
+    def _report_path(self, file_name: str) -> Path:
+        path = self.project_root / file_name
+        jsonl_path = path.with_suffix(".jsonl")
+        if jsonl_path.exists() and (not path.exists() or jsonl_path.stat().st_mtime > path.stat().st_mtime):
+            return jsonl_path
+        return path
+
+    def on_loaded(self, analysis, context, search_index):
+        self.analysis_data = analysis
+        self.context_data = context
+        self.search_index = search_index
+        self.analysis_model.set_data(analysis)
+        self.context_model.set_data(context)
+        indexed = len(search_index) if search_index is not None else 0
+        self.statusBar().showMessage(f"{len(analysis)} files loaded, {indexed} symbols indexed", 5000)
+        self.run_search()
+
+    @staticmethod
+    def load_json(path: Path):
         try:
-            with path.open("r", encoding="utf-8") as f:
-                return json.load(f)
+            return load_report(path)
         except Exception as exc:  # pragma: no cover - GUI feedback
             return {"error": f"Failed to load {path}: {exc}"}
 
-    def populate_tree(self, tree: QtWidgets.QTreeWidget, data):
-        tree.clear()
-
-        def add_items(parent, value):
-            if isinstance(value, dict):
-                for key, val in value.items():
-                    item = QtWidgets.QTreeWidgetItem([str(key)])
-                    parent.addChild(item)
-                    add_items(item, val)
-            elif isinstance(value, list):
-                for i, val in enumerate(value):
-                    item = QtWidgets.QTreeWidgetItem([f"[{i}]"])
-                    parent.addChild(item)
-                    add_items(item, val)
-            else:
-                item = QtWidgets.QTreeWidgetItem([str(value)])
-                parent.addChild(item)
-
-        root = QtWidgets.QTreeWidgetItem(["root"])
-        add_items(root, data)
-        tree.addTopLevelItem(root)
-        tree.expandToDepth(1)
+    # --- search ---
+    def run_search(self):
+        self.search_results.clear()
+        query = self.search_box.text()
+        if not query.strip() or self.search_index is None:
+            self.search_results.hide()
+            return
+        for kind, label, key_path in self.search_index.search(query, SEARCH_LIMIT):
+            item = QtWidgets.QListWidgetItem(f"{kind}: {label}  —  {key_path[0]}")
+            item.setData(QtCore.Qt.UserRole, key_path)
+            self.search_results.addItem(item)
+        self.search_results.setVisible(self.search_results.count() > 0)
+
+    def jump_to_first_result(self):
+        self.run_search()
+        if self.search_results.count():
+            self.jump_to_result(self.search_results.item(0))
+
+    def jump_to_result(self, item):
+        index = self.analysis_model.index_for_key_path(item.data(QtCore.Qt.UserRole))
+        if not index.isValid():
+            return
+        self.tabs.setCurrentWidget(self.analysis_tree)
+        parent = index.parent()
+        while parent.isValid():
+            self.analysis_tree.expand(parent)
+            parent = parent.parent()
+        self.analysis_tree.setCurrentIndex(index)
+        self.analysis_tree.scrollTo(index, QtWidgets.QAbstractItemView.PositionAtCenter)
 
     def save_json(self, data):
         if not data:
@@ -96,7 +249,7 @@ class AnalysisViewer(QtWidgets.QMainWindow):
 
 def main():  # pragma: no cover - manual invocation only
     app = QtWidgets.QApplication(sys.argv)
-    parser = QtWidgets.QCommandLineParser()
+    parser = QtCore.QCommandLineParser()
     parser.addHelpOption()
     parser.addPositionalArgument("project_root", "Project directory", "[project root]")
     parser.process(app)
@@ -1,130 +1,347 @@
 import ast
+import functools
+import hashlib
+import importlib
 import logging
+import threading
+import time
+from collections import deque
 from pathlib import Path
 from typing import Dict, Optional
 
-try:
-    from tree_sitter import Language, Parser
-except ImportError:  # pragma: no cover
-    Language = None
-    Parser = None
-
 logger = logging.getLogger(__name__)
 
-class LanguageAnalyzer:
-    """Analyze source files by language."""
+# Bump when analysis output changes in a way the source fingerprint cannot see.
+ANALYZER_VERSION = 2
+
+_PY_FUNCTION_NODES = {ast.FunctionDef, ast.AsyncFunctionDef}
+_PY_LOOP_NODES = {ast.For, ast.AsyncFor, ast.While}
+_PY_BRANCH_NODES = {ast.If, ast.Try} | ({ast.TryStar} if hasattr(ast, "TryStar") else set())
+
+
+_JS_ROUTE_METHODS = {"get", "post", "put", "delete", "patch"}
+_RUST_PATH_NODES = {"identifier", "scoped_identifier", "crate", "self", "super"}
+# Node types each tree-sitter extractor reads; only these are materialized.
+_RUST_EXTRACTED_NODES = ("use_declaration", "mod_item", "function_item", "struct_item", "impl_item")
+_JS_EXTRACTED_NODES = (
+    "import_statement",
+    "export_statement",
+    "function_declaration",
+    "class_declaration",
+    "lexical_declaration",
+    "call_expression",
+)
+# Walks check the per-file limits once every this many nodes.
+_LIMIT_CHECK_INTERVAL = 1024
+_CHECK_BATCH = range(_LIMIT_CHECK_INTERVAL)
+
+
+class AnalysisLimitExceeded(Exception):
+    """A file tripped a per-file analysis limit; ``reason`` names it ("node limit", "time limit")."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+def _check_limits(count: int, max_nodes: Optional[int], deadline: Optional[float]):
+    if max_nodes and count > max_nodes:
+        raise AnalysisLimitExceeded("node limit")
+    if deadline is not None and time.perf_counter() > deadline:
+        raise AnalysisLimitExceeded("time limit")
+
+
+@functools.lru_cache(maxsize=None)
+def _tree_sitter():
+    """Import tree-sitter on first use; returns ``(Language, Parser)`` or Nones."""
+    try:
+        from tree_sitter import Language, Parser
+    except ImportError:  # pragma: no cover
+        return None, None
+    return Language, Parser
+
+
+@functools.lru_cache(maxsize=None)
+def _query_classes():
+    """``(Query, QueryCursor)`` from tree-sitter >= 0.25, or Nones on older bindings."""
+    try:
+        from tree_sitter import Query, QueryCursor
+    except ImportError:
+        return None, None
+    return Query, QueryCursor
+
+
+def _is_str_constant(node) -> bool:
+    return isinstance(node, ast.Constant) and isinstance(node.value, str)
+
+
+def _iter_nodes(tree, max_nodes: Optional[int] = None, deadline: Optional[float] = None):
+    """Pre-order walk over a tree-sitter tree with a TreeCursor.
+
+    Iterative, so deeply nested input cannot hit the recursion limit, and no
+    ``children`` lists are built along the way. Raises
+    :class:`AnalysisLimitExceeded` past ``max_nodes`` or the ``deadline``.
+    """
+    cursor = tree.walk()
+    count = 0
+    while True:
+        # Counting in fixed batches keeps the per-node cost of the limits near zero.
+        for _ in _CHECK_BATCH:
+            yield cursor.node
+            if cursor.goto_first_child():
+                continue
+            while not cursor.goto_next_sibling():
+                if not cursor.goto_parent():
+                    return
+        count += _LIMIT_CHECK_INTERVAL
+        _check_limits(count, max_nodes, deadline)
+
+
+def _extracted_nodes(tree, query, max_nodes: Optional[int] = None, deadline: Optional[float] = None):
+    """The nodes matched by ``query`` in document (pre-order) order.
+
+    The query runs in C and creates Python nodes only for the captured types.
+    The node limit is checked up front from the tree's descendant count, which
+    bounds the query's work; the deadline is checked before and after the
+    query and while the captures are consumed. Without a query (older
+    tree-sitter) every node is walked with :func:`_iter_nodes`.
+    """
+    if query is None:
+        yield from _iter_nodes(tree, max_nodes, deadline)
+        return
+    root = tree.root_node
+    _check_limits(root.descendant_count, max_nodes, deadline)
+    nodes = [node for captured in _query_classes()[1](query).captures(root).values() for node in captured]
+    nodes.sort(key=lambda node: (node.start_byte, -node.end_byte))
+    _check_limits(0, None, deadline)
+    for start in range(0, len(nodes), _LIMIT_CHECK_INTERVAL):
+        yield from nodes[start : start + _LIMIT_CHECK_INTERVAL]
+        _check_limits(0, None, deadline)
+
+
+def _node_text(node) -> str:
+    return node.text.decode("utf-8") if node is not None else ""
+
+
+def _unique(items) -> list:
+    return list(dict.fromkeys(items))
+
+
+def _member_names(body, member_type: str) -> list:
+    if body is None:
+        return []
+    names = []
+    for child in body.named_children:
+        if child.type == member_type:
+            name_node = child.child_by_field_name("name")
+            if name_node:
+                names.append(_node_text(name_node))
+    return names
+
+
+@functools.lru_cache(maxsize=None)
+def analyzer_fingerprint() -> str:
+    """Identify the analyzer logic so cached results are dropped when it changes."""
+    digest = hashlib.md5(f"v{ANALYZER_VERSION}".encode("utf-8"))
+    digest.update(Path(__file__).read_bytes())
+    return digest.hexdigest()
+
+GRAMMAR_PATHS = {
+    "rust": "path/to/tree-sitter-rust.so",
+    "javascript": "path/to/tree-sitter-javascript.so",
+    "typescript": "path/to/tree-sitter-typescript.so",
+    "tsx": "path/to/tree-sitter-tsx.so",
+}
+# Grammar wheels for tree-sitter >= 0.22: (module, function returning the language pointer).
+GRAMMAR_PACKAGES = {
+    "rust": ("tree_sitter_rust", "language"),
+    "javascript": ("tree_sitter_javascript", "language"),
+    "typescript": ("tree_sitter_typescript", "language_typescript"),
+    "tsx": ("tree_sitter_typescript", "language_tsx"),
+}
+SUFFIX_GRAMMARS = {".rs": "rust", ".js": "javascript", ".ts": "typescript", ".tsx": "tsx"}
+
+class ParserPool:
+    """tree-sitter grammars loaded once on first use, with one parser per thread.
+
+    ``Parser`` objects are not safe to share between threads, while ``Language``
+    objects are; each thread lazily builds its own parser for a grammar.
+    """
 
     def __init__(self):
-        self.rust_parser = self._init_tree_sitter_language("rust")
-        self.js_parser = self._init_tree_sitter_language("javascript")
+        self._languages = {}
+        self._queries = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def language(self, name: str):
+        with self._lock:
+            if name not in self._languages:
+                self._languages[name] = self._load_language(name)
+            return self._languages[name]
 
-    def _init_tree_sitter_language(self, lang_name: str) -> Optional[Parser]:
+    def query(self, name: str, node_types: tuple):
+        """A compiled query capturing ``node_types`` in grammar ``name``, or None.
+
+        None when the grammar is missing or the binding predates ``QueryCursor``;
+        callers then walk the whole tree.
+        """
+        key = (name, node_types)
+        with self._lock:
+            if key in self._queries:
+                return self._queries[key]
+        language = self.language(name)
+        Query = _query_classes()[0]
+        query = None
+        if language is not None and Query is not None:
+            try:
+                query = Query(language, " ".join(f"({node_type}) @node" for node_type in node_types))
+            except Exception as exc:  # pragma: no cover - grammar without one of the types
+                logger.warning("⚠️ Could not compile the %s query (%s); walking whole trees.", name, exc)
+        with self._lock:
+            return self._queries.setdefault(key, query)
+
+    def parser(self, name: str):
+        parsers = self._local.__dict__.setdefault("parsers", {})
+        if name not in parsers:
+            language = self.language(name)
+            parsers[name] = self._new_parser(language) if language is not None else None
+        return parsers[name]
+
+    @staticmethod
+    def _load_language(name: str):
+        Language, Parser = _tree_sitter()
         if not Language or not Parser:
             logger.warning(
-                "⚠️ tree-sitter not installed. Rust/JS/TS AST parsing will be partially disabled."
+                "⚠️ tree-sitter not installed. %s AST parsing will be partially disabled.", name
             )
             return None
 
-        grammar_paths = {
-            "rust": "path/to/tree-sitter-rust.so",
-            "javascript": "path/to/tree-sitter-javascript.so",
-        }
-        if lang_name not in grammar_paths:
-            logger.warning("⚠️ No grammar path for %s. Skipping.", lang_name)
-            return None
+        package, attr = GRAMMAR_PACKAGES.get(name, (None, None))
+        if package:
+            try:
+                module = importlib.import_module(package)
+                return Language(getattr(module, attr)())
+            except ImportError:
+                pass
+            except Exception as exc:  # pragma: no cover - version mismatch
+                logger.error("⚠️ Failed to load %s grammar from %s: %s", name, package, exc)
 
-        grammar_path = grammar_paths[lang_name]
+        grammar_path = GRAMMAR_PATHS.get(name)
+        if not grammar_path:
+            logger.warning("⚠️ No grammar path for %s. Skipping.", name)
+            return None
         if not Path(grammar_path).exists():
-            logger.warning("⚠️ %s grammar not found at %s", lang_name, grammar_path)
+            logger.warning("⚠️ %s grammar not found at %s", name, grammar_path)
+            return None
+        try:
+            return Language(grammar_path, name)
+        except Exception as exc:  # pragma: no cover - seldom triggered
+            logger.error("⚠️ Failed to initialize tree-sitter %s grammar: %s", name, exc)
             return None
 
+    @staticmethod
+    def _new_parser(language):
+        Parser = _tree_sitter()[1]
         try:
-            lang_lib = Language(grammar_path, lang_name)
+            return Parser(language)
+        except TypeError:  # tree-sitter < 0.22
             parser = Parser()
-            parser.set_language(lang_lib)
+            parser.set_language(language)
             return parser
-        except Exception as exc:  # pragma: no cover - seldom triggered
-            logger.error("⚠️ Failed to initialize tree-sitter %s parser: %s", lang_name, exc)
-            return None
 
-    def analyze_file(self, file_path: Path, source_code: str) -> Dict:
+_DEFAULT_POOL = ParserPool()
+
+class LanguageAnalyzer:
+    """Analyze source files by language."""
+
+    def __init__(self, parser_pool: Optional[ParserPool] = None):
+        self.parser_pool = parser_pool or _DEFAULT_POOL
+
+    @property
+    def rust_parser(self):
+        return self.parser_pool.parser("rust")
+
+    @property
+    def js_parser(self):
+        return self.parser_pool.parser("javascript")
+
+    def analyze_file(
+        self,
+        file_path: Path,
+        source_code: str,
+        max_nodes: Optional[int] = None,
+        max_seconds: Optional[float] = None,
+    ) -> Dict:
+        """Analyze one file's source.
+
+        Raises :class:`AnalysisLimitExceeded` when the syntax tree has more than
+        ``max_nodes`` nodes or parsing and walking take over ``max_seconds``.
+        The limits are checked after parsing and while extracting nodes; a
+        parse or tree-sitter query that never returns can only be stopped from
+        outside the process.
+        """
+        deadline = time.perf_counter() + max_seconds if max_seconds else None
         suffix = file_path.suffix.lower()
         if suffix == ".py":
-            return self._analyze_python(source_code)
-        if suffix == ".rs" and self.rust_parser:
-            return self._analyze_rust(source_code)
-        if suffix in {".js", ".ts"} and self.js_parser:
-            return self._analyze_javascript(source_code)
+            return self._analyze_python(source_code, max_nodes, deadline)
+        grammar = SUFFIX_GRAMMARS.get(suffix)
+        parser = self.parser_pool.parser(grammar) if grammar else None
+        if grammar == "rust" and parser:
+            return self._analyze_rust(source_code, parser, max_nodes, deadline)
+        if grammar and parser:
+            return self._analyze_javascript(source_code, parser, max_nodes, deadline, grammar)
         return {"language": suffix, "functions": [], "classes": {}, "routes": [], "complexity": 0}
 
     # -------- Python ---------
-    def _analyze_python(self, source_code: str) -> Dict:
+    def _analyze_python(
+        self, source_code: str, max_nodes: Optional[int] = None, deadline: Optional[float] = None
+    ) -> Dict:
         tree = ast.parse(source_code)
+        _check_limits(0, None, deadline)
+        visited = 0
         functions = []
         classes = {}
         routes = []
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
-                functions.append(node.name)
-                for decorator in node.decorator_list:
-                    if isinstance(decorator, ast.Call) and hasattr(decorator.func, "attr"):
-                        func_attr = decorator.func.attr.lower()
-                        if func_attr in {"route", "get", "post", "put", "delete", "patch"}:
-                            path_arg = "/unknown"
-                            methods = [func_attr.upper()]
-                            if decorator.args:
-                                arg0 = decorator.args[0]
-                                if isinstance(arg0, ast.Str):
-                                    path_arg = arg0.s
-                            for kw in decorator.keywords:
-                                if kw.arg == "methods" and isinstance(kw.value, ast.List):
-                                    extracted_methods = []
-                                    for elt in kw.value.elts:
-                                        if isinstance(elt, ast.Str):
-                                            extracted_methods.append(elt.s.upper())
-                                    if extracted_methods:
-                                        methods = extracted_methods
-                            for m in methods:
-                                routes.append({"function": node.name, "method": m, "path": path_arg})
-            elif isinstance(node, ast.ClassDef):
-                docstring = ast.get_docstring(node)
-                method_names = [n.name for n in node.body if isinstance(n, ast.FunctionDef)]
-                base_classes = []
-                for base in node.bases:
-                    if isinstance(base, ast.Name):
-                        base_classes.append(base.id)
-                    elif isinstance(base, ast.Attribute):
-                        base_parts = []
-                        attr_node = base
-                        while isinstance(attr_node, ast.Attribute):
-                            base_parts.append(attr_node.attr)
-                            attr_node = attr_node.value
-                        if isinstance(attr_node, ast.Name):
-                            base_parts.append(attr_node.id)
-                        base_classes.append(".".join(reversed(base_parts)))
-                    else:
-                        base_classes.append(None)
-                classes[node.name] = {
-                    "methods": method_names,
-                    "docstring": docstring,
-                    "base_classes": base_classes,
-                }
-
-        loops = sum(isinstance(n, (ast.For, ast.While)) for n in ast.walk(tree))
-        branches = sum(isinstance(n, (ast.If, ast.Try)) for n in ast.walk(tree))
+        long_functions = []
+        imports = []
+        loops = 0
+        branches = 0
+        # One breadth-first pass (the same order as ast.walk) collects everything.
+        todo = deque([tree])
+        while todo:
+            # Whole batches of queued nodes, so the limits are checked once per batch.
+            batch = min(len(todo), _LIMIT_CHECK_INTERVAL)
+            for _ in range(batch):
+                node = todo.popleft()
+                todo.extend(ast.iter_child_nodes(node))
+                node_type = type(node)
+                if node_type in _PY_FUNCTION_NODES:
+                    functions.append(node.name)
+                    if node.decorator_list:
+                        routes.extend(self._python_routes(node))
+                    if node.end_lineno and node.end_lineno - node.lineno > 50:
+                        long_functions.append(f"Function {node.name} >50 lines")
+                elif node_type is ast.ClassDef:
+                    classes[node.name] = self._python_class(node)
+                elif node_type is ast.Import:
+                    imports.extend(alias.name for alias in node.names)
+                elif node_type is ast.ImportFrom:
+                    imports.extend(self._python_from_imports(node))
+                elif node_type in _PY_LOOP_NODES:
+                    loops += 1
+                elif node_type in _PY_BRANCH_NODES:
+                    branches += 1
+            visited += batch
+            _check_limits(visited, max_nodes, deadline)
+
         complexity = (
             len(functions)
             + sum(len(c["methods"]) for c in classes.values())
             + loops
             + branches
         )
-
-        lint_suggestions = []
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
-                if hasattr(node, "end_lineno") and node.end_lineno:
-                    if node.end_lineno - node.lineno > 50:
-                        lint_suggestions.append(f"Function {node.name} >50 lines")
+        lint_suggestions = long_functions
         if complexity > 10:
             lint_suggestions.append("High complexity")
 
@@ -135,39 +352,105 @@ class LanguageAnalyzer:
             "routes": routes,
             "complexity": complexity,
             "lint": lint_suggestions,
+            "imports": _unique(imports),
+        }
+
+    @staticmethod
+    def _python_from_imports(node: ast.ImportFrom) -> list:
+        """``from a import b`` -> ``a.b``; ``from . import c`` -> ``.c``; ``from a import *`` -> ``a``.
+
+        Whether ``b`` is a submodule or a name defined in ``a`` is settled when
+        the dependency graph resolves the import.
+        """
+        prefix = "." * node.level + (node.module or "")
+        separator = "." if node.module else ""
+        return [prefix if alias.name == "*" else f"{prefix}{separator}{alias.name}" for alias in node.names]
+
+    @staticmethod
+    def _python_routes(node) -> list:
+        routes = []
+        for decorator in node.decorator_list:
+            if isinstance(decorator, ast.Call) and hasattr(decorator.func, "attr"):
+                func_attr = decorator.func.attr.lower()
+                if func_attr in {"route", "get", "post", "put", "delete", "patch"}:
+                    path_arg = "/unknown"
+                    methods = [func_attr.upper()]
+                    if decorator.args and _is_str_constant(decorator.args[0]):
+                        path_arg = decorator.args[0].value
+                    for kw in decorator.keywords:
+                        if kw.arg == "methods" and isinstance(kw.value, ast.List):
+                            extracted_methods = [
+                                elt.value.upper() for elt in kw.value.elts if _is_str_constant(elt)
+                            ]
+                            if extracted_methods:
+                                methods = extracted_methods
+                    for m in methods:
+                        routes.append({"function": node.name, "method": m, "path": path_arg})
+        return routes
+
+    @staticmethod
+    def _python_class(node: ast.ClassDef) -> Dict:
+        base_classes = []
+        for base in node.bases:
+            if isinstance(base, ast.Name):
+                base_classes.append(base.id)
+            elif isinstance(base, ast.Attribute):
+                base_parts = []
+                attr_node = base
+                while isinstance(attr_node, ast.Attribute):
+                    base_parts.append(attr_node.attr)
+                    attr_node = attr_node.value
+                if isinstance(attr_node, ast.Name):
+                    base_parts.append(attr_node.id)
+                base_classes.append(".".join(reversed(base_parts)))
+            else:
+                base_classes.append(None)
+        return {
+            "methods": [n.name for n in node.body if type(n) in _PY_FUNCTION_NODES],
+            "docstring": ast.get_docstring(node),
+            "base_classes": base_classes,
         }
 
     # -------- Rust ---------
-    def _analyze_rust(self, source_code: str) -> Dict:
-        if not self.rust_parser:
+    def _analyze_rust(
+        self,
+        source_code: str,
+        parser=None,
+        max_nodes: Optional[int] = None,
+        deadline: Optional[float] = None,
+    ) -> Dict:
+        parser = parser or self.rust_parser
+        if not parser:
             return {"language": ".rs", "functions": [], "classes": {}, "routes": [], "complexity": 0}
-        tree = self.rust_parser.parse(bytes(source_code, "utf-8"))
+        tree = parser.parse(bytes(source_code, "utf-8"))
+        _check_limits(0, None, deadline)
         functions = []
         classes = {}
+        imports = []
 
-        def _traverse(node):
-            if node.type == "function_item":
+        query = self.parser_pool.query("rust", _RUST_EXTRACTED_NODES)
+        for node in _extracted_nodes(tree, query, max_nodes, deadline):
+            node_type = node.type
+            if node_type == "use_declaration":
+                imports.extend(self._rust_use_paths(node.child_by_field_name("argument")))
+            elif node_type == "mod_item":
+                name_node = node.child_by_field_name("name")
+                if name_node and node.child_by_field_name("body") is None:
+                    imports.append(f"self::{_node_text(name_node)}")
+            elif node_type == "function_item":
                 fn_name_node = node.child_by_field_name("name")
                 if fn_name_node:
-                    functions.append(fn_name_node.text.decode("utf-8"))
-            elif node.type == "struct_item":
+                    functions.append(_node_text(fn_name_node))
+            elif node_type == "struct_item":
                 struct_name_node = node.child_by_field_name("name")
                 if struct_name_node:
-                    classes[struct_name_node.text.decode("utf-8")] = []
-            elif node.type == "impl_item":
+                    classes[_node_text(struct_name_node)] = []
+            elif node_type == "impl_item":
                 impl_type_node = node.child_by_field_name("type")
                 if impl_type_node:
-                    impl_name = impl_type_node.text.decode("utf-8")
-                    classes.setdefault(impl_name, [])
-                    for child in node.children:
-                        if child.type == "function_item":
-                            method_node = child.child_by_field_name("name")
-                            if method_node:
-                                classes[impl_name].append(method_node.text.decode("utf-8"))
-            for child in node.children:
-                _traverse(child)
-
-        _traverse(tree.root_node)
+                    methods = classes.setdefault(_node_text(impl_type_node), [])
+                    methods.extend(_member_names(node.child_by_field_name("body"), "function_item"))
+
         complexity = len(functions) + sum(len(m) for m in classes.values())
         return {
             "language": ".rs",
@@ -175,58 +458,85 @@ class LanguageAnalyzer:
             "classes": classes,
             "routes": [],
             "complexity": complexity,
+            "imports": _unique(imports),
         }
 
+    @classmethod
+    def _rust_use_paths(cls, node, prefix: str = "") -> list:
+        """Flatten a ``use`` argument: ``a::{b, c::d as e}`` -> ``a::b``, ``a::c::d``."""
+        if node is None:
+            return []
+        node_type = node.type
+        if node_type in _RUST_PATH_NODES:
+            return [prefix + _node_text(node)]
+        if node_type == "use_as_clause":
+            return cls._rust_use_paths(node.child_by_field_name("path"), prefix)
+        if node_type == "use_wildcard":
+            return [prefix + _node_text(node).rstrip("*").rstrip(":")]
+        if node_type == "scoped_use_list":
+            path_node = node.child_by_field_name("path")
+            if path_node is not None:
+                prefix = f"{prefix}{_node_text(path_node)}::"
+            return cls._rust_use_paths(node.child_by_field_name("list"), prefix)
+        if node_type == "use_list":
+            paths = []
+            for child in node.named_children:
+                paths.extend(cls._rust_use_paths(child, prefix))
+            return paths
+        return []
+
     # -------- JavaScript/TypeScript ---------
-    def _analyze_javascript(self, source_code: str) -> Dict:
-        if not self.js_parser:
+    def _analyze_javascript(
+        self,
+        source_code: str,
+        parser=None,
+        max_nodes: Optional[int] = None,
+        deadline: Optional[float] = None,
+        grammar: str = "javascript",
+    ) -> Dict:
+        parser = parser or self.js_parser
+        if not parser:
             return {"language": ".js", "functions": [], "classes": {}, "routes": [], "complexity": 0}
-        tree = self.js_parser.parse(bytes(source_code, "utf-8"))
-        root = tree.root_node
+        tree = parser.parse(bytes(source_code, "utf-8"))
+        _check_limits(0, None, deadline)
         functions = []
         classes = {}
         routes = []
+        imports = []
 
-        def get_node_text(node):
-            return node.text.decode("utf-8")
-
-        def _traverse(node):
-            if node.type == "function_declaration":
+        query = self.parser_pool.query(grammar, _JS_EXTRACTED_NODES)
+        for node in _extracted_nodes(tree, query, max_nodes, deadline):
+            node_type = node.type
+            if node_type in ("import_statement", "export_statement"):
+                source_node = node.child_by_field_name("source")
+                if source_node is not None:
+                    imports.append(_node_text(source_node).strip("\"'`"))
+            elif node_type == "function_declaration":
                 name_node = node.child_by_field_name("name")
                 if name_node:
-                    functions.append(get_node_text(name_node))
-            elif node.type == "class_declaration":
+                    functions.append(_node_text(name_node))
+            elif node_type == "class_declaration":
                 name_node = node.child_by_field_name("name")
                 if name_node:
-                    cls_name = get_node_text(name_node)
-                    classes[cls_name] = []
-            elif node.type == "lexical_declaration":
-                for child in node.children:
+                    classes[_node_text(name_node)] = _member_names(
+                        node.child_by_field_name("body"), "method_definition"
+                    )
+            elif node_type == "lexical_declaration":
+                for child in node.named_children:
                     if child.type == "variable_declarator":
                         name_node = child.child_by_field_name("name")
                         value_node = child.child_by_field_name("value")
                         if name_node and value_node and value_node.type == "arrow_function":
-                            functions.append(get_node_text(name_node))
-            elif node.type == "call_expression":
-                if node.child_count >= 2:
-                    callee_node = node.child_by_field_name("function")
-                    args_node = node.child_by_field_name("arguments")
-                    if callee_node:
-                        callee_text = get_node_text(callee_node)
-                        parts = callee_text.split(".")
-                        if len(parts) == 2:
-                            obj, method = parts
-                            if method.lower() in {"get", "post", "put", "delete", "patch"}:
-                                path_str = "/unknown"
-                                if args_node and args_node.child_count > 0:
-                                    first_arg = args_node.child(0)
-                                    if first_arg.type == "string":
-                                        path_str = get_node_text(first_arg).strip('"\'')
-                                routes.append({"object": obj, "method": method.upper(), "path": path_str})
-            for child in node.children:
-                _traverse(child)
-
-        _traverse(root)
+                            functions.append(_node_text(name_node))
+            elif node_type == "call_expression":
+                specifier = self._js_dynamic_import(node)
+                if specifier:
+                    imports.append(specifier)
+                    continue
+                route = self._js_route(node)
+                if route:
+                    routes.append(route)
+
         complexity = len(functions) + sum(len(v) for v in classes.values())
         return {
             "language": ".js",
@@ -234,4 +544,45 @@ class LanguageAnalyzer:
             "classes": classes,
             "routes": routes,
             "complexity": complexity,
+            "imports": _unique(imports),
         }
+
+    @staticmethod
+    def _js_dynamic_import(node) -> Optional[str]:
+        """The specifier of ``require("x")`` or ``import("x")``, if ``node`` is one."""
+        callee_node = node.child_by_field_name("function")
+        if callee_node is None or callee_node.type not in ("identifier", "import"):
+            return None
+        if callee_node.type == "identifier" and _node_text(callee_node) != "require":
+            return None
+        args_node = node.child_by_field_name("arguments")
+        if args_node is None or args_node.named_child_count == 0:
+            return None
+        first_arg = args_node.named_child(0)
+        if first_arg.type != "string":
+            return None
+        return _node_text(first_arg).strip("\"'")
+
+    @staticmethod
+    def _js_route(node) -> Optional[Dict]:
+        # Only `obj.method(...)` callees can be routes; check the short property
+        # name before decoding anything else, since callees may span whole bundles.
+        callee_node = node.child_by_field_name("function")
+        if callee_node is None or callee_node.type != "member_expression":
+            return None
+        property_node = callee_node.child_by_field_name("property")
+        if property_node is None or property_node.end_byte - property_node.start_byte > 6:
+            return None
+        method = _node_text(property_node)
+        if method.lower() not in _JS_ROUTE_METHODS:
+            return None
+        obj = _node_text(callee_node.child_by_field_name("object"))
+        if "." in obj:
+            return None
+        path_str = "/unknown"
+        args_node = node.child_by_field_name("arguments")
+        if args_node is not None and args_node.named_child_count > 0:
+            first_arg = args_node.named_child(0)
+            if first_arg.type == "string":
+                path_str = _node_text(first_arg).strip("\"'")
+        return {"object": obj, "method": method.upper(), "path": path_str}
@@ -0,0 +1,189 @@
+"""Compact in-memory records for per-file analysis results.
+
+A scan keeps one result per file in memory. As plain dicts, every result
+holds its own copy of names that recur across files (``__init__``, ``run``,
+``GET``, "High complexity"...). :class:`FileAnalysis` stores the same data
+with ``__slots__``, tuples and interned strings, and shares its empty
+containers. Records read like the dicts they replace. They turn back into
+the JSON schema only when serialized, through :func:`json_default` or
+``to_dict()``.
+"""
+import sys
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Dict
+
+_intern = sys.intern
+_EMPTY_MAPPING = MappingProxyType({})
+_MISSING = object()
+
+
+def _names(values) -> tuple:
+    if not values:
+        return ()
+    return tuple(_intern(value) if type(value) is str else value for value in values)
+
+
+def _interned_dict(data: Mapping) -> Dict:
+    return {_intern(key): _intern(value) if type(value) is str else value for key, value in data.items()}
+
+
+def _plain(value):
+    if isinstance(value, tuple):
+        return list(value)
+    if isinstance(value, ClassInfo):
+        return value.to_dict()
+    return value
+
+
+class _SlotMapping(Mapping):
+    """Read access to set slots as mapping keys, plus equality with plain dicts."""
+
+    __slots__ = ()
+    FIELDS: tuple = ()
+
+    def __getitem__(self, key):
+        if key in self.FIELDS:
+            value = getattr(self, key, _MISSING)
+            if value is not _MISSING:
+                return value
+        raise KeyError(key)
+
+    def __iter__(self):
+        return (key for key in self.FIELDS if hasattr(self, key))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __eq__(self, other):
+        if isinstance(other, _SlotMapping):
+            other = other.to_dict()
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        return self.to_dict() == other
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def __reduce__(self):
+        # Rebuilt (and re-interned) in the receiving process.
+        return type(self).from_dict, (self.to_dict(),)
+
+
+class ClassInfo(_SlotMapping):
+    """A Python class entry; ``maturity`` and ``agent_type`` are set by categorization."""
+
+    FIELDS = ("methods", "docstring", "base_classes", "maturity", "agent_type")
+    __slots__ = FIELDS
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "ClassInfo":
+        info = cls.__new__(cls)
+        for key, value in data.items():
+            info[key] = value
+        return info
+
+    def __setitem__(self, key, value):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        if key in ("methods", "base_classes"):
+            value = _names(value)
+        elif key != "docstring" and type(value) is str:
+            value = _intern(value)
+        setattr(self, key, value)
+
+    def to_dict(self) -> Dict:
+        return {key: _plain(getattr(self, key)) for key in self}
+
+
+def _class_value(value):
+    if isinstance(value, ClassInfo):
+        return value
+    if isinstance(value, Mapping) and set(value) <= set(ClassInfo.FIELDS):
+        return ClassInfo.from_dict(value)
+    if isinstance(value, (list, tuple)):
+        return _names(value)
+    return value
+
+
+class FileAnalysis(_SlotMapping):
+    """One file's analysis. Keys outside the common schema (e.g. ``size``) are kept in ``extra``."""
+
+    FIELDS = ("language", "functions", "classes", "routes", "complexity", "lint", "imports")
+    __slots__ = FIELDS + ("extra",)
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "FileAnalysis":
+        record = cls.__new__(cls)
+        extra = None
+        for key, value in data.items():
+            if key in ("functions", "lint", "imports"):
+                value = _names(value)
+            elif key == "classes":
+                value = {_intern(name): _class_value(info) for name, info in value.items()} if value else _EMPTY_MAPPING
+            elif key == "routes":
+                value = tuple(_interned_dict(route) for route in value) if value else ()
+            elif key == "language":
+                value = _intern(value) if type(value) is str else value
+            elif key != "complexity":
+                extra = extra or {}
+                extra[key] = value
+                continue
+            setattr(record, key, value)
+        record.extra = extra
+        return record
+
+    def __getitem__(self, key):
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        return super().__getitem__(key)
+
+    def __iter__(self):
+        yield from super().__iter__()
+        if self.extra:
+            yield from self.extra
+
+    def to_dict(self) -> Dict:
+        data = {}
+        for key in self.FIELDS:
+            value = getattr(self, key, _MISSING)
+            if value is _MISSING:
+                continue
+            if key == "classes":
+                value = {name: _plain(info) for name, info in value.items()}
+            elif key == "routes":
+                value = [dict(route) for route in value]
+            data[key] = _plain(value)
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+
+def compact(result):
+    """``result`` as a :class:`FileAnalysis` (unchanged if it already is one, or is None)."""
+    if result is None or isinstance(result, FileAnalysis):
+        return result
+    return FileAnalysis.from_dict(result)
+
+
+def compact_hook(data: Dict):
+    """``object_hook`` for ``json.load``: result-shaped objects become records as they are decoded."""
+    if type(data.get("language")) is str and "complexity" in data:
+        return FileAnalysis.from_dict(data)
+    return data
+
+
+def plain(result):
+    """The JSON-schema dict for a record; anything else is returned unchanged."""
+    return result.to_dict() if isinstance(result, _SlotMapping) else result
+
+
+def json_default(value):
+    """``default=`` hook for ``json.dump``: serializes records and read-only mappings."""
+    if isinstance(value, _SlotMapping):
+        return value.to_dict()
+    if isinstance(value, Mapping):
+        return dict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -1,21 +1,156 @@
 import json
 import logging
+import os
 import re
+import tempfile
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .context_packs import MAX_TITLE_LENGTH, PACK_MODES, PackPlanner, TokenCounter
+from .records import json_default, plain
 
 logger = logging.getLogger(__name__)
 
+REPORT_FORMATS = ("json", "jsonl")
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+class ReportWriter:
+    """Streams report entries to a temporary file and renames it into place on success.
+
+    In ``json`` format the entries form one object (nested under ``entries_key``
+    when given); ``header`` and trailer keys sit alongside it. In ``jsonl`` format
+    the header, each ``{"path": ..., "analysis": ...}`` entry and the trailer are
+    written one record per line.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        report_format: str = "json",
+        indent: Optional[int] = None,
+        header: Optional[Dict] = None,
+        entries_key: Optional[str] = None,
+    ):
+        if report_format not in REPORT_FORMATS:
+            raise ValueError(f"Unknown report format {report_format!r}")
+        self.path = Path(path)
+        self.report_format = report_format
+        self.indent = None if report_format == "jsonl" else indent
+        self.header = header or {}
+        self.entries_key = entries_key
+        self.count = 0
+        self._file = None
+        self._tmp_path = None
+        self._first_key = True
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+    def open(self):
+        fd, tmp_name = tempfile.mkstemp(prefix=f".{self.path.name}.", suffix=".tmp", dir=self.path.parent)
+        self._tmp_path = Path(tmp_name)
+        self._file = os.fdopen(fd, "w", encoding="utf-8", buffering=WRITE_BUFFER_SIZE)
+        if self.report_format == "jsonl":
+            if self.header:
+                self._file.write(self._dumps(self.header) + "\n")
+            return
+        self._file.write("{")
+        for key, value in self.header.items():
+            self._write_member(key, value, 1)
+        if self.entries_key is not None:
+            self._write_key(self.entries_key, 1)
+            self._file.write("{")
+
+    def write_entry(self, path: str, analysis: Dict):
+        if self.report_format == "jsonl":
+            self._file.write(self._dumps({"path": path, "analysis": analysis}) + "\n")
+        elif self.entries_key is None:
+            self._write_member(path, analysis, 1)
+        else:
+            self._write_member(path, analysis, 2, first=self.count == 0)
+        self.count += 1
+
+    def write_entries(self, entries: Iterable[Tuple[str, Dict]]):
+        for path, analysis in entries:
+            self.write_entry(path, analysis)
+
+    def close(self, trailer: Optional[Dict] = None):
+        try:
+            if self.report_format == "jsonl":
+                if trailer:
+                    self._file.write(self._dumps(trailer) + "\n")
+            else:
+                if self.entries_key is not None:
+                    self._file.write(self._newline(1) if self.count else "")
+                    self._file.write("}")
+                for key, value in (trailer or {}).items():
+                    self._write_member(key, value, 1)
+                self._file.write(self._newline(0) + "}\n")
+            self._file.close()
+            os.replace(self._tmp_path, self.path)
+        except BaseException:
+            self.abort()
+            raise
+
+    def abort(self):
+        if self._file is not None and not self._file.closed:
+            self._file.close()
+        if self._tmp_path is not None and self._tmp_path.exists():
+            self._tmp_path.unlink()
+
+    # --- json formatting ---
+    def _dumps(self, value) -> str:
+        if self.indent is None:
+            return json.dumps(value, separators=(",", ":"), default=json_default)
+        return json.dumps(value, indent=self.indent, default=json_default)
+
+    def _newline(self, level: int) -> str:
+        return "" if self.indent is None else "\n" + " " * (self.indent * level)
+
+    def _write_key(self, key: str, level: int, first: Optional[bool] = None):
+        if first is None:
+            first, self._first_key = self._first_key, False
+        separator = ": " if self.indent is not None else ":"
+        self._file.write(("" if first else ",") + self._newline(level) + json.dumps(key) + separator)
+
+    def _write_member(self, key: str, value, level: int, first: Optional[bool] = None):
+        self._write_key(key, level, first)
+        text = self._dumps(value)
+        if self.indent is not None:
+            # JSON strings never contain raw newlines, so re-indenting is safe.
+            text = text.replace("\n", self._newline(level))
+        self._file.write(text)
+
 class ReportGenerator:
-    """Handles merging new analysis with old reports."""
+    """Writes analysis reports and derived artifacts."""
 
-    def __init__(self, project_root: Path, analysis: Dict[str, Dict], output_dir: Path | None = None):
+    def __init__(
+        self,
+        project_root: Path,
+        analysis: Dict[str, Dict],
+        output_dir: Path | None = None,
+        report_format: str = "json",
+        indent: Optional[int] = 4,
+    ):
         self.project_root = Path(project_root).resolve()
         self.output_dir = Path(output_dir).resolve() if output_dir else self.project_root
         self.analysis = analysis
+        self.report_format = report_format
+        self.indent = indent
         name = re.sub(r"[^A-Za-z0-9_.-]", "_", self.project_root.name)
-        self.analysis_file = f"project_analysis_{name}.json"
-        self.context_file = f"chatgpt_project_context_{name}.json"
+        self.analysis_file = f"project_analysis_{name}.{report_format}"
+        self.context_file = f"chatgpt_project_context_{name}.{report_format}"
+        self.store_file = f"project_analysis_{name}.sqlite"
+        self.context_packs_dir = f"chatgpt_project_context_{name}_packs"
+        self.store = None
 
     # --- helper methods ---
     def load_existing_report(self, report_path: Path) -> Dict:
@@ -27,17 +162,33 @@ class ReportGenerator:
                 pass
         return {}
 
+    def report_writer(self):
+        """Writer for the analysis report: the SQLite store when configured, else a file."""
+        if self.store is not None:
+            return self.store.report_writer()
+        return ReportWriter(self.output_dir / self.analysis_file, self.report_format, self.indent)
+
     def save_report(self):
-        report_path = self.output_dir / self.analysis_file
-        existing_report = self.load_existing_report(report_path)
-        merged = {**existing_report, **self.analysis}
         try:
-            with report_path.open("w", encoding="utf-8") as f:
-                json.dump(merged, f, indent=4)
-            logger.info("✅ Merged analysis saved to: %s", report_path)
+            with self.report_writer() as writer:
+                writer.write_entries(self.analysis.items())
+            logger.info("✅ Analysis saved to: %s", writer.path)
         except Exception as exc:  # pragma: no cover
             logger.error("❌ Error writing analysis report: %s", exc)
 
+    def update_report(self, updated: Dict[str, Dict], removed: Iterable[str] = ()):
+        """Apply a small change set: upsert/drop rows in the store, else rewrite the report."""
+        if self.store is None:
+            self.save_report()
+            return
+        try:
+            changed = sum(self.store.write_analysis(path, analysis) for path, analysis in updated.items())
+            dropped = self.store.drop_analysis(removed)
+            self.store.results.clear_pending()
+            logger.info("🗄️  Store updated: %s changed, %s removed rows.", changed, dropped)
+        except Exception as exc:  # pragma: no cover
+            logger.error("❌ Error updating analysis store: %s", exc)
+
     def generate_init_files(self, overwrite: bool = True):
         for file, result in self.analysis.items():
             if result.get("language") != ".py":
@@ -67,17 +218,16 @@ class ReportGenerator:
     def export_chatgpt_context(self, template_path: str = None, output_path: str | None = None):
         context_path = self.output_dir / (output_path or self.context_file)
         if template_path is None:
-            existing_context = self.load_existing_chatgpt_context(context_path)
-            payload = {
+            header = {
                 "project_root": str(self.project_root),
                 "num_files_analyzed": len(self.analysis),
-                "analysis_details": self.analysis,
             }
-            merged = {**existing_context, **payload}
             try:
-                with context_path.open("w", encoding="utf-8") as f:
-                    json.dump(merged, f, indent=4)
-                logger.info("✅ Merged ChatGPT context saved to: %s", context_path)
+                with ReportWriter(
+                    context_path, self.report_format, self.indent, header=header, entries_key="analysis_details"
+                ) as writer:
+                    writer.write_entries(self.analysis.items())
+                logger.info("✅ ChatGPT context saved to: %s", context_path)
             except Exception as exc:  # pragma: no cover
                 logger.error("❌ Error writing ChatGPT context: %s", exc)
             return
@@ -89,7 +239,7 @@ class ReportGenerator:
             t = Template(template_content)
             context_dict = {
                 "project_root": str(self.project_root),
-                "analysis": self.analysis,
+                "analysis": {path: plain(result) for path, result in self.analysis.items()},
                 "num_files_analyzed": len(self.analysis),
             }
             rendered = t.render(context=context_dict)
@@ -100,3 +250,73 @@ class ReportGenerator:
             logger.error("⚠️ Jinja2 not installed. Run `pip install jinja2` and re-try.")
         except Exception as exc:  # pragma: no cover
             logger.error("❌ Error rendering Jinja template: %s", exc)
+
+    def export_context_packs(
+        self,
+        budget: int,
+        counter: Optional[TokenCounter] = None,
+        mode: str = "package",
+        changed: Iterable[str] = (),
+        graph=None,
+        max_packs: Optional[int] = None,
+    ) -> Dict:
+        """Write the context as ranked packs of at most ``budget`` tokens each.
+
+        Packs go to ``context_packs_dir`` as ``pack_001.json``... (compact JSON,
+        shaped like the single-file context) with an ``index.json`` listing
+        each pack's files and token estimate. ``changed`` mode needs the
+        dependency ``graph``. Returns the index.
+        """
+        if mode not in PACK_MODES:
+            raise ValueError(f"Unknown pack mode {mode!r}; expected one of {', '.join(PACK_MODES)}")
+        if mode == "changed" and graph is None:
+            raise ValueError("Packing by relevance to changed files needs the dependency graph")
+        counter = counter or TokenCounter()
+        changed = sorted(changed)
+        sample_header = self._pack_header(99_999, 99_999, "x" * MAX_TITLE_LENGTH, budget)
+        header_tokens = counter.text(json.dumps({**sample_header, "analysis_details": {}}, separators=(",", ":")))
+        planner = PackPlanner(self.analysis, budget, counter, header_tokens)
+        packs = planner.by_package() if mode == "package" else planner.by_relevance(changed, graph)
+        omitted = packs[max_packs:] if max_packs else []
+        packs = packs[:max_packs] if max_packs else packs
+
+        directory = self.output_dir / self.context_packs_dir
+        directory.mkdir(parents=True, exist_ok=True)
+        for stale in directory.glob("pack_*.json"):
+            stale.unlink()
+        entries = []
+        for number, pack in enumerate(packs, 1):
+            file_name = f"pack_{number:03d}.json"
+            title = pack["title"]
+            tokens = pack["tokens"] + header_tokens
+            header = self._pack_header(number, len(packs), title, tokens)
+            with ReportWriter(directory / file_name, header=header, entries_key="analysis_details") as writer:
+                writer.write_entries((path, pack["records"].get(path, self.analysis[path])) for path in pack["files"])
+            entry = {"file": file_name, "title": title, "tokens": tokens, "files": pack["files"]}
+            if mode == "changed":
+                entry["distance"] = pack["distance"]
+            entries.append(entry)
+        index = {
+            "project_root": str(self.project_root),
+            "mode": mode,
+            "budget": budget,
+            "estimator": counter.estimator,
+            "changed": changed,
+            "packs": entries,
+            "summarized": planner.summarized,
+            "omitted_files": sum(len(pack["files"]) for pack in omitted),
+            "measured_files": counter.measured,
+        }
+        with (directory / "index.json").open("w", encoding="utf-8") as f:
+            json.dump(index, f, indent=self.indent)
+        logger.info("📦 %s context packs of up to %s tokens saved to: %s", len(entries), budget, directory)
+        return index
+
+    def _pack_header(self, number: int, count: int, title: str, tokens: int) -> Dict:
+        return {
+            "project_root": str(self.project_root),
+            "pack": number,
+            "packs": count,
+            "title": title,
+            "tokens": tokens,
+        }
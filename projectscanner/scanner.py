@@ -1,26 +1,107 @@
 import json
 import logging
 import os
+import queue
 import threading
+import time
 from pathlib import Path
-from typing import Dict, Optional, Union
+from typing import Dict, Iterator, Optional, Tuple, Union
 
-from .bots import MultibotManager
-from .file_processor import FileProcessor
-from .language_analyzer import LanguageAnalyzer
+from .bots import create_manager
+from .context_packs import TokenCounter
+from .dependency_graph import DependencyGraph
+from .file_processor import (
+    DEFAULT_HASH_ALGORITHM,
+    DEFAULT_MAX_AST_NODES,
+    DEFAULT_MAX_FILE_SIZE,
+    DEFAULT_MAX_PARSE_SECONDS,
+    FileProcessor,
+)
+from .git_index import DISCOVERY_MODES, GitIndex
+from .language_analyzer import LanguageAnalyzer, analyzer_fingerprint
+from .records import compact, compact_hook, plain
 from .report_generator import ReportGenerator
+from .shards import merge_fragments, shard_file_name, shard_of, validate_shard, write_fragment
+from .spill import SpillResults, dump_results
+from .stats import ScanStats
+from .store import STORAGE_BACKENDS, AnalysisStore
 
 CACHE_FILE = "dependency_cache.json"
+RESULT_CACHE_FILE = "analysis_cache.json"
+SOURCE_EXTENSIONS = frozenset({".py", ".rs", ".js", ".ts", ".tsx"})
+# Finished results buffered between the workers and an iter_scan consumer.
+RESULT_QUEUE_SIZE = 256
+_SCAN_DONE = object()
 logger = logging.getLogger(__name__)
 
 class ProjectScanner:
     """Main orchestrator for analyzing projects."""
 
-    def __init__(self, project_root: Union[str, Path] = ".", output_dir: Optional[Union[str, Path]] = None):
+    def __init__(
+        self,
+        project_root: Union[str, Path] = ".",
+        output_dir: Optional[Union[str, Path]] = None,
+        hash_algorithm: str = DEFAULT_HASH_ALGORITHM,
+        max_file_size: Optional[int] = DEFAULT_MAX_FILE_SIZE,
+        max_ast_nodes: Optional[int] = DEFAULT_MAX_AST_NODES,
+        max_parse_seconds: Optional[float] = DEFAULT_MAX_PARSE_SECONDS,
+        report_format: str = "json",
+        report_indent: Optional[int] = 4,
+        storage: str = "json",
+        discovery: str = "walk",
+        shard: Optional[Tuple[int, int]] = None,
+        spill_results: bool = False,
+    ):
         self.project_root = Path(project_root).resolve()
         self.output_dir = Path(output_dir).resolve() if output_dir else self.project_root
         self.analysis: Dict[str, Dict] = {}
+        self.moved_files: Dict[str, str] = {}
+        self.files_discovered = 0
+        self.report_generator = ReportGenerator(
+            self.project_root,
+            self.analysis,
+            self.output_dir,
+            report_format=report_format,
+            indent=report_indent,
+        )
+        self.store = None
+        self.shard = tuple(shard) if shard else None
+        if self.shard:
+            validate_shard(self.shard)
+            if storage != "json":
+                raise ValueError("Sharded scans write JSON fragments; use storage='json'")
+            self.fragment_file = self.output_dir / shard_file_name(
+                f"{Path(self.report_generator.analysis_file).stem}.json", self.shard
+            )
+        self.spill_results = spill_results
+        # update_files categorizes re-analyzed files before writing them (set by watch mode).
+        self.categorize_updates = False
+        self.cache_file = Path(shard_file_name(CACHE_FILE, self.shard))
+        self.result_cache_file = Path(shard_file_name(RESULT_CACHE_FILE, self.shard))
+        if storage == "sqlite":
+            self.store = AnalysisStore(self.output_dir / self.report_generator.store_file)
+            self.report_generator.store = self.store
+        elif storage not in STORAGE_BACKENDS:
+            raise ValueError(f"Unknown storage {storage!r}; expected one of {', '.join(STORAGE_BACKENDS)}")
+        self.git_index = None
+        self._git_renames: Dict[str, str] = {}
+        if discovery == "git":
+            self.git_index = GitIndex.open(self.project_root)
+            if self.git_index is None:
+                logger.warning("⚠️ %s is not a git work tree; walking it instead.", self.project_root)
+            else:
+                hash_algorithm = self.git_index.hash_algorithm
+        elif discovery not in DISCOVERY_MODES:
+            raise ValueError(f"Unknown discovery {discovery!r}; expected one of {', '.join(DISCOVERY_MODES)}")
+        self.stats = ScanStats()
+        self.profiler = None
+        self._dependency_graph: Optional[DependencyGraph] = None
+        started = time.perf_counter()
         self.cache = self.load_cache()
+        self.result_cache = self.load_result_cache()
+        if self.store:
+            self.store.results.entries = self.cache
+        self._cache_load_seconds = time.perf_counter() - started
         self.cache_lock = threading.Lock()
         self.additional_ignore_dirs = set()
         self.language_analyzer = LanguageAnalyzer()
@@ -29,12 +110,19 @@ class ProjectScanner:
             self.cache,
             self.cache_lock,
             self.additional_ignore_dirs,
+            self.result_cache,
+            hash_algorithm=hash_algorithm,
+            max_file_size=max_file_size,
+            max_ast_nodes=max_ast_nodes,
+            max_parse_seconds=max_parse_seconds,
         )
-        self.report_generator = ReportGenerator(self.project_root, self.analysis, self.output_dir)
+        self.file_processor.stats = self.stats
 
     # --- Cache helpers ---
     def load_cache(self) -> Dict:
-        cache_path = Path(CACHE_FILE)
+        if self.store:
+            return self.store.load_entries()
+        cache_path = self.cache_file
         if cache_path.exists():
             try:
                 with cache_path.open("r", encoding="utf-8") as f:
@@ -43,83 +131,423 @@ class ProjectScanner:
                 return {}
         return {}
 
+    def load_result_cache(self) -> Dict:
+        """Load cached analysis results keyed by content hash.
+
+        Results written by a different analyzer version are discarded. With
+        ``spill_results`` they stay on disk and are read back on demand.
+        """
+        if self.store:
+            return self.store.results
+        if self.spill_results:
+            return SpillResults(self.result_cache_file, analyzer_fingerprint())
+        cache_path = self.result_cache_file
+        if cache_path.exists():
+            try:
+                with cache_path.open("r", encoding="utf-8") as f:
+                    # Results become records while decoding, so no plain copy is held alongside them.
+                    data = json.load(f, object_hook=compact_hook)
+            except json.JSONDecodeError:
+                return {}
+            if data.get("analyzer") == analyzer_fingerprint():
+                return data.get("results", {})
+        return {}
+
     def save_cache(self):
-        cache_path = Path(CACHE_FILE)
-        with cache_path.open("w", encoding="utf-8") as f:
+        if self.store:
+            self.store.save_entries(self.cache)
+            return
+        with self.cache_file.open("w", encoding="utf-8") as f:
             json.dump(self.cache, f, indent=4)
 
+        live_hashes = {entry.get("hash") for entry in self.cache.values()}
+        if isinstance(self.result_cache, SpillResults):
+            self.result_cache.save(live_hashes)
+            return
+        for stale_hash in set(self.result_cache) - live_hashes:
+            del self.result_cache[stale_hash]
+        dump_results(self.result_cache_file, analyzer_fingerprint(), self.result_cache)
+
+    @property
+    def dependency_graph(self) -> DependencyGraph:
+        """Import graph over the cached files, built from cached results on first use.
+
+        Once built it is kept current by scans and :meth:`update_files`, one
+        file's edges at a time.
+        """
+        if self._dependency_graph is None:
+            with self.cache_lock:
+                entries = [(path, entry.get("hash")) for path, entry in self.cache.items()]
+            analysis = {}
+            for path, file_hash in entries:
+                result = self.result_cache.get(file_hash) if file_hash else None
+                if result is not None:
+                    analysis[path] = result
+            self._dependency_graph = DependencyGraph.from_analysis(analysis)
+        return self._dependency_graph
+
+    def affected_files(self, paths) -> list:
+        """Relative ``paths`` plus every cached file that imports them, directly or transitively."""
+        return self.dependency_graph.affected(paths)
+
     # --- Main scanning ---
-    def scan_project(self, progress_callback: Optional[callable] = None):
-        logger.info("🔍 Scanning project: %s ...", self.project_root)
-        file_extensions = {".py", ".rs", ".js", ".ts"}
-        valid_files = []
-        for root, dirs, files in os.walk(self.project_root):
-            root_path = Path(root)
-            if self.file_processor.should_exclude(root_path):
-                continue
-            for file in files:
-                file_path = root_path / file
-                if file_path.suffix.lower() in file_extensions and not self.file_processor.should_exclude(file_path):
-                    valid_files.append(file_path)
+    def scan_project(
+        self,
+        progress_callback: Optional[callable] = None,
+        backend: str = "threads",
+        num_workers: Optional[int] = None,
+        chunk_size: int = 32,
+        pipelined: bool = True,
+        result_callback: Optional[callable] = None,
+        keep_results: bool = True,
+    ):
+        """Discover, analyze and report on the project's source files.
+
+        ``progress_callback(percent)`` fires as each file finishes, relative to
+        the files discovered so far, and ``result_callback(path, analysis)``
+        receives every result. With ``keep_results=False`` results are written
+        straight into the report instead of being held in ``self.analysis``.
+        A sharded scanner writes its shard fragment instead of the report.
+        """
+        if self.shard and not keep_results:
+            raise ValueError("Sharded scans keep results in memory to write their fragment")
+        started = time.perf_counter()
+        self.analysis.clear()
+        writer = None if keep_results else self.report_generator.report_writer()
+        if writer:
+            writer.open()
+        processed_count = 0
+        try:
+            for file_path, analysis_result in self.iter_scan(backend, num_workers, chunk_size, pipelined):
+                processed_count += 1
+                if writer:
+                    with self.stats.phase("report write"):
+                        writer.write_entry(file_path, analysis_result)
+                else:
+                    self.analysis[file_path] = analysis_result
+                if result_callback:
+                    result_callback(file_path, analysis_result)
+                if progress_callback:
+                    progress_callback(int(processed_count / max(self.files_discovered, 1) * 100))
+        except BaseException:
+            if writer:
+                writer.abort()
+            raise
+
+        with self.stats.phase("report write"):
+            if writer:
+                writer.close()
+            elif self.shard:
+                self.write_shard_fragment()
+            else:
+                self.report_generator.save_report()
+        self.stats.wall_seconds = time.perf_counter() - started
+        logger.info("✅ Scan complete.")
+
+    def iter_scan(
+        self,
+        backend: str = "threads",
+        num_workers: Optional[int] = None,
+        chunk_size: int = 32,
+        pipelined: bool = True,
+    ) -> Iterator[Tuple[str, Dict]]:
+        """Yield ``(relative_path, analysis)`` as each file finishes.
 
-        total_files = len(valid_files)
-        logger.info("📝 Found %s valid files for analysis.", total_files)
+        Discovery and analysis run on a producer thread. Results pass through a
+        bounded queue, so a slow consumer throttles the workers, and nothing is
+        retained once yielded. When the iterator is exhausted the cache is
+        reconciled (moves, deletions) and saved.
 
+        With ``pipelined`` (the default) files are handed to the workers as the
+        walk finds them; otherwise the whole tree is walked first.
+        """
+        logger.info("🔍 Scanning project: %s ...", self.project_root)
+        started = time.perf_counter()
+        stats = self.stats = self.file_processor.stats = ScanStats(self.stats.slowest_limit)
+        stats.add_phase("cache load", self._cache_load_seconds)
+        self._cache_load_seconds = 0.0
+        log_files = logger.isEnabledFor(logging.DEBUG)
         previous_files = set(self.cache.keys())
-        current_files = {str(f.relative_to(self.project_root)) for f in valid_files}
-        moved_files = {}
-        missing_files = previous_files - current_files
+        current_files = set()
+        graph = self._dependency_graph
+        results = queue.Queue(maxsize=RESULT_QUEUE_SIZE)
+        cancelled = threading.Event()
+        errors = []
+        self.files_discovered = 0
 
-        for old_path in previous_files:
-            old_hash = self.cache.get(old_path, {}).get("hash")
-            if not old_hash:
-                continue
-            for new_path in current_files:
-                new_file = self.project_root / new_path
-                if self.file_processor.hash_file(new_file) == old_hash:
-                    moved_files[old_path] = new_path
+        def put(item):
+            while not cancelled.is_set():
+                try:
+                    results.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+        def deliver(file_path, result):
+            if log_files:
+                logger.debug("Processed: %s", file_path)
+            if result is not None:
+                put(result)
+
+        def produce():
+            try:
+                self._run_workers(current_files, deliver, cancelled, backend, num_workers, chunk_size, pipelined)
+            except BaseException as exc:  # pragma: no cover - re-raised in the consumer
+                errors.append(exc)
+            finally:
+                put(_SCAN_DONE)
+
+        producer = threading.Thread(target=produce, name="scan-producer", daemon=True)
+        producer.start()
+        try:
+            while True:
+                item = results.get()
+                if item is _SCAN_DONE:
                     break
+                if graph is not None:
+                    graph.update(item[0], item[1].get("imports"))
+                yield item
+        finally:
+            cancelled.set()
+            producer.join()
+        if errors:
+            raise errors[0]
 
-        for missing_file in missing_files:
-            if missing_file not in moved_files:
-                with self.cache_lock:
-                    self.cache.pop(missing_file, None)
+        if pipelined:
+            logger.info("📝 Found %s valid files for analysis.", len(current_files))
+        rename_started = time.perf_counter()
+        with self.cache_lock:
+            missing_entries = {path: self.cache.pop(path) for path in previous_files - current_files}
+        self.moved_files = {
+            old_path: new_path
+            for old_path, new_path in self._git_renames.items()
+            if old_path in missing_entries and new_path in current_files
+        }
+        for old_path in self.moved_files:
+            del missing_entries[old_path]
+        new_files = current_files - previous_files - set(self.moved_files.values())
+        self.moved_files.update(self._detect_moves(missing_entries, new_files))
+        stats.add_phase("rename detection", time.perf_counter() - rename_started)
+        if graph is not None:
+            for old_path in previous_files - current_files:
+                graph.remove(old_path)
+        stats.count("moved", len(self.moved_files))
+        if self.moved_files:
+            logger.info("🚚 Detected %s moved files.", len(self.moved_files))
+        with stats.phase("cache save"):
+            self.save_cache()
+        stats.wall_seconds = time.perf_counter() - started
 
-        for old_path, new_path in moved_files.items():
-            with self.cache_lock:
-                self.cache[new_path] = self.cache.pop(old_path)
+    def _run_workers(self, current_files, status_callback, cancelled, backend, num_workers, chunk_size, pipelined):
+        self.file_processor.additional_ignore_dirs = self.additional_ignore_dirs
+        if self.git_index:
+            discovered = self._git_files()
+        else:
+            discovered = ((path, None) for path in self.file_processor.walk_files(SOURCE_EXTENSIONS))
+        discovered = self._timed_discovery(discovered)
+        if pipelined:
+            discovered = ((file_path, blob_id, None) for file_path, blob_id in discovered)
+        else:
+            discovered = self._largest_first(list(discovered))
+            logger.info("📝 Found %s valid files for analysis.", len(discovered))
 
-        logger.info("⏱️  Processing files asynchronously...")
-        num_workers = os.cpu_count() or 4
-        manager = MultibotManager(
+        logger.info("⏱️  Processing files asynchronously (%s backend)...", backend)
+        manager = create_manager(
+            backend,
             scanner=self,
-            num_workers=num_workers,
-            status_callback=lambda fp, res: logger.info("Processed: %s", fp),
+            num_workers=num_workers or os.cpu_count() or 4,
+            status_callback=status_callback,
+            chunk_size=chunk_size,
+            cancelled=cancelled,
         )
-        for file_path in valid_files:
-            manager.add_task(file_path)
-        manager.wait_for_completion()
-        manager.stop_workers()
+        try:
+            for file_path, blob_id, signature in discovered:
+                if cancelled.is_set():
+                    break
+                relative_path = str(file_path.relative_to(self.project_root))
+                if self.shard and shard_of(relative_path, self.shard[1]) != self.shard[0]:
+                    continue
+                current_files.add(relative_path)
+                self.files_discovered += 1
+                hit = self.file_processor.hash_hit(relative_path, blob_id) if blob_id else None
+                if hit is not None:
+                    status_callback(file_path, hit)
+                else:
+                    manager.add_task(file_path, signature)
+            if not cancelled.is_set():
+                manager.wait_for_completion()
+        finally:
+            manager.stop_workers()
+            self.stats.count("discovered", self.files_discovered)
 
-        processed_count = 0
-        for result in manager.results_list:
-            processed_count += 1
-            if progress_callback:
-                percent = int((processed_count / total_files) * 100)
-                progress_callback(percent)
-            if result is not None:
-                file_path, analysis_result = result
-                self.analysis[file_path] = analysis_result
+    def _largest_first(self, discovered: list) -> list:
+        """Stat every discovered file and order them by size, largest first.
+
+        Items become ``(path, blob_id, signature)``; git blob hits are not
+        read, so they are not stat'ed and go first. Starting the big files
+        early keeps them from being the last thing a scan waits on.
+        """
+        stat_signature = self.file_processor.stat_signature
+        with self.stats.phase("scheduling"):
+            items = [
+                (file_path, blob_id, None if blob_id else stat_signature(file_path))
+                for file_path, blob_id in discovered
+            ]
+        items.sort(key=lambda item: item[2]["size"] if item[2] else 0, reverse=True)
+        return items
+
+    def _timed_discovery(self, discovered):
+        """Yield from ``discovered``, charging the time spent producing items to "discovery"."""
+        iterator = iter(discovered)
+        clock = time.perf_counter
+        elapsed = 0.0
+        try:
+            while True:
+                started = clock()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    elapsed += clock() - started
+                yield item
+        finally:
+            self.stats.add_phase("discovery", elapsed)
+
+    def _git_files(self) -> Iterator[Tuple[Path, Optional[str]]]:
+        """Yield ``(path, blob_id)`` for candidate files listed by git, blob_id None when dirty."""
+        files, self._git_renames = self.git_index.files()
+        matcher = self.file_processor.compile_exclusions()
+        for relative_path, blob_id in files.items():
+            if os.path.splitext(relative_path)[1].lower() not in SOURCE_EXTENSIONS:
+                continue
+            file_path = self.project_root / relative_path
+            if not matcher.excludes(file_path):
+                yield file_path, blob_id
+
+    # --- sharding ---
+    def write_shard_fragment(self) -> str:
+        """Write this shard's analysis and cache entries to ``fragment_file``."""
+        with self.cache_lock:
+            cache = dict(self.cache)
+        digest = write_fragment(
+            self.fragment_file,
+            self.project_root.name,
+            self.shard,
+            analyzer_fingerprint(),
+            self.file_processor.hash_algorithm,
+            self.analysis,
+            cache,
+        )
+        logger.info(
+            "🧩 Shard %s/%s: %s files written to %s (digest %s)",
+            *self.shard,
+            len(self.analysis),
+            self.fragment_file,
+            digest[:12],
+        )
+        return digest
+
+    def merge_shards(self, fragment_paths, allow_partial: bool = False) -> Dict:
+        """Merge shard fragments into this scanner's analysis, report and caches.
 
+        Returns the merge summary; its ``digest`` is the same whatever order
+        the fragments are given in.
+        """
+        merged = merge_fragments(fragment_paths, allow_partial=allow_partial)
+        if merged["project"] != self.project_root.name:
+            logger.warning("⚠️ Fragments were scanned from %r, merging into %s", merged["project"], self.project_root)
+        seed_caches = (
+            merged["analyzer"] == analyzer_fingerprint()
+            and merged["hash_algorithm"] == self.file_processor.hash_algorithm
+        )
+        if not seed_caches:
+            logger.warning("⚠️ Fragments used a different analyzer or hash; caches are not seeded.")
+        self.analysis.clear()
+        self._dependency_graph = None
+        with self.cache_lock:
+            if seed_caches and not merged["missing"]:
+                self.cache.clear()  # the fragments cover the whole project
+            for file_path, record in merged["files"].items():
+                analysis = self.analysis[file_path] = compact(record["analysis"])
+                file_hash = record["cache"].get("hash")
+                if seed_caches and file_hash:
+                    self.cache[file_path] = record["cache"]
+                    if "skipped" not in analysis:  # limit records are never served from the cache
+                        self.result_cache[file_hash] = analysis
+        if seed_caches:
+            self.save_cache()
         self.report_generator.save_report()
-        self.save_cache()
         logger.info(
-            "✅ Scan complete. Results merged into %s",
-            self.output_dir / self.report_generator.analysis_file,
+            "🧩 Merged %s files from %s shards (digest %s).", len(self.analysis), merged["shards"], merged["digest"]
         )
+        return {key: value for key, value in merged.items() if key != "files"}
+
+    def update_files(self, changed_paths, removed_paths=(), save_cache: bool = True) -> Dict[str, Dict]:
+        """Re-analyze ``changed_paths`` and drop ``removed_paths`` (relative) in place.
+
+        Only the given files are read; the report is then rewritten from the
+        in-memory analysis (or, with the SQLite store, just the touched rows).
+        With ``categorize_updates`` set, the updated files are categorized
+        before that single write.
+        """
+        removed = []
+        with self.cache_lock:
+            for rel_path in removed_paths:
+                if self.cache.pop(rel_path, None) is not None or rel_path in self.analysis:
+                    removed.append(rel_path)
+        graph = self._dependency_graph
+        for rel_path in removed:
+            self.analysis.pop(rel_path, None)
+            if graph is not None:
+                graph.remove(rel_path)
+
+        updated = {}
+        for file_path in changed_paths:
+            result = self._process_file(Path(file_path))
+            if result is not None:
+                rel_path, analysis_result = result
+                self.analysis[rel_path] = analysis_result
+                updated[rel_path] = analysis_result
+                if graph is not None:
+                    graph.update(rel_path, analysis_result.get("imports"))
+        if updated and self.categorize_updates:
+            self.categorize_agents(updated)
+            updated = {rel_path: self.analysis[rel_path] for rel_path in updated}
+        if updated or removed:
+            self.report_generator.update_report(updated, removed)
+            if save_cache:
+                self.save_cache()
+        return updated
+
+    def _detect_moves(self, missing_entries: Dict[str, Dict], new_files: set) -> Dict[str, str]:
+        """Pair vanished cache entries with new files of identical content.
+
+        New files were hashed by the processing pass, so their hashes are read
+        from the cache. Duplicate-content files are paired in sorted path order.
+        """
+        old_by_hash: Dict[str, list] = {}
+        for old_path in sorted(missing_entries):
+            old_hash = missing_entries[old_path].get("hash")
+            if old_hash:
+                old_by_hash.setdefault(old_hash, []).append(old_path)
 
-    def _process_file(self, file_path: Path):
-        return self.file_processor.process_file(file_path, self.language_analyzer)
+        moved_files = {}
+        if not old_by_hash:
+            return moved_files
+        with self.cache_lock:
+            for new_path in sorted(new_files):
+                candidates = old_by_hash.get(self.cache.get(new_path, {}).get("hash"))
+                if candidates:
+                    moved_files[candidates.pop(0)] = new_path
+        return moved_files
+
+    def _process_file(self, file_path: Path, signature: Optional[Dict] = None):
+        if self.profiler is not None:
+            return self.profiler.call(
+                self.file_processor.process_file, file_path, self.language_analyzer, signature
+            )
+        return self.file_processor.process_file(file_path, self.language_analyzer, signature)
 
     # --- convenience methods ---
     def generate_init_files(self, overwrite: bool = True):
@@ -128,12 +556,40 @@ class ProjectScanner:
     def export_chatgpt_context(self, template_path: Optional[str] = None, output_path: Optional[str] = None):
         self.report_generator.export_chatgpt_context(template_path, output_path)
 
-    def categorize_agents(self):
-        for file_path, result in self.analysis.items():
-            if file_path.endswith(".py"):
-                for class_name, class_data in result.get("classes", {}).items():
-                    class_data["maturity"] = self._maturity_level(class_name, class_data)
-                    class_data["agent_type"] = self._agent_type(class_name, class_data)
+    def export_context_packs(self, budget: int, changed=None, max_packs: Optional[int] = None) -> Dict:
+        """Export the context as packs of at most ``budget`` tokens.
+
+        Packs follow the package layout, or with ``changed`` (relative paths)
+        hold the files nearest to them in the import graph. Token estimates
+        are kept on the cache entries, so unchanged files are measured once.
+        """
+        counter = TokenCounter(self.cache, self.cache_lock)
+        index = self.report_generator.export_context_packs(
+            budget,
+            counter,
+            mode="package" if changed is None else "changed",
+            changed=changed or (),
+            graph=None if changed is None else self.dependency_graph,
+            max_packs=max_packs,
+        )
+        if counter.measured:
+            self.save_cache()
+        return index
+
+    def categorize_agents(self, paths=None):
+        """Add maturity and agent type to the classes of ``paths`` (default: all) in ``self.analysis``.
+
+        Results are shared with the result cache, so categorized copies replace
+        them; the cache never records a categorization.
+        """
+        for file_path in self.analysis if paths is None else paths:
+            result = self.analysis.get(file_path)
+            if not file_path.endswith(".py") or not result or not result.get("classes"):
+                continue
+            result = self.analysis[file_path] = compact(plain(result))
+            for class_name, class_data in result["classes"].items():
+                class_data["maturity"] = self._maturity_level(class_name, class_data)
+                class_data["agent_type"] = self._agent_type(class_name, class_data)
 
     def _maturity_level(self, class_name: str, class_data: Dict[str, any]) -> str:
         score = 0
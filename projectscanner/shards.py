@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from .records import json_default
+
+SHARD_FORMAT = "projectscanner-shard"
+SHARD_FORMAT_VERSION = 1
+
+
+def parse_shard(text: str) -> Tuple[int, int]:
+    """Parse ``"K/N"`` (1-based) into ``(K, N)``."""
+    index, _, count = text.partition("/")
+    try:
+        shard = (int(index), int(count))
+    except ValueError:
+        raise ValueError(f"Invalid shard {text!r}; expected K/N, e.g. 3/16") from None
+    validate_shard(shard)
+    return shard
+
+
+def validate_shard(shard: Tuple[int, int]):
+    index, count = shard
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Invalid shard {index}/{count}; need 1 <= K <= N")
+
+
+def shard_of(relative_path: str, count: int) -> int:
+    """Stable 1-based shard for a project-relative path, the same on every machine."""
+    key = relative_path.replace(os.sep, "/").encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "big") % count + 1
+
+
+def shard_suffix(shard: Tuple[int, int]) -> str:
+    return f"shard-{shard[0]}-of-{shard[1]}"
+
+
+def shard_file_name(file_name: str, shard: Optional[Tuple[int, int]]) -> str:
+    """``dependency_cache.json`` -> ``dependency_cache.shard-3-of-16.json`` for shard 3/16."""
+    if not shard:
+        return file_name
+    stem, dot, suffix = file_name.rpartition(".")
+    return f"{stem}.{shard_suffix(shard)}{dot}{suffix}" if dot else f"{file_name}.{shard_suffix(shard)}"
+
+
+def files_digest(files: Dict[str, Dict]) -> str:
+    """Content digest of ``{path: {"cache": ..., "analysis": ...}}``, independent of key order."""
+    text = json.dumps(files, sort_keys=True, separators=(",", ":"), default=json_default)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def write_fragment(
+    path: Path,
+    project: str,
+    shard: Tuple[int, int],
+    analyzer: str,
+    hash_algorithm: str,
+    analysis: Dict[str, Dict],
+    cache: Dict[str, Dict],
+) -> str:
+    """Write one shard's analysis plus cache entries; returns the fragment digest."""
+    files = {
+        file_path: {"cache": cache.get(file_path, {}), "analysis": analysis[file_path]}
+        for file_path in sorted(analysis)
+    }
+    digest = files_digest(files)
+    fragment = {
+        "format": SHARD_FORMAT,
+        "version": SHARD_FORMAT_VERSION,
+        "project": project,
+        "shard": {"index": shard[0], "count": shard[1]},
+        "analyzer": analyzer,
+        "hash_algorithm": hash_algorithm,
+        "digest": digest,
+        "files": files,
+    }
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with tmp_path.open("w", encoding="utf-8") as f:
+        json.dump(fragment, f, separators=(",", ":"), default=json_default)
+    os.replace(tmp_path, path)
+    return digest
+
+
+def load_fragment(path: Path) -> Dict:
+    """Load a fragment, checking its format, digest and that every path belongs to its shard."""
+    with Path(path).open("r", encoding="utf-8") as f:
+        fragment = json.load(f)
+    if fragment.get("format") != SHARD_FORMAT or fragment.get("version") != SHARD_FORMAT_VERSION:
+        raise ValueError(f"{path} is not a version {SHARD_FORMAT_VERSION} shard fragment")
+    shard = (fragment["shard"]["index"], fragment["shard"]["count"])
+    validate_shard(shard)
+    if files_digest(fragment["files"]) != fragment["digest"]:
+        raise ValueError(f"{path}: digest mismatch, the fragment is corrupt or was edited")
+    strays = [file_path for file_path in fragment["files"] if shard_of(file_path, shard[1]) != shard[0]]
+    if strays:
+        raise ValueError(f"{path}: {len(strays)} files do not belong to shard {shard[0]}/{shard[1]}, e.g. {strays[0]}")
+    return fragment
+
+
+def merge_fragments(paths: Iterable[Path], allow_partial: bool = False) -> Dict:
+    """Combine shard fragments into ``{"files": ..., "digest": ..., ...}``.
+
+    All fragments must come from the same shard count, analyzer and hash
+    algorithm, and every shard must appear exactly once (unless
+    ``allow_partial``). The result is sorted by path, so it does not depend on
+    the order the fragments are given in.
+    """
+    fragments = [load_fragment(path) for path in paths]
+    if not fragments:
+        raise ValueError("No shard fragments to merge")
+    first = fragments[0]
+    count = first["shard"]["count"]
+    for key in ("project", "analyzer", "hash_algorithm"):
+        values = {fragment[key] for fragment in fragments}
+        if len(values) > 1:
+            raise ValueError(f"Fragments disagree on {key}: {', '.join(sorted(map(str, values)))}")
+    if {fragment["shard"]["count"] for fragment in fragments} != {count}:
+        raise ValueError("Fragments come from different shard counts")
+    indexes = sorted(fragment["shard"]["index"] for fragment in fragments)
+    duplicates = sorted({index for index in indexes if indexes.count(index) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate fragments for shards {duplicates}")
+    missing = sorted(set(range(1, count + 1)) - set(indexes))
+    if missing and not allow_partial:
+        raise ValueError(f"Missing fragments for shards {missing} of {count}")
+
+    files = {}
+    for fragment in sorted(fragments, key=lambda fragment: fragment["shard"]["index"]):
+        files.update(fragment["files"])
+    files = {file_path: files[file_path] for file_path in sorted(files)}
+    return {
+        "project": first["project"],
+        "analyzer": first["analyzer"],
+        "hash_algorithm": first["hash_algorithm"],
+        "shards": count,
+        "missing": missing,
+        "files": files,
+        "digest": files_digest(files),
+    }
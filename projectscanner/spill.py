@@ -0,0 +1,149 @@
+"""The JSON result cache, written one entry per line so it can be read lazily.
+
+``analysis_cache.json`` stays one JSON document::
+
+    {"analyzer": "...", "results": {
+    "<hash>": {...},
+    "<hash>": {...}
+    }}
+
+:class:`SpillResults` indexes that layout by byte offset instead of loading
+it, and appends new results to a temporary spill file, so a streaming scan
+holds one small index entry per file rather than every analysis.
+"""
+import json
+import os
+import tempfile
+import threading
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from .records import compact_hook, json_default
+
+_SEPARATORS = (",", ":")
+
+
+def _header(fingerprint: str) -> str:
+    return "{" + json.dumps("analyzer") + ": " + json.dumps(fingerprint) + ", " + json.dumps("results") + ": {\n"
+
+
+def _dumps(result) -> str:
+    return json.dumps(result, separators=_SEPARATORS, default=json_default)
+
+
+def write_result_cache(path: Path, fingerprint: str, items: Iterable[Tuple[str, str]]):
+    """Write ``(hash, result JSON)`` pairs in the line-per-entry layout."""
+    with Path(path).open("w", encoding="utf-8") as f:
+        f.write(_header(fingerprint))
+        first = True
+        for file_hash, text in items:
+            f.write(("" if first else ",\n") + json.dumps(file_hash) + ": " + text)
+            first = False
+        f.write("\n}}\n")
+
+
+def dump_results(path: Path, fingerprint: str, results: Dict):
+    """Write an in-memory result cache."""
+    write_result_cache(path, fingerprint, ((file_hash, _dumps(result)) for file_hash, result in results.items()))
+
+
+class SpillResults(MutableMapping):
+    """Result cache (hash -> analysis) kept on disk, with only byte offsets in memory.
+
+    Cached results are read back from ``analysis_cache.json`` and new ones
+    from a temporary spill file, decoded on each access.
+    """
+
+    def __init__(self, path: Path, fingerprint: str):
+        self.path = Path(path)
+        self.fingerprint = fingerprint
+        # hash -> (file, offset, length); file is the cache file or the spill file.
+        self._index: Dict[str, Tuple[object, int, int]] = {}
+        self._lock = threading.Lock()
+        self._cache_file = None
+        self._spill = tempfile.TemporaryFile()
+        self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        f = self.path.open("rb")
+        if f.readline().decode("utf-8", "replace") != _header(self.fingerprint):
+            f.close()
+            self._load_document()  # other analyzer (discarded) or an older single-line layout
+            return
+        self._cache_file = f
+        offset = f.tell()
+        for line in f:
+            end = offset + len(line)
+            line = line.rstrip(b"\r\n").rstrip(b",")
+            split = line.find(b'": ')
+            if split > 0 and line.startswith(b'"'):
+                start = split + 3
+                self._index[line[1:split].decode("ascii")] = (f, offset + start, len(line) - start)
+            offset = end
+
+    def _load_document(self):
+        try:
+            with self.path.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return
+        if data.get("analyzer") == self.fingerprint:
+            for file_hash, result in data.get("results", {}).items():
+                self[file_hash] = result
+
+    def _read(self, location) -> str:
+        f, offset, length = location
+        with self._lock:
+            f.seek(offset)
+            return f.read(length).decode("utf-8")
+
+    def __getitem__(self, file_hash):
+        location = self._index.get(file_hash) if file_hash else None
+        if location is None:
+            raise KeyError(file_hash)
+        return json.loads(self._read(location), object_hook=compact_hook)
+
+    def __setitem__(self, file_hash, result):
+        data = _dumps(result).encode("utf-8")
+        with self._lock:
+            self._spill.seek(0, os.SEEK_END)
+            offset = self._spill.tell()
+            self._spill.write(data)
+            self._index[file_hash] = (self._spill, offset, len(data))
+
+    def __delitem__(self, file_hash):
+        del self._index[file_hash]
+
+    def __contains__(self, file_hash) -> bool:
+        return file_hash in self._index
+
+    def __iter__(self):
+        return iter(list(self._index))
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def hashes(self) -> set:
+        return set(self._index)
+
+    def save(self, live_hashes: Optional[set] = None):
+        """Rewrite the cache file with the live results, copying their JSON text as is."""
+        hashes = [h for h in self._index if live_hashes is None or h in live_hashes]
+        tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        write_result_cache(tmp_path, self.fingerprint, ((h, self._read(self._index[h])) for h in hashes))
+        if self._cache_file is not None:
+            self._cache_file.close()
+        os.replace(tmp_path, self.path)
+        self._spill.close()
+        self._spill = tempfile.TemporaryFile()
+        self._index = {}
+        self._cache_file = None
+        self._load()
+
+    def close(self):
+        if self._cache_file is not None:
+            self._cache_file.close()
+        self._spill.close()
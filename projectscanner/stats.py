@@ -0,0 +1,210 @@
+import contextlib
+import heapq
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILERS = ("cprofile", "pyinstrument")
+DEFAULT_SLOWEST = 10
+# Per-file outcomes recorded by FileProcessor.
+HIT_OUTCOMES = ("stat_hit", "blob_hit", "result_hit")
+MISS_OUTCOMES = ("analyzed", "skipped")
+
+class ScanStats:
+    """Timers and counters collected during one scan.
+
+    Per-file phases (stat, read, hashing, analysis) are summed across workers,
+    so with several workers they can exceed the wall time. Safe to update from
+    worker threads; process workers send theirs back via ``state``/``merge``.
+    """
+
+    def __init__(self, slowest: int = DEFAULT_SLOWEST):
+        self.slowest_limit = slowest
+        self.wall_seconds = 0.0
+        self.phases: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        self.languages: Dict[str, Dict] = {}
+        self._slowest = []
+        self.tail_seconds = 0.0
+        self.stragglers = []
+        self._lock = threading.Lock()
+
+    def add_phase(self, phase: str, seconds: float):
+        with self._lock:
+            self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    @contextlib.contextmanager
+    def phase(self, phase: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_phase(phase, time.perf_counter() - start)
+
+    def count(self, counter: str, amount: int = 1):
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def record_file(self, path: str, outcome: str, timings: Dict[str, float], bytes_read: int = 0):
+        language = Path(path).suffix.lower()
+        with self._lock:
+            self.counters[outcome] = self.counters.get(outcome, 0) + 1
+            self.counters["bytes_read"] = self.counters.get("bytes_read", 0) + bytes_read
+            for phase, seconds in timings.items():
+                self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+            if outcome != "analyzed":
+                return
+            seconds = timings.get("analysis", 0.0)
+            totals = self.languages.setdefault(language, {"files": 0, "seconds": 0.0, "bytes": 0})
+            totals["files"] += 1
+            totals["seconds"] += seconds
+            totals["bytes"] += bytes_read
+            self._push_slowest((seconds, path))
+
+    def record_tail(self, seconds: float, stragglers: list):
+        """Time from the first worker going idle to the last file finishing, and the files to blame."""
+        with self._lock:
+            self.tail_seconds = seconds
+            self.stragglers = list(stragglers)
+
+    def _push_slowest(self, item):
+        if len(self._slowest) < self.slowest_limit:
+            heapq.heappush(self._slowest, item)
+        elif self._slowest and item > self._slowest[0]:
+            heapq.heapreplace(self._slowest, item)
+
+    # --- process workers ---
+    def state(self) -> Dict:
+        with self._lock:
+            return {
+                "phases": dict(self.phases),
+                "counters": dict(self.counters),
+                "languages": {language: dict(totals) for language, totals in self.languages.items()},
+                "slowest": list(self._slowest),
+            }
+
+    def merge(self, state: Dict):
+        with self._lock:
+            for phase, seconds in state["phases"].items():
+                self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+            for counter, amount in state["counters"].items():
+                self.counters[counter] = self.counters.get(counter, 0) + amount
+            for language, totals in state["languages"].items():
+                merged = self.languages.setdefault(language, {"files": 0, "seconds": 0.0, "bytes": 0})
+                for key, value in totals.items():
+                    merged[key] += value
+            for seconds, path in state["slowest"]:
+                self._push_slowest((seconds, path))
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            counters = dict(self.counters)
+            return {
+                "wall_seconds": round(self.wall_seconds, 6),
+                "files": {
+                    key: counters.get(key, 0)
+                    for key in ("discovered", *HIT_OUTCOMES, *MISS_OUTCOMES, "error")
+                },
+                "cache": {
+                    "hits": sum(counters.get(key, 0) for key in HIT_OUTCOMES),
+                    "misses": sum(counters.get(key, 0) for key in MISS_OUTCOMES),
+                    "moved": counters.get("moved", 0),
+                },
+                "bytes_read": counters.get("bytes_read", 0),
+                "phases": {phase: round(seconds, 6) for phase, seconds in self.phases.items()},
+                "languages": {
+                    language: {**totals, "seconds": round(totals["seconds"], 6)}
+                    for language, totals in sorted(self.languages.items())
+                },
+                "slowest": [
+                    {"path": path, "seconds": round(seconds, 6)}
+                    for seconds, path in sorted(self._slowest, reverse=True)
+                ],
+                "tail": {
+                    "seconds": round(self.tail_seconds, 6),
+                    "stragglers": [
+                        {
+                            **straggler,
+                            "seconds": round(straggler["seconds"], 6),
+                            "late_seconds": round(straggler["late_seconds"], 6),
+                        }
+                        for straggler in self.stragglers
+                    ],
+                },
+            }
+
+class WorkerProfiler:
+    """Profiles calls to the per-file worker function with cProfile or pyinstrument.
+
+    Each worker thread gets its own profiler; ``dump`` combines them. Python
+    3.12+ allows one active cProfile per process, so concurrent calls that
+    cannot enable theirs run unprofiled (use the inline backend to avoid that).
+    """
+
+    def __init__(self, kind: str = "cprofile"):
+        if kind not in PROFILERS:
+            raise ValueError(f"Unknown profiler {kind!r}; expected one of {', '.join(PROFILERS)}")
+        if kind == "pyinstrument":
+            import pyinstrument  # noqa: F401 - fail early when it is not installed
+        self.kind = kind
+        self._profilers = []
+        self.unprofiled = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _profiler(self):
+        profiler = getattr(self._local, "profiler", None)
+        if profiler is None:
+            if self.kind == "cprofile":
+                import cProfile
+                profiler = cProfile.Profile()
+            else:
+                from pyinstrument import Profiler
+                profiler = Profiler()
+            self._local.profiler = profiler
+            with self._lock:
+                self._profilers.append(profiler)
+        return profiler
+
+    def call(self, func, *args, **kwargs):
+        profiler = self._profiler()
+        if self.kind == "cprofile":
+            try:
+                profiler.enable()
+            except ValueError:  # another profiler is active (Python 3.12+)
+                with self._lock:
+                    self.unprofiled += 1
+                return func(*args, **kwargs)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.disable()
+        profiler.start()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.stop()
+
+    def dump(self, path: Path) -> Optional[Path]:
+        """Write the combined profile (pstats for cProfile, text for pyinstrument)."""
+        with self._lock:
+            profilers = list(self._profilers)
+        if not profilers:
+            return None
+        path = Path(path)
+        if self.kind == "cprofile":
+            import pstats
+            stats = pstats.Stats(profilers[0])
+            for profiler in profilers[1:]:
+                stats.add(profiler)
+            stats.dump_stats(str(path))
+        else:
+            path.write_text("\n".join(profiler.output_text() for profiler in profilers), encoding="utf-8")
+        logger.info("📈 Profile written to: %s", path)
+        if self.unprofiled:
+            logger.warning("⚠️ %s concurrent calls were not profiled; try --backend inline.", self.unprofiled)
+        return path
@@ -0,0 +1,359 @@
+import hashlib
+import json
+import logging
+import threading
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from .language_analyzer import analyzer_fingerprint
+from .records import compact, json_default
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    hash TEXT,
+    entry TEXT,
+    language TEXT,
+    complexity INTEGER,
+    analysis TEXT,
+    analyzer TEXT,
+    digest TEXT
+);
+CREATE INDEX IF NOT EXISTS files_hash ON files(hash);
+CREATE TABLE IF NOT EXISTS functions (path TEXT NOT NULL, name TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS functions_path ON functions(path);
+CREATE INDEX IF NOT EXISTS functions_name ON functions(name);
+CREATE TABLE IF NOT EXISTS classes (
+    path TEXT NOT NULL, name TEXT NOT NULL, docstring TEXT, maturity TEXT, agent_type TEXT
+);
+CREATE INDEX IF NOT EXISTS classes_path ON classes(path);
+CREATE INDEX IF NOT EXISTS classes_name ON classes(name);
+CREATE TABLE IF NOT EXISTS base_classes (path TEXT NOT NULL, class_name TEXT NOT NULL, base TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS base_classes_path ON base_classes(path);
+CREATE INDEX IF NOT EXISTS base_classes_base ON base_classes(base);
+CREATE TABLE IF NOT EXISTS routes (path TEXT NOT NULL, method TEXT, route TEXT, handler TEXT);
+CREATE INDEX IF NOT EXISTS routes_path ON routes(path);
+CREATE INDEX IF NOT EXISTS routes_method ON routes(method);
+"""
+SYMBOL_TABLES = ("functions", "classes", "base_classes", "routes")
+QUERY_KINDS = ("subclasses", "routes", "functions", "classes")
+STORAGE_BACKENDS = ("json", "sqlite")
+# Rows the result cache may serve by hash: current analyzer, and not a metadata-only
+# record left by a size, node or time limit, which only holds for that scan's limits.
+_REUSABLE_ANALYSIS = (
+    "analyzer = ? AND analysis IS NOT NULL AND json_extract(analysis, '$.skipped') IS NULL"
+)
+
+class AnalysisStore:
+    """SQLite storage for the incremental cache, analysis results and symbol tables.
+
+    One ``files`` row per path holds the cache entry and the analysis JSON;
+    functions, classes, base classes and routes are normalized into indexed
+    tables. Every write touches only the rows of files that changed, each file
+    in its own transaction.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        import sqlite3
+
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._entries: Dict[str, Dict] = {}
+        self._digests: Dict[str, str] = {}
+        self.results = StoreResults(self)
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    # --- cache entries ---
+    def load_entries(self) -> Dict[str, Dict]:
+        with self._lock:
+            rows = self.conn.execute("SELECT path, entry, digest FROM files").fetchall()
+        self._entries = {}
+        self._digests = {}
+        for path, entry, digest in rows:
+            if entry:
+                self._entries[path] = json.loads(entry)
+            if digest:
+                self._digests[path] = digest
+        return {path: dict(entry) for path, entry in self._entries.items()}
+
+    def save_entries(self, cache: Dict[str, Dict]) -> int:
+        """Write cache entries that differ from the stored ones and drop vanished paths."""
+        changed = 0
+        with self._lock:
+            for path in set(self._entries) - set(cache):
+                with self.conn:
+                    self._delete(path)
+                self._entries.pop(path, None)
+                self._digests.pop(path, None)
+                changed += 1
+            for path, entry in cache.items():
+                if self._entries.get(path) == entry:
+                    continue
+                with self.conn:
+                    self.conn.execute(
+                        "INSERT INTO files (path, hash, entry) VALUES (?, ?, ?) "
+                        "ON CONFLICT(path) DO UPDATE SET hash = excluded.hash, entry = excluded.entry",
+                        (path, entry.get("hash"), json.dumps(entry)),
+                    )
+                self._entries[path] = dict(entry)
+                changed += 1
+        return changed
+
+    # --- analysis rows ---
+    def report_writer(self) -> "StoreReportWriter":
+        return StoreReportWriter(self)
+
+    def write_analysis(self, path: str, analysis: Dict, file_hash: Optional[str] = None) -> bool:
+        """Upsert ``path``'s analysis row; returns False when it was already current.
+
+        With ``file_hash`` the row is also findable by hash right away, before
+        the scan's cache entries are saved.
+        """
+        text = json.dumps(analysis, sort_keys=True, default=json_default)
+        digest = hashlib.md5((analyzer_fingerprint() + text).encode("utf-8")).hexdigest()
+        with self._lock:
+            if self._digests.get(path) == digest:
+                if file_hash:
+                    with self.conn:
+                        self.conn.execute(
+                            "UPDATE files SET hash = ? WHERE path = ? AND hash IS NOT ?", (file_hash, path, file_hash)
+                        )
+                return False
+            with self.conn:
+                self.conn.execute(
+                    "INSERT INTO files (path, hash, language, complexity, analysis, analyzer, digest) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(path) DO UPDATE SET "
+                    "hash = COALESCE(excluded.hash, files.hash), "
+                    "language = excluded.language, complexity = excluded.complexity, "
+                    "analysis = excluded.analysis, analyzer = excluded.analyzer, digest = excluded.digest",
+                    (
+                        path,
+                        file_hash,
+                        analysis.get("language"),
+                        analysis.get("complexity"),
+                        text,
+                        analyzer_fingerprint(),
+                        digest,
+                    ),
+                )
+                self._replace_symbols(path, analysis)
+            self._digests[path] = digest
+        return True
+
+    def prune_analysis(self, keep: set) -> int:
+        with self._lock:
+            return self.drop_analysis(set(self._digests) - keep)
+
+    def drop_analysis(self, paths) -> int:
+        """Remove the analysis rows (and symbols) of ``paths``; cache entries stay."""
+        with self._lock:
+            stale = [path for path in paths if path in self._digests]
+            for path in stale:
+                with self.conn:
+                    for table in SYMBOL_TABLES:
+                        self.conn.execute(f"DELETE FROM {table} WHERE path = ?", (path,))
+                    if path in self._entries:
+                        self.conn.execute(
+                            "UPDATE files SET analysis = NULL, analyzer = NULL, digest = NULL WHERE path = ?",
+                            (path,),
+                        )
+                    else:
+                        self.conn.execute("DELETE FROM files WHERE path = ?", (path,))
+                del self._digests[path]
+        return len(stale)
+
+    def result_for_hash(self, file_hash: str) -> Optional[Dict]:
+        with self._lock:
+            row = self.conn.execute(
+                f"SELECT analysis FROM files WHERE hash = ? AND {_REUSABLE_ANALYSIS} LIMIT 1",
+                (file_hash, analyzer_fingerprint()),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def result_hashes(self) -> set:
+        """Hashes with a reusable analysis from the current analyzer."""
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT DISTINCT hash FROM files WHERE hash IS NOT NULL AND {_REUSABLE_ANALYSIS}",
+                (analyzer_fingerprint(),),
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def iter_analysis(self) -> Iterator[tuple]:
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT path, analysis FROM files WHERE analysis IS NOT NULL ORDER BY path"
+            ).fetchall()
+        for path, analysis in rows:
+            yield path, json.loads(analysis)
+
+    def _delete(self, path: str):
+        self.conn.execute("DELETE FROM files WHERE path = ?", (path,))
+        for table in SYMBOL_TABLES:
+            self.conn.execute(f"DELETE FROM {table} WHERE path = ?", (path,))
+
+    def _replace_symbols(self, path: str, analysis: Dict):
+        for table in SYMBOL_TABLES:
+            self.conn.execute(f"DELETE FROM {table} WHERE path = ?", (path,))
+        self.conn.executemany(
+            "INSERT INTO functions (path, name) VALUES (?, ?)",
+            [(path, name) for name in analysis.get("functions", [])],
+        )
+        classes = []
+        bases = []
+        for class_name, class_data in analysis.get("classes", {}).items():
+            if not isinstance(class_data, Mapping):
+                classes.append((path, class_name, None, None, None))
+                continue
+            classes.append(
+                (
+                    path,
+                    class_name,
+                    class_data.get("docstring"),
+                    class_data.get("maturity"),
+                    class_data.get("agent_type"),
+                )
+            )
+            bases.extend((path, class_name, base) for base in class_data.get("base_classes", []) if base)
+        self.conn.executemany("INSERT INTO classes VALUES (?, ?, ?, ?, ?)", classes)
+        self.conn.executemany("INSERT INTO base_classes VALUES (?, ?, ?)", bases)
+        self.conn.executemany(
+            "INSERT INTO routes VALUES (?, ?, ?, ?)",
+            [
+                (path, route.get("method"), route.get("path"), route.get("function") or route.get("object"))
+                for route in analysis.get("routes", [])
+            ],
+        )
+
+    # --- queries ---
+    def query(self, kind: str, value: Optional[str] = None) -> List[Dict]:
+        if kind == "subclasses":
+            # Exact name or a dotted suffix (``db.Model``); compared literally, not as a LIKE pattern.
+            sql = (
+                "SELECT path, class_name, base FROM base_classes"
+                " WHERE base = ? OR substr(base, -length(?) - 1) = '.' || ? ORDER BY path"
+            )
+            params = (value, value, value)
+        elif kind == "routes":
+            sql = "SELECT path, method, route, handler FROM routes"
+            params = ()
+            if value:
+                sql += " WHERE method = ?"
+                params = (value.upper(),)
+            sql += " ORDER BY path"
+        elif kind == "functions":
+            sql = "SELECT path, name FROM functions WHERE name = ? ORDER BY path"
+            params = (value,)
+        elif kind == "classes":
+            sql = "SELECT path, name, docstring, maturity, agent_type FROM classes WHERE name = ? ORDER BY path"
+            params = (value,)
+        else:
+            raise ValueError(f"Unknown query {kind!r}; expected one of {', '.join(QUERY_KINDS)}")
+        with self._lock:
+            cursor = self.conn.execute(sql, params)
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+class StoreResults:
+    """Result-cache mapping (hash -> analysis) backed by the store's ``files`` table.
+
+    A new result is held in memory only until its file's row is written, which
+    a streamed report does as each file finishes.
+    """
+
+    def __init__(self, store: AnalysisStore):
+        self.store = store
+        self.pending: Dict[str, Dict] = {}
+        # The scanner's live cache entries (path -> entry), to find a written row's hash.
+        self.entries: Mapping = {}
+
+    def hash_of(self, path: str) -> Optional[str]:
+        entry = self.entries.get(path)
+        return entry.get("hash") if entry else None
+
+    def settle(self, file_hash: Optional[str]):
+        """Forget the pending result for ``file_hash`` once a row holds it."""
+        if file_hash:
+            self.pending.pop(file_hash, None)
+
+    def get(self, file_hash, default=None):
+        if not file_hash:
+            return default
+        result = self.pending.get(file_hash)
+        if result is None:
+            result = compact(self.store.result_for_hash(file_hash))
+        return default if result is None else result
+
+    def __contains__(self, file_hash) -> bool:
+        return self.get(file_hash) is not None
+
+    def hashes(self) -> set:
+        return self.store.result_hashes() | set(self.pending)
+
+    def __getitem__(self, file_hash):
+        result = self.get(file_hash)
+        if result is None:
+            raise KeyError(file_hash)
+        return result
+
+    def __setitem__(self, file_hash, result):
+        self.pending[file_hash] = result
+
+    def update(self, results: Dict):
+        self.pending.update(results)
+
+    def clear_pending(self):
+        self.pending.clear()
+
+class StoreReportWriter:
+    """ReportWriter counterpart that upserts changed analysis rows into the store."""
+
+    def __init__(self, store: AnalysisStore):
+        self.store = store
+        self.path = store.db_path
+        self.count = 0
+        self.changed = 0
+        self._written = set()
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        return False
+
+    def open(self):
+        pass
+
+    def write_entry(self, path: str, analysis: Dict):
+        results = self.store.results
+        file_hash = results.hash_of(path)
+        if self.store.write_analysis(path, analysis, file_hash):
+            self.changed += 1
+        results.settle(file_hash)
+        self._written.add(path)
+        self.count += 1
+
+    def write_entries(self, entries):
+        for path, analysis in entries:
+            self.write_entry(path, analysis)
+
+    def close(self, trailer: Optional[Dict] = None):
+        removed = self.store.prune_analysis(self._written)
+        self.store.results.clear_pending()
+        logger.info("🗄️  Store updated: %s changed, %s removed rows.", self.changed, removed)
+
+    def abort(self):
+        pass
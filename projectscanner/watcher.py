@@ -0,0 +1,174 @@
+import functools
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+
+from .scanner import SOURCE_EXTENSIONS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLL_INTERVAL = 0.5
+DEFAULT_DEBOUNCE = 0.2
+
+class ProjectWatcher:
+    """Keeps a scanner's analysis current by re-analyzing only the files that change.
+
+    Uses filesystem events through ``watchdog`` (inotify on Linux) when it is
+    installed, otherwise polls stat snapshots every ``interval`` seconds.
+    Changes are batched until the tree has been quiet for ``debounce`` seconds,
+    then pushed through ``ProjectScanner.update_files``.
+    """
+
+    def __init__(
+        self,
+        scanner,
+        interval: float = DEFAULT_POLL_INTERVAL,
+        debounce: float = DEFAULT_DEBOUNCE,
+        on_update: Optional[callable] = None,
+        use_events: bool = True,
+    ):
+        self.scanner = scanner
+        self.interval = interval
+        self.debounce = debounce
+        self.on_update = on_update
+        self.use_events = use_events and _observer_class() is not None
+        self._pending: Set[str] = set()
+        self._last_change = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def snapshot(self) -> Dict[str, Tuple[int, int, int]]:
+        """Map each candidate file to its ``(mtime_ns, size, inode)``."""
+        snapshot = {}
+        for file_path in self.scanner.file_processor.walk_files(SOURCE_EXTENSIONS):
+            try:
+                st = os.stat(file_path)
+            except OSError:
+                continue
+            snapshot[str(file_path)] = (st.st_mtime_ns, st.st_size, st.st_ino)
+        return snapshot
+
+    def mark(self, paths):
+        with self._lock:
+            self._pending.update(str(path) for path in paths)
+            self._last_change = time.monotonic()
+
+    def stop(self):
+        self._stop.set()
+
+    def run(self):
+        """Block until ``stop()`` is called, applying each debounced batch of changes."""
+        self._stop.clear()
+        self.scanner.file_processor.additional_ignore_dirs = self.scanner.additional_ignore_dirs
+        observer = None
+        if self.use_events:
+            observer = _observer_class()()
+            observer.schedule(_event_handler(self), str(self.scanner.project_root), recursive=True)
+            observer.start()
+            logger.info("👀 Watching %s (filesystem events)...", self.scanner.project_root)
+        else:
+            previous = self.snapshot()
+            logger.info("👀 Watching %s (polling every %ss)...", self.scanner.project_root, self.interval)
+        tick = min(self.interval, self.debounce) if self.debounce > 0 else self.interval
+        next_poll = time.monotonic() + self.interval
+        try:
+            while not self._stop.wait(tick):
+                if observer is None and time.monotonic() >= next_poll:
+                    current = self.snapshot()
+                    changed = [path for path, sig in current.items() if previous.get(path) != sig]
+                    changed.extend(path for path in previous if path not in current)
+                    if changed:
+                        self.mark(changed)
+                    previous = current
+                    next_poll = time.monotonic() + self.interval
+                batch = self._take_batch()
+                if batch:
+                    self.apply(batch)
+        finally:
+            if observer is not None:
+                observer.stop()
+                observer.join()
+            if not self.scanner.store:
+                self.scanner.save_cache()
+
+    def _take_batch(self) -> Set[str]:
+        with self._lock:
+            if not self._pending or time.monotonic() - self._last_change < self.debounce:
+                return set()
+            batch, self._pending = self._pending, set()
+        return batch
+
+    def apply(self, paths) -> Dict[str, Dict]:
+        """Re-analyze changed files and drop vanished ones among ``paths``."""
+        changed, removed = self._classify(paths)
+        if not changed and not removed:
+            return {}
+        start = time.perf_counter()
+        # JSON caches are large and written on exit; the store writes only changed rows.
+        updated = self.scanner.update_files(changed, removed, save_cache=self.scanner.store is not None)
+        logger.info(
+            "🔄 Updated %s, removed %s files in %.0f ms.",
+            len(updated),
+            len(removed),
+            (time.perf_counter() - start) * 1000,
+        )
+        if self.on_update:
+            self.on_update(updated, removed)
+        return updated
+
+    def _classify(self, paths) -> Tuple[list, list]:
+        scanner = self.scanner
+        processor = scanner.file_processor
+        changed = {}
+        removed = set()
+        for raw_path in paths:
+            path = Path(raw_path)
+            try:
+                rel_path = str(path.relative_to(scanner.project_root))
+            except ValueError:
+                continue
+            if path.is_dir():
+                for file_path in processor.walk_files(SOURCE_EXTENSIONS, start=path):
+                    changed[str(file_path)] = file_path
+            elif path.is_file():
+                if path.suffix.lower() in SOURCE_EXTENSIONS and not processor.should_exclude(path):
+                    changed[str(path)] = path
+            else:
+                prefix = rel_path.rstrip(os.sep) + os.sep
+                with scanner.cache_lock:
+                    removed.update(key for key in scanner.cache if key == rel_path or key.startswith(prefix))
+        return sorted(changed.values()), sorted(removed)
+
+@functools.lru_cache(maxsize=None)
+def _observer_class():
+    """watchdog's Observer, imported on first use, or None when it is not installed."""
+    try:
+        from watchdog.observers import Observer
+    except ImportError:  # pragma: no cover - optional dependency
+        return None
+    return Observer
+
+
+def _event_handler(watcher: ProjectWatcher):
+    from watchdog.events import FileSystemEventHandler
+
+    class EventHandler(FileSystemEventHandler):
+        """Forwards watchdog events to a ProjectWatcher."""
+
+        def on_any_event(self, event):
+            if event.event_type in ("opened", "closed_no_write"):
+                return
+            # A directory's "modified" event only means an entry in it changed
+            # (editors save by renaming a temp file); that entry gets its own
+            # event. Directories are walked only when created or moved.
+            if event.is_directory and event.event_type not in ("created", "moved", "deleted"):
+                return
+            paths = [event.src_path]
+            if getattr(event, "dest_path", ""):
+                paths.append(event.dest_path)
+            watcher.mark(paths)
+
+    return EventHandler()
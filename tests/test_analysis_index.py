@@ -0,0 +1,52 @@
+from projectscanner.analysis_index import AnalysisIndex, LazyNode, load_report
+from projectscanner.report_generator import ReportGenerator
+
+
+ANALYSIS = {
+    "app/server.py": {
+        "language": ".py",
+        "functions": ["serve", "shutdown"],
+        "classes": {"Server": {"methods": ["start"]}},
+        "routes": [{"function": "index", "method": "GET", "path": "/users"}],
+        "complexity": 3,
+    },
+    "web/users.js": {"language": ".js", "functions": ["loadUsers"], "classes": {}, "routes": [], "complexity": 1},
+}
+
+
+def test_lazy_node_creates_children_in_batches():
+    root = LazyNode("root", {f"f{i}.py": {"functions": []} for i in range(10)})
+    assert root.child_count() == 10 and root.children == []
+    assert root.fetch(4) == 4 and root.can_fetch_more()
+    assert root.fetch(100) == 6 and not root.can_fetch_more()
+    assert root.row_of("f7.py") == 7
+    assert root.children[7].preview == "{1 keys}"
+    assert root.children[7].children == []
+
+
+def test_search_prefers_prefix_and_returns_key_paths():
+    index = AnalysisIndex(ANALYSIS)
+    assert index.search("serv") == [
+        ("function", "serve", ("app/server.py", "functions", 0)),
+        ("class", "Server", ("app/server.py", "classes", "Server")),
+        ("file", "app/server.py", ("app/server.py",)),
+    ]
+    assert index.search("get /users") == [("route", "GET /users", ("app/server.py", "routes", 0))]
+    assert [hit[1] for hit in index.search("users", limit=2)] == ["GET /users", "loadUsers"]
+    assert index.search("  ") == []
+
+    node = LazyNode("root", ANALYSIS)
+    for key in ("app/server.py", "functions", 1):
+        node.fetch(node.child_count())
+        node = node.children[node.row_of(key)]
+    assert node.value == "shutdown"
+
+
+def test_load_report_reads_jsonl(tmp_path):
+    generator = ReportGenerator(tmp_path, dict(ANALYSIS), tmp_path, report_format="jsonl")
+    generator.save_report()
+    generator.export_chatgpt_context()
+    assert load_report(tmp_path / generator.analysis_file) == ANALYSIS
+    context = load_report(tmp_path / generator.context_file)
+    assert context["analysis_details"] == ANALYSIS
+    assert context["num_files_analyzed"] == 2
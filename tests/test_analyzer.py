@@ -3,7 +3,9 @@ import json
 import threading
 from pathlib import Path
 
-from projectscanner.language_analyzer import LanguageAnalyzer
+import pytest
+
+from projectscanner.language_analyzer import LanguageAnalyzer, ParserPool
 from projectscanner.file_processor import FileProcessor
 from projectscanner.scanner import ProjectScanner
 
@@ -66,6 +68,41 @@ def test_scanner_maturity_and_agent_type():
     assert scanner._agent_type("D", util) == "Utility"
 
 
+def test_categorization_stays_out_of_the_result_cache(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    project = tmp_path / "proj"
+    project.mkdir()
+    (project / "worker.py").write_text("class Worker:\n    def run(self):\n        pass\n")
+    scanner = ProjectScanner(project_root=project, output_dir=tmp_path)
+    scanner.scan_project(backend="inline")
+    scanner.categorize_agents()
+    scanner.save_cache()
+    assert scanner.analysis["worker.py"]["classes"]["Worker"]["agent_type"] == "ActionAgent"
+
+    rescanner = ProjectScanner(project_root=project, output_dir=tmp_path)
+    rescanner.scan_project(backend="inline")
+    assert rescanner.stats.to_dict()["cache"]["misses"] == 0
+    assert "agent_type" not in rescanner.analysis["worker.py"]["classes"]["Worker"]
+
+
+def test_categorized_update_writes_the_report_once(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    project = tmp_path / "proj"
+    project.mkdir()
+    (project / "worker.py").write_text("class Worker:\n    pass\n")
+    scanner = ProjectScanner(project_root=project, output_dir=tmp_path)
+    scanner.scan_project(backend="inline")
+    scanner.categorize_updates = True
+    (project / "worker.py").write_text("class Worker:\n    def run(self):\n        pass\n")
+    saves = []
+    original = scanner.report_generator.save_report
+    monkeypatch.setattr(scanner.report_generator, "save_report", lambda *a, **k: saves.append(1) or original(*a, **k))
+    scanner.update_files([project / "worker.py"], save_cache=False)
+    assert len(saves) == 1
+    report = json.loads((tmp_path / scanner.report_generator.analysis_file).read_text())
+    assert report["worker.py"]["classes"]["Worker"]["agent_type"] == "ActionAgent"
+
+
 def test_generate_init_and_chatgpt_export(tmp_path):
     pkg = tmp_path / "mypkg"
     pkg.mkdir()
@@ -82,3 +119,88 @@ def test_generate_init_and_chatgpt_export(tmp_path):
     data = json.loads(context_file.read_text())
     assert data["num_files_analyzed"] >= 1
 
+
+
+def test_walk_files_prunes_excluded_dirs(tmp_path):
+    root = tmp_path / "build" / "proj"
+    for rel in [
+        "app/main.py",
+        "node_modules/lib/index.js",
+        "tools/env/site.py",
+        "custom_env/lib/site.py",
+        "vendor/skip.py",
+        ".poetry/venv/x.py",
+    ]:
+        (root / rel).parent.mkdir(parents=True, exist_ok=True)
+        (root / rel).write_text("x = 1\n")
+    (root / "custom_env" / "pyvenv.cfg").write_text("")
+
+    processor = FileProcessor(root, {}, threading.Lock(), {"vendor"})
+    found = {p.relative_to(root).as_posix() for p in processor.walk_files({".py", ".js"})}
+    assert found == {"app/main.py"}
+    assert processor.should_exclude(root / "custom_env" / "lib" / "site.py")
+    assert not processor.should_exclude(root / "app" / "main.py")
+
+
+def test_analyze_python_handles_async_and_nested_scopes():
+    source = '''
+class Api:
+    async def fetch(self):
+        async for item in self.stream():
+            pass
+
+    def build(self):
+        def helper():
+            class Inner:
+                pass
+        return helper
+
+@router.post("/items")
+async def create():
+    pass
+'''
+    result = LanguageAnalyzer().analyze_file(Path('dummy.py'), source)
+    assert result["functions"] == ["create", "fetch", "build", "helper"]
+    assert result["classes"]["Api"]["methods"] == ["fetch", "build"]
+    assert "Inner" in result["classes"]
+    assert result["routes"] == [{"function": "create", "method": "POST", "path": "/items"}]
+    assert result["complexity"] == 7
+
+
+def test_parser_pool_is_lazy_and_per_thread(monkeypatch):
+    loads = []
+    monkeypatch.setattr(ParserPool, "_load_language", staticmethod(lambda name: loads.append(name) or name))
+    monkeypatch.setattr(ParserPool, "_new_parser", staticmethod(lambda language: object()))
+    pool = ParserPool()
+    LanguageAnalyzer(pool).analyze_file(Path("dummy.py"), "x = 1\n")
+    assert loads == []
+
+    main_parser = pool.parser("rust")
+    assert pool.parser("rust") is main_parser
+    other = []
+    worker = threading.Thread(target=lambda: other.append(pool.parser("rust")))
+    worker.start()
+    worker.join()
+    assert other[0] is not main_parser
+    assert loads == ["rust"]
+
+
+def test_javascript_routes_and_deep_nesting():
+    pytest.importorskip("tree_sitter_javascript")
+    source = "app.get('/users', list);\nclass Api { fetch() {} }\n" + "f(" * 3000 + ")" * 3000
+    result = LanguageAnalyzer(ParserPool()).analyze_file(Path("bundle.js"), source)
+    assert result["routes"] == [{"object": "app", "method": "GET", "path": "/users"}]
+    assert result["classes"] == {"Api": ["fetch"]}
+
+
+def test_extraction_query_matches_the_full_walk(monkeypatch):
+    pytest.importorskip("tree_sitter_javascript")
+    from projectscanner import language_analyzer
+
+    source = "import x from 'y';\nexport function f() { require('z'); }\nclass A extends B { m() {} }\n" * 50
+    pool = ParserPool()
+    if pool.query("javascript", language_analyzer._JS_EXTRACTED_NODES) is None:
+        pytest.skip("tree-sitter without QueryCursor")
+    queried = LanguageAnalyzer(pool).analyze_file(Path("app.js"), source)
+    monkeypatch.setattr(ParserPool, "query", lambda self, name, node_types: None)
+    assert LanguageAnalyzer(ParserPool()).analyze_file(Path("app.js"), source) == queried
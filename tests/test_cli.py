@@ -0,0 +1,31 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import projectscanner
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_package_exports_load_lazily():
+    from projectscanner.scanner import ProjectScanner
+
+    assert "ProjectScanner" in dir(projectscanner)
+    assert projectscanner.ProjectScanner is ProjectScanner
+
+
+def test_cli_import_defers_heavy_modules():
+    deferred = ("PyQt5", "tree_sitter", "sqlite3", "multiprocessing", "watchdog", "subprocess", "projectscanner.gui")
+    code = (
+        "import sys, projectscanner, projectscanner.cli; "
+        f"print(','.join(m for m in {deferred!r} if m in sys.modules))"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", code],
+        env={**os.environ, "PYTHONPATH": str(REPO_ROOT)},
+        stdout=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+    assert completed.stdout.strip() == ""
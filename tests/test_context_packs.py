@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+from projectscanner.context_packs import TokenCounter
+from projectscanner.scanner import ProjectScanner
+
+
+def _make_project(root):
+    project = root / "proj"
+    for package in ("core", "api", "docs"):
+        (project / package).mkdir(parents=True)
+    for number in range(6):
+        body = "".join(f"def core_{number}_{i}():\n    pass\n" for i in range(10))
+        (project / "core" / f"m{number}.py").write_text(body)
+    (project / "api" / "views.py").write_text("from core import m0\n\ndef view():\n    pass\n")
+    (project / "docs" / "conf.py").write_text("project = 'x'\n")
+    return project
+
+
+def _read_packs(directory):
+    index = json.loads((directory / "index.json").read_text())
+    packs = [json.loads((directory / entry["file"]).read_text()) for entry in index["packs"]]
+    return index, packs
+
+
+def test_package_packs_fit_budget_and_cover_every_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    project = _make_project(tmp_path)
+    scanner = ProjectScanner(project_root=project)
+    scanner.scan_project()
+
+    index = scanner.export_context_packs(200)
+    directory = project / scanner.report_generator.context_packs_dir
+    index_on_disk, packs = _read_packs(directory)
+    assert index_on_disk == index
+    assert index["measured_files"] == 8
+    assert sorted(path for pack in packs for path in pack["analysis_details"]) == sorted(scanner.analysis)
+    assert index["packs"][0]["title"] == "core"
+    for entry, pack in zip(index["packs"], packs):
+        assert entry["tokens"] <= 200
+        assert len(json.dumps(pack, separators=(",", ":"))) <= 200 * 4
+
+    cached = json.loads((tmp_path / "dependency_cache.json").read_text())
+    assert all(entry["tokens"]["count"] > 0 for entry in cached.values())
+    rescanned = ProjectScanner(project_root=project)
+    rescanned.scan_project()
+    assert rescanned.export_context_packs(200)["measured_files"] == 0
+
+    assert scanner.export_context_packs(10_000, max_packs=1)["packs"][0]["title"] == "core +2 more"
+    assert sorted(p.name for p in directory.iterdir()) == ["index.json", "pack_001.json"]
+
+
+def test_changed_packs_rank_by_import_distance(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    project = _make_project(tmp_path)
+    (project / "core" / "m0.py").write_text("".join(f"def huge_{i}():\n    pass\n" for i in range(300)))
+    scanner = ProjectScanner(project_root=project)
+    scanner.scan_project()
+
+    index = scanner.export_context_packs(10_000, changed=["api/views.py"])
+    assert index["packs"][0]["files"] == ["api/views.py", "core/m0.py"]
+    assert index["packs"][0]["distance"] == {"api/views.py": 0, "core/m0.py": 1}
+
+    index = scanner.export_context_packs(300, changed=["core/m0.py"])
+    assert index["summarized"] == ["core/m0.py"]
+    _, packs = _read_packs(project / scanner.report_generator.context_packs_dir)
+    assert packs[0]["analysis_details"]["core/m0.py"]["truncated"] is True
+
+    with pytest.raises(ValueError):
+        scanner.export_context_packs(10)
+
+
+def test_token_counter_reuses_entry_estimates():
+    entries = {"a.py": {"hash": "h"}}
+    counter = TokenCounter(entries)
+    first = counter.file("a.py", {"functions": ["f"] * 40})
+    assert entries["a.py"]["tokens"] == {"estimator": counter.estimator, "count": first}
+    assert counter.file("a.py", {}) == first and counter.measured == 1
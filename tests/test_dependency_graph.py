@@ -0,0 +1,89 @@
+from projectscanner.dependency_graph import DependencyGraph, lookup_keys
+from projectscanner.language_analyzer import LanguageAnalyzer
+from projectscanner.scanner import ProjectScanner
+
+
+def test_python_imports_extracted():
+    source = "import os, pkg.util as u\nfrom . import sibling\nfrom ..core.models import User\nfrom x import *\n"
+    result = LanguageAnalyzer()._analyze_python(source)
+    assert result["imports"] == ["os", "pkg.util", ".sibling", "..core.models.User", "x"]
+    assert lookup_keys("app/core/views.py", "..core.models.User") == [
+        "py:app.core.models.User",
+        "py:app.core.models",
+        "py:app.core",
+        "py:app",
+    ]
+    assert lookup_keys("web/app.js", "../lib/util.js") == ["js:lib/util"]
+    assert lookup_keys("web/app.js", "react") == []
+    assert lookup_keys("src/net/mod.rs", "super::config::Settings")[:2] == ["rs:src/config/Settings", "rs:src/config"]
+
+
+def test_graph_updates_only_changed_edges():
+    graph = DependencyGraph.from_analysis(
+        {
+            "pkg/__init__.py": {"imports": []},
+            "pkg/models.py": {"imports": ["os"]},
+            "pkg/views.py": {"imports": [".models.User"]},
+            "tests/test_views.py": {"imports": ["pkg.views"]},
+            "web/app.js": {"imports": ["./util"]},
+        }
+    )
+    assert graph.dependents("pkg/models.py") == {"pkg/views.py"}
+    assert graph.affected(["pkg/models.py"]) == ["pkg/models.py", "pkg/views.py", "tests/test_views.py"]
+    assert graph.dependencies("web/app.js") == set()
+
+    assert graph.update("web/util.ts", []) is True
+    assert graph.dependencies("web/app.js") == {"web/util.ts"}
+    assert graph.update("pkg/views.py", [".models.User"]) is False
+
+    graph.update("pkg/views.py", ["json"])
+    assert graph.affected(["pkg/models.py"]) == ["pkg/models.py"]
+    graph.remove("pkg/views.py")
+    assert graph.dependencies("tests/test_views.py") == {"pkg/__init__.py"}
+    assert "pkg/views.py" not in graph.reverse.get("pkg/models.py", set())
+
+
+def test_scanner_graph_follows_scans_and_updates(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    project = tmp_path / "proj"
+    (project / "pkg").mkdir(parents=True)
+    (project / "pkg" / "core.py").write_text("def base():\n    pass\n")
+    (project / "pkg" / "api.py").write_text("from pkg.core import base\n")
+    (project / "test_api.py").write_text("import pkg.api\n")
+    ProjectScanner(project_root=project).scan_project()
+
+    scanner = ProjectScanner(project_root=project)
+    assert scanner.affected_files(["pkg/core.py"]) == ["pkg/api.py", "pkg/core.py", "test_api.py"]
+
+    (project / "pkg" / "api.py").write_text("import json\n")
+    scanner.update_files([project / "pkg" / "api.py"])
+    assert scanner.affected_files(["pkg/core.py"]) == ["pkg/core.py"]
+
+    (project / "test_core.py").write_text("from pkg import core\n")
+    scanner.scan_project()
+    assert scanner.dependency_graph.dependents("pkg/core.py") == {"test_core.py"}
+
+
+def test_imports_resolve_from_package_roots_only():
+    graph = DependencyGraph.from_analysis(
+        {
+            "app.py": {"imports": ["os", "json.decoder", "models", "core.db"]},
+            "tests/fixtures/os.py": {"imports": []},
+            "pkg/json.py": {"imports": []},
+            "pkg/__init__.py": {"imports": []},
+            "pkg/models.py": {"imports": [".json"]},
+            "src/core/__init__.py": {"imports": []},
+            "src/core/db.py": {"imports": []},
+            "tests/test_db.py": {"imports": ["helpers"]},
+            "tests/helpers.py": {"imports": []},
+        }
+    )
+    assert graph.dependencies("app.py") == {"src/core/db.py"}
+    assert graph.dependencies("pkg/models.py") == {"pkg/json.py"}
+    assert graph.dependencies("tests/test_db.py") == {"tests/helpers.py"}
+
+    # Dropping the __init__.py turns pkg into a plain directory, whose modules are then top-level names.
+    graph.remove("pkg/__init__.py")
+    assert graph.dependencies("app.py") == {"src/core/db.py", "pkg/models.py"}
+    graph.update("pkg/__init__.py", [])
+    assert graph.dependencies("app.py") == {"src/core/db.py"}
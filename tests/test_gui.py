@@ -0,0 +1,42 @@
+import os
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+QtCore = pytest.importorskip("PyQt5.QtCore")
+
+from projectscanner import gui  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+
+def test_tree_model_fetches_rows_in_batches(app, monkeypatch):
+    monkeypatch.setattr(gui, "FETCH_BATCH", 2)
+    model = gui.JsonTreeModel()
+    model.set_data({f"f{i}.py": {"functions": ["run"], "complexity": i} for i in range(5)})
+    root = QtCore.QModelIndex()
+    assert model.rowCount(root) == 0 and model.canFetchMore(root)
+
+    model.fetchMore(root)
+    assert model.rowCount(root) == 2
+    model.fetchMore(root)
+    model.fetchMore(root)
+    assert model.rowCount(root) == 5 and not model.canFetchMore(root)
+    assert model.data(model.index(4, 0, root)) == "f4.py"
+    assert model.data(model.index(4, 1, root)) == "{2 keys}"
+
+
+def test_index_for_key_path_fetches_only_the_path(app, monkeypatch):
+    monkeypatch.setattr(gui, "FETCH_BATCH", 2)
+    model = gui.JsonTreeModel()
+    model.set_data({f"f{i}.py": {"functions": ["a", "b", "c"]} for i in range(5)})
+
+    index = model.index_for_key_path(["f3.py", "functions", 2])
+    assert index.isValid()
+    assert (model.data(index), model.data(index.siblingAtColumn(1))) == ("[2]", "c")
+    assert model.data(model.parent(model.parent(index))) == "f3.py"
+    assert model.rowCount(QtCore.QModelIndex()) == 4
+    assert not model.index_for_key_path(["missing.py"]).isValid()
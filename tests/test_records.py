@@ -0,0 +1,51 @@
+import json
+import pickle
+
+from projectscanner.language_analyzer import LanguageAnalyzer
+from projectscanner.records import ClassInfo, FileAnalysis, compact, compact_hook, json_default
+
+SOURCE = '''
+import os
+
+class Worker(base.Handler):
+    """Does work."""
+    def __init__(self):
+        pass
+    def run(self):
+        pass
+
+@app.route("/jobs", methods=["GET", "POST"])
+def jobs():
+    pass
+'''
+
+
+def test_records_serialize_to_the_same_json():
+    result = LanguageAnalyzer()._analyze_python(SOURCE)
+    record = compact(result)
+    assert isinstance(record, FileAnalysis) and isinstance(record["classes"]["Worker"], ClassInfo)
+    assert record == result and record.to_dict() == result
+    assert json.dumps(record, default=json_default) == json.dumps(result)
+    assert record.get("lint") == () and "size" not in record
+
+    metadata = compact({"language": ".py", "functions": [], "classes": {}, "routes": [], "complexity": 0, "size": 9})
+    assert list(metadata) == ["language", "functions", "classes", "routes", "complexity", "size"]
+    assert metadata["size"] == 9 and metadata["classes"] == {}
+
+    cache = json.loads(json.dumps({"results": {"h": result}}), object_hook=compact_hook)
+    assert isinstance(cache["results"]["h"], FileAnalysis) and cache["results"]["h"] == result
+
+
+def test_records_share_interned_names_and_survive_pickling():
+    first = compact(LanguageAnalyzer()._analyze_python(SOURCE))
+    second = compact(LanguageAnalyzer()._analyze_python(SOURCE.replace("Worker", "Other")))
+    assert first["classes"]["Worker"]["methods"][1] is second["classes"]["Other"]["methods"][1]
+    assert first["routes"][0]["method"] is second["routes"][0]["method"]
+
+    copy = pickle.loads(pickle.dumps(first))
+    assert copy == first
+    assert copy["functions"][0] is first["functions"][0]
+
+    worker = first["classes"]["Worker"]
+    worker["maturity"] = "Core Asset"
+    assert first.to_dict()["classes"]["Worker"]["maturity"] == "Core Asset"
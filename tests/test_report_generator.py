@@ -0,0 +1,41 @@
+import json
+
+from projectscanner.report_generator import ReportGenerator, ReportWriter
+
+
+ANALYSIS = {
+    "a.py": {"language": ".py", "functions": ["f"], "classes": {}, "routes": [], "complexity": 1},
+    "b.js": {"language": ".js", "functions": [], "classes": {"C": []}, "routes": [], "complexity": 0},
+}
+
+
+def test_streaming_report_matches_json_dump(tmp_path):
+    generator = ReportGenerator(tmp_path, dict(ANALYSIS), tmp_path)
+    generator.save_report()
+    report = tmp_path / generator.analysis_file
+    assert report.read_text() == json.dumps(ANALYSIS, indent=4) + "\n"
+
+    generator.indent = None
+    generator.export_chatgpt_context()
+    context = json.loads((tmp_path / generator.context_file).read_text())
+    assert context["analysis_details"] == ANALYSIS
+    assert context["num_files_analyzed"] == 2
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted([generator.analysis_file, generator.context_file])
+
+
+def test_jsonl_report_and_aborted_write(tmp_path):
+    generator = ReportGenerator(tmp_path, dict(ANALYSIS), tmp_path, report_format="jsonl")
+    generator.save_report()
+    assert generator.analysis_file.endswith(".jsonl")
+    lines = (tmp_path / generator.analysis_file).read_text().splitlines()
+    assert [json.loads(line)["path"] for line in lines] == ["a.py", "b.js"]
+
+    target = tmp_path / "partial.json"
+    try:
+        with ReportWriter(target) as writer:
+            writer.write_entry("a.py", ANALYSIS["a.py"])
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+    assert not target.exists()
+    assert not list(tmp_path.glob(".partial.json.*"))
@@ -0,0 +1,475 @@
+import json
+import os
+import subprocess
+import threading
+import time
+
+import pytest
+
+from projectscanner.file_processor import FileProcessor
+from projectscanner.language_analyzer import LanguageAnalyzer, analyzer_fingerprint
+from projectscanner.scanner import ProjectScanner
+from projectscanner.watcher import ProjectWatcher
+
+
+def _make_project(root):
+    pkg = root / "proj" / "pkg"
+    pkg.mkdir(parents=True)
+    (pkg / "a.py").write_text("def alpha():\n    pass\n")
+    (pkg / "b.py").write_text("class Beta:\n    def run(self):\n        pass\n")
+    (root / "proj" / "main.py").write_text("for i in range(3):\n    print(i)\n")
+    return root / "proj"
+
+
+@pytest.mark.parametrize("backend", ["inline", "processes"])
+def test_backends_match_thread_results(tmp_path, monkeypatch, backend):
+    monkeypatch.chdir(tmp_path)
+    project = _make_project(tmp_path)
+
+    reference = ProjectScanner(project_root=project, output_dir=tmp_path / "ref")
+    (tmp_path / "ref").mkdir()
+    reference.cache.clear()
+    reference.scan_project(backend="threads")
+
+    (tmp_path / "dependency_cache.json").unlink()
+    scanner = ProjectScanner(project_root=project, output_dir=tmp_path)
+    scanner.scan_project(backend=backend, num_workers=2, chunk_size=2)
+
+    assert scanner.analysis == reference.analysis
+    assert set(scanner.cache) == {"main.py", "pkg/a.py", "pkg/b.py"}
+
+
+def test_unchanged_stat_skips_hashing(tmp_path, monkeypatch):
+    source = tmp_path / "mod.py"
+    source.write_text("def foo():\n    pass\n")
+    os.utime(source, ns=(1_000_000_000, 1_000_000_000))
+    cache = {}
+    processor = FileProcessor(tmp_path, cache, threading.Lock(), set())
+    analyzer = LanguageAnalyzer()
+    assert processor.process_file(source, analyzer) is not None
+    assert cache["mod.py"]["mtime_ns"] == 1_000_000_000
+
+    def fail(*args):
+        raise AssertionError("stat match should not read or hash the file")
+
+    for name in ("read_buffer", "hash_buffer", "hash_file"):
+        monkeypatch.setattr(processor, name, fail)
+    assert processor.process_file(source, analyzer)[1]["functions"] == ("foo",)
+
+    source.write_text("def bar():\n    pass\n")
+    os.utime(source, ns=(2_000_000_000, 2_000_000_000))
+    monkeypatch.undo()
+    result = processor.process_file(source, analyzer)
+    assert result[1]["functions"] == ("bar",)
+
+
+def test_moved_files_detected_from_hash_index(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    project = _make_project(tmp_path)
+    (project / "pkg" / "copy.py").write_text("def alpha():\n    pass\n")
+    scanner = ProjectScanner(project_root=project, output_dir=tmp_path)
+    scanner.scan_project(backend="inline")
+
+    (project / "pkg" / "a.py").rename(project / "moved_a.py")
+    (project / "pkg" / "copy.py").rename(project / "moved_copy.py")
+    (project / "pkg" / "b.py").unlink()
+    rescanner = ProjectScanner(project_root=project, output_dir=tmp_path)
+    rescanner.scan_project(backend="inline")
+
+    assert rescanner.moved_files == {"pkg/a.py": "moved_a.py", "pkg/copy.py": "moved_copy.py"}
+    assert set(rescanner.cache) == {"main.py", "moved_a.py", "moved_copy.py"}
+
+
+def test_unchanged_files_served_from_result_cache(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    project = _make_project(tmp_path)
+    first = ProjectScanner(project_root=project, output_dir=tmp_path)
+    first.scan_project(backend="inline")
+    (project / "main.py").unlink()
+
+    def fail(self, file_path, source_code, *limits):
+        raise AssertionError(f"{file_path} should not be re-parsed")
+
+    monkeypatch.setattr(LanguageAnalyzer, "analyze_file", fail)
+    for path in project.rglob("*.py"):
+        os.utime(path)
+    second = ProjectScanner(project_root=project, output_dir=tmp_path)
+    second.scan_project(backend="inline")
+
+    assert set(second.analysis) == {"pkg/a.py", "pkg/b.py"}
+    assert second.analysis["pkg/a.py"] == first.analysis["pkg/a.py"]
+    assert set(second.result_cache) == {entry["hash"] for entry in second.cache.values()}
+    report = json.loads((tmp_path / second.report_generator.analysis_file).read_text())
+    assert set(report) == {"pkg/a.py", "pkg/b.py"}
+
+
+def test_result_cache_dropped_when_analyzer_changes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "analysis_cache.json").write_text(
+        json.dumps({"analyzer": "stale", "results": {"abc": {"language": ".py"}}})
+    )
+    assert ProjectScanner(project_root=tmp_path).result_cache == {}
+
+
+def test_single_read_paths_and_size_cap(tmp_path, monkeypatch):
+    import projectscanner.file_processor as file_processor
+
+    small = tmp_path / "small.py"
+    small.write_text("def small():\n    pass\n")
+    big = tmp_path / "big.py"
+    big.write_text("x = 1\n" * 100)
+    processor = FileProcessor(tmp_path, {}, threading.Lock(), set(), max_file_size=200)
+    analyzer = LanguageAnalyzer()
+
+    monkeypatch.setattr(file_processor, "MMAP_THRESHOLD", 1)
+    assert processor.process_file(small, analyzer)[1]["functions"] == ("small",)
+    assert processor.cache["small.py"]["hash"] == processor.hash_file(small)
+
+    record = processor.process_file(big, analyzer)[1]
+    assert record["skipped"] == "size limit"
+    assert record["size"] == 600
+
+    # Each cap decides for itself, whatever an earlier cap recorded.
+    os.utime(big, ns=(1_000_000_000, 1_000_000_000))  # old enough for the stat fast path
+    processor.max_file_size = None
+    assert "skipped" not in processor.process_file(big, analyzer)[1]
+    processor.max_file_size = 200
+    assert processor.process_file(big, analyzer)[1]["skipped"] == "size limit"
+    processor.cache.clear()
+    processor.max_file_size = None
+    assert "skipped" not in processor.process_file(big, analyzer)[1]
+
+
+def test_pipelined_scan_analyzes_while_walking(tmp_path, monkeypatch):
+    import time
+
+    monkeypatch.chdir(tmp_path)
+    project = _make_project(tmp_path)
+    scanner = ProjectScanner(project_root=project, output_dir=tmp_path)
+    real_walk = scanner.file_processor.walk_files
+    overlapped = []
+
+    def slow_walk(extensions):
+        for index, path in enumerate(sorted(real_walk(extensions))):
+            if index:
+                deadline = time.monotonic() + 5
+                while not scanner.cache and time.monotonic() < deadline:
+                    time.sleep(0.01)
+                overlapped.append(bool(scanner.cache))
+            yield path
+
+    monkeypatch.setattr(scanner.file_processor, "walk_files", slow_walk)
+    scanner.scan_project(backend="threads", num_workers=2)
+    assert overlapped and all(overlapped)
+    assert set(scanner.analysis) == {"main.py", "pkg/a.py", "pkg/b.py"}
+
+
+def test_iter_scan_streams_results_and_can_stop_early(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    project = _make_project(tmp_path)
+    scanner = ProjectScanner(project_root=project, output_dir=tmp_path)
+    for _ in scanner.iter_scan(backend="threads", num_workers=1):
+        break
+    assert scanner.analysis == {}
+
+    seen = []
+    progress = []
+    scanner.scan_project(
+        progress_callback=progress.append,
+        result_callback=lambda path, analysis: seen.append(path),
+        keep_results=False,
+    )
+    assert sorted(seen) == ["main.py", "pkg/a.py", "pkg/b.py"]
+    assert progress[-1] == 100
+    assert scanner.analysis == {}
+    report = json.loads((tmp_path / scanner.report_generator.analysis_file).read_text())
+    assert sorted(report) == sorted(seen)
+
+
+def test_streamed_scan_keeps_the_result_cache_on_disk(tmp_path, monkeypatch):
+    from projectscanner.spill import SpillResults
+
+    monkeypatch.chdir(tmp_path)
+    project = _make_project(tmp_path)
+    in_memory = ProjectScanner(project_root=project, output_dir=tmp_path)
+    in_memory.scan_project(backend="inline")
+    expected = json.loads((tmp_path / in_memory.report_generator.analysis_file).read_text())
+
+    scanner = ProjectScanner(project_root=project, output_dir=tmp_path, spill_results=True)
+    assert isinstance(scanner.result_cache, SpillResults)
+    assert len(scanner.result_cache) == 3  # indexed from the cache file written above
+    (project / "pkg" / "c.py").write_text("def gamma():\n    pass\n")
+    scanner.scan_project(backend="threads", keep_results=False)
+    assert scanner.analysis == {}
+    assert scanner.stats.to_dict()["cache"]["misses"] == 1
+    report = json.loads((tmp_path / scanner.report_generator.analysis_file).read_text())
+    assert {path: report[path] for path in expected} == expected
+
+    # The file it rewrites is still one JSON document for in-memory scanners.
+    warm = ProjectScanner(project_root=project, output_dir=tmp_path)
+    assert set(warm.result_cache) == {entry["hash"] for entry in warm.cache.values()}
+    assert warm.result_cache[warm.cache["pkg/c.py"]["hash"]]["functions"] == ("gamma",)
+    warm.scan_project(backend="inline")
+    assert warm.stats.to_dict()["cache"]["misses"] == 0
+
+    # Caches written in the older single-line layout are read once and spilled.
+    fingerprint = analyzer_fingerprint()
+    legacy = tmp_path / "legacy_cache.json"
+    record = {"language": ".py", "functions": ["f"], "complexity": 1}
+    legacy.write_text(json.dumps({"analyzer": fingerprint, "results": {"abc": record}}))
+    assert SpillResults(legacy, fingerprint)["abc"]["functions"] == ("f",)
+
+
+def test_abandoned_iter_scan_stops_queued_work(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    project = tmp_path / "proj"
+    project.mkdir()
+    for i in range(40):
+        (project / f"m{i}.py").write_text(f"def f{i}():\n    pass\n")
+    scanner = ProjectScanner(project_root=project, output_dir=tmp_path)
+    processed = []
+    original = scanner._process_file
+
+    def slow_process(file_path, signature=None):
+        processed.append(file_path.name)
+        time.sleep(0.05)
+        return original(file_path, signature)
+
+    monkeypatch.setattr(scanner, "_process_file", slow_process)
+    started = time.perf_counter()
+    for _ in scanner.iter_scan(backend="threads", num_workers=1):
+        break
+    assert time.perf_counter() - started < 1.0
+    time.sleep(0.2)
+    assert len(processed) < 10
+
+
+def test_watcher_reanalyzes_only_changed_files(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    project = _make_project(tmp_path)
+    scanner = ProjectScanner(project_root=project, output_dir=tmp_path)
+    scanner.scan_project(backend="inline")
+
+    batches = []
+    done = threading.Event()
+
+    def on_update(updated, removed):
+        batches.append((set(updated), set(removed)))
+        done.set()
+
+    watcher = ProjectWatcher(scanner, interval=0.05, debounce=0.3, on_update=on_update, use_events=False)
+    processed = []
+    original = scanner._process_file
+    monkeypatch.setattr(scanner, "_process_file", lambda path: processed.append(path.name) or original(path))
+    thread = threading.Thread(target=watcher.run)
+    thread.start()
+    try:
+        time.sleep(0.2)
+        (project / "pkg" / "a.py").write_text("def alpha():\n    pass\n\ndef gamma():\n    pass\n")
+        (project / "main.py").unlink()
+        assert done.wait(5)
+    finally:
+        watcher.stop()
+        thread.join()
+
+    assert batches == [({os.path.join("pkg", "a.py")}, {"main.py"})]
+    assert processed == ["a.py"]
+    assert scanner.analysis[os.path.join("pkg", "a.py")]["functions"] == ("alpha", "gamma")
+    report = json.loads((tmp_path / scanner.report_generator.analysis_file).read_text())
+    assert "main.py" not in report and "gamma" in report[os.path.join("pkg", "a.py")]["functions"]
+    assert "main.py" not in json.loads((tmp_path / "dependency_cache.json").read_text())
+
+
+def test_watch_events_skip_directory_modifications(tmp_path):
+    events = pytest.importorskip("watchdog.events")
+    from projectscanner.watcher import _event_handler
+
+    project = _make_project(tmp_path)
+    scanner = ProjectScanner(project_root=project, output_dir=tmp_path)
+    watcher = ProjectWatcher(scanner, use_events=False)
+    handler = _event_handler(watcher)
+    handler.dispatch(events.DirModifiedEvent(str(project)))
+    handler.dispatch(events.FileModifiedEvent(str(project / "main.py")))
+    handler.dispatch(events.DirCreatedEvent(str(project / "pkg")))
+    assert watcher._pending == {str(project / "main.py"), str(project / "pkg")}
+
+
+def test_git_discovery_reads_only_changed_files(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    project = _make_project(tmp_path)
+    (project / "notes.py").write_text("x = 1\n")
+    (project / ".gitignore").write_text("notes.py\n")
+    git = ["git", "-c", "user.name=t", "-c", "user.email=t@example.com"]
+    try:
+        subprocess.run(git + ["init", "-q"], cwd=project, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        pytest.skip("git is not available")
+    subprocess.run(git + ["add", "-A"], cwd=project, check=True)
+    subprocess.run(git + ["commit", "-q", "-m", "init"], cwd=project, check=True)
+
+    ProjectScanner(project_root=project, output_dir=tmp_path, discovery="git").scan_project(backend="inline")
+
+    subprocess.run(git + ["mv", "pkg/b.py", "pkg/c.py"], cwd=project, check=True)
+    (project / "main.py").write_text("def changed():\n    pass\n")
+    (project / "extra.py").write_text("def untracked():\n    pass\n")
+    scanner = ProjectScanner(project_root=project, output_dir=tmp_path, discovery="git")
+    reads = []
+    original = scanner.file_processor.read_buffer
+    monkeypatch.setattr(scanner.file_processor, "read_buffer", lambda path: reads.append(path.name) or original(path))
+    scanner.scan_project(backend="inline")
+
+    assert sorted(reads) == ["extra.py", "main.py"]
+    assert set(scanner.analysis) == {"main.py", "extra.py", os.path.join("pkg", "a.py"), os.path.join("pkg", "c.py")}
+    assert scanner.moved_files == {os.path.join("pkg", "b.py"): os.path.join("pkg", "c.py")}
+    blob_id = subprocess.run(
+        ["git", "hash-object", "extra.py"], cwd=project, check=True, stdout=subprocess.PIPE, text=True
+    ).stdout.strip()
+    assert scanner.cache["extra.py"]["hash"] == blob_id
+
+
+@pytest.mark.parametrize("backend", ["threads", "processes"])
+def test_scan_stats_count_hits_misses_and_phases(tmp_path, monkeypatch, backend):
+    monkeypatch.chdir(tmp_path)
+    project = _make_project(tmp_path)
+    scanner = ProjectScanner(project_root=project, output_dir=tmp_path)
+    scanner.scan_project(backend=backend, num_workers=2, chunk_size=1)
+    cold = scanner.stats.to_dict()
+
+    assert cold["files"]["discovered"] == 3
+    assert cold["files"]["analyzed"] == 3 and cold["cache"]["hits"] == 0
+    assert cold["bytes_read"] == sum(p.stat().st_size for p in project.rglob("*.py"))
+    assert cold["languages"][".py"]["files"] == 3
+    assert len(cold["slowest"]) == 3
+    for phase in ("discovery", "stat", "read", "hashing", "analysis", "report write", "cache save"):
+        assert phase in cold["phases"]
+
+    (project / "pkg" / "b.py").rename(project / "moved.py")
+    scanner.scan_project(backend=backend, num_workers=2, chunk_size=1)
+    warm = scanner.stats.to_dict()
+    assert warm["cache"] == {"hits": 3, "misses": 0, "moved": 1}
+
+
+def test_shard_fragments_merge_order_independently(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    project = _make_project(tmp_path)
+    for i in range(6):
+        (project / f"extra_{i}.py").write_text(f"def extra_{i}():\n    pass\n")
+    reference = ProjectScanner(project_root=project, output_dir=tmp_path)
+    reference.scan_project(backend="inline")
+
+    fragments = []
+    for index in (1, 2, 3):
+        shard = ProjectScanner(project_root=project, output_dir=tmp_path, shard=(index, 3))
+        shard.scan_project(backend="inline")
+        fragments.append(shard.fragment_file)
+    assert sum(len(json.loads(f.read_text())["files"]) for f in fragments) == len(reference.analysis)
+
+    reports = []
+    for order in (fragments, fragments[::-1]):
+        merged = ProjectScanner(project_root=project, output_dir=tmp_path / "merged")
+        (tmp_path / "merged").mkdir(exist_ok=True)
+        summary = merged.merge_shards(order)
+        assert merged.analysis == reference.analysis
+        reports.append((summary["digest"], (tmp_path / "merged" / merged.report_generator.analysis_file).read_bytes()))
+    assert reports[0] == reports[1]
+
+    with pytest.raises(ValueError, match="Missing fragments"):
+        ProjectScanner(project_root=project, output_dir=tmp_path).merge_shards(fragments[:2])
+    fragment = json.loads(fragments[0].read_text())
+    next(iter(fragment["files"].values()))["analysis"]["complexity"] += 1
+    fragments[0].write_text(json.dumps(fragment))
+    with pytest.raises(ValueError, match="digest mismatch"):
+        ProjectScanner(project_root=project, output_dir=tmp_path).merge_shards(fragments)
+
+
+def test_thread_scheduler_runs_largest_first_and_reports_stragglers(tmp_path, monkeypatch):
+    from projectscanner import bots
+
+    monkeypatch.chdir(tmp_path)
+    project = tmp_path / "proj"
+    project.mkdir()
+    for name, functions in (("small.py", 1), ("large.py", 2000), ("medium.py", 800), ("tiny.py", 0)):
+        (project / name).write_text("".join(f"def f{i}():\n    pass\n" for i in range(functions)) or "x = 1\n")
+    scanner = ProjectScanner(project_root=project, output_dir=tmp_path)
+    processed = []
+    original = scanner._process_file
+
+    def record(path, signature=None):
+        processed.append(path.name)
+        return original(path, signature)
+
+    monkeypatch.setattr(scanner, "_process_file", record)
+    scanner.scan_project(backend="threads", num_workers=1, pipelined=False)
+    assert processed == ["large.py", "medium.py", "small.py", "tiny.py"]
+
+    monkeypatch.setattr(bots, "STRAGGLER_SECONDS", 0.1)
+    (project / "large.py").write_text("def changed():\n    pass\n" * 2000)
+
+    def slow(path, signature=None):
+        if path.name == "large.py":
+            time.sleep(0.4)
+        return original(path, signature)
+
+    monkeypatch.setattr(scanner, "_process_file", slow)
+    scanner.cache.clear()
+    scanner.scan_project(backend="threads", num_workers=2)
+    tail = scanner.stats.to_dict()["tail"]
+    assert [straggler["path"] for straggler in tail["stragglers"]] == ["large.py"]
+    assert tail["seconds"] >= 0.1 and tail["stragglers"][0]["size"] > bots.SMALL_FILE_BYTES
+
+
+def test_files_over_the_analysis_limits_get_flagged_metadata_records(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    project = _make_project(tmp_path)
+    (project / "table.py").write_text("TABLE = [" + ", ".join(str(i) for i in range(5000)) + "]\n")
+    scanner = ProjectScanner(project_root=project, output_dir=tmp_path, max_ast_nodes=2000)
+    scanner.scan_project(backend="inline")
+    assert scanner.analysis["table.py"]["skipped"] == "node limit"
+    assert scanner.analysis["table.py"]["size"] == (project / "table.py").stat().st_size
+    assert "skipped" not in scanner.analysis["main.py"]
+    report = json.loads((tmp_path / scanner.report_generator.analysis_file).read_text())
+    assert report["table.py"]["skipped"] == "node limit"
+
+    # Limit records only hold for the limits of their scan; a looser one analyzes the file.
+    scanner = ProjectScanner(project_root=project, output_dir=tmp_path)
+    scanner.scan_project(backend="inline")
+    assert "skipped" not in scanner.analysis["table.py"]
+    assert scanner.stats.to_dict()["cache"]["misses"] == 1
+
+    for cache_file in ("dependency_cache.json", "analysis_cache.json"):
+        (tmp_path / cache_file).unlink()
+    scanner = ProjectScanner(project_root=project, output_dir=tmp_path, max_parse_seconds=1e-9)
+    scanner.scan_project(backend="inline")
+    assert {result.get("skipped") for result in scanner.analysis.values()} == {"time limit"}
+    (tmp_path / "dependency_cache.json").unlink()
+    scanner = ProjectScanner(project_root=project, output_dir=tmp_path, max_parse_seconds=0)
+    scanner.scan_project(backend="inline")
+    assert not any("skipped" in result for result in scanner.analysis.values())
+
+
+def test_process_watchdog_replaces_workers_stuck_on_a_file(tmp_path, monkeypatch):
+    import multiprocessing
+
+    from projectscanner import bots
+
+    if multiprocessing.get_start_method() != "fork":
+        pytest.skip("the stalling analyzer is patched into forked workers")
+    monkeypatch.chdir(tmp_path)
+    project = _make_project(tmp_path)
+    (project / "stuck.py").write_text("x = 1\n")
+    original = LanguageAnalyzer.analyze_file
+
+    def stall(self, path, source, *limits):
+        if path.name == "stuck.py":
+            time.sleep(60)  # stands in for a parser that never checks the clock
+        return original(self, path, source, *limits)
+
+    monkeypatch.setattr(LanguageAnalyzer, "analyze_file", stall)
+    monkeypatch.setattr(bots, "WATCHDOG_GRACE_SECONDS", 0.0)
+    scanner = ProjectScanner(project_root=project, output_dir=tmp_path, max_parse_seconds=0.5)
+    started = time.monotonic()
+    scanner.scan_project(backend="processes", num_workers=2, chunk_size=2)
+    assert time.monotonic() - started < 30
+    assert scanner.analysis["stuck.py"]["skipped"] == "time limit"
+    assert scanner.analysis["pkg/a.py"]["functions"] == ("alpha",)
+    assert set(scanner.analysis) == {"main.py", "pkg/a.py", "pkg/b.py", "stuck.py"}
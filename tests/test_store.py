@@ -0,0 +1,84 @@
+import os
+
+from projectscanner.language_analyzer import LanguageAnalyzer
+from projectscanner.scanner import ProjectScanner
+from projectscanner.store import AnalysisStore
+
+
+def _write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+
+
+def test_sqlite_store_queries_and_incremental_updates(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    project = tmp_path / "proj"
+    _write(project / "models.py", "class User(db.Model):\n    pass\n\nclass Admin(User):\n    pass\n")
+    _write(
+        project / "views.py",
+        "@app.route('/users', methods=['POST'])\ndef create():\n    pass\n",
+    )
+    _write(project / "util.py", "def helper():\n    pass\n")
+    scanner = ProjectScanner(project_root=project, output_dir=tmp_path, storage="sqlite")
+    scanner.scan_project(backend="inline")
+    assert not (tmp_path / "dependency_cache.json").exists()
+
+    store = AnalysisStore(tmp_path / scanner.report_generator.store_file)
+    assert [row["class_name"] for row in store.query("subclasses", "Model")] == ["User"]
+    assert [row["class_name"] for row in store.query("subclasses", "User")] == ["Admin"]
+    assert store.query("subclasses", "Mod_l") == []
+    assert store.query("subclasses", "%") == []
+    assert store.query("routes", "post") == [
+        {"path": "views.py", "method": "POST", "route": "/users", "handler": "create"}
+    ]
+
+    _write(project / "views.py", "def index():\n    pass\n")
+    (project / "models.py").unlink()
+    parsed = []
+    original = LanguageAnalyzer.analyze_file
+    monkeypatch.setattr(
+        LanguageAnalyzer,
+        "analyze_file",
+        lambda self, path, source, *limits: parsed.append(path.name) or original(self, path, source, *limits),
+    )
+    rescanner = ProjectScanner(project_root=project, output_dir=tmp_path, storage="sqlite")
+    rescanner.scan_project(backend="inline")
+    assert parsed == ["views.py"]
+    assert store.query("routes") == []
+    assert store.query("subclasses", "Model") == []
+    assert [row["path"] for row in store.query("functions", "index")] == ["views.py"]
+
+
+def test_store_does_not_serve_limit_records_by_hash(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    project = tmp_path / "proj"
+    _write(project / "table.py", "TABLE = [" + ", ".join(str(i) for i in range(5000)) + "]\n")
+    scanner = ProjectScanner(project_root=project, output_dir=tmp_path, storage="sqlite", max_ast_nodes=2000)
+    scanner.scan_project(backend="inline")
+    assert scanner.analysis["table.py"]["skipped"] == "node limit"
+    assert scanner.store.result_hashes() == set()
+
+    rescanner = ProjectScanner(project_root=project, output_dir=tmp_path, storage="sqlite", max_ast_nodes=0)
+    rescanner.scan_project(backend="inline")
+    assert "skipped" not in rescanner.analysis["table.py"]
+    assert rescanner.store.result_hashes() == {rescanner.cache["table.py"]["hash"]}
+
+
+def test_streamed_store_scan_does_not_hold_pending_results(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    project = tmp_path / "proj"
+    for name in ("a", "b", "c"):
+        _write(project / f"{name}.py", f"def {name}():\n    pass\n")
+    _write(project / "copy.py", "def a():\n    pass\n")
+    scanner = ProjectScanner(project_root=project, output_dir=tmp_path, storage="sqlite")
+    results = scanner.store.results
+    held = []
+    scanner.scan_project(
+        backend="inline",
+        keep_results=False,
+        result_callback=lambda path, analysis: held.append(results.hash_of(path) in results.pending),
+    )
+    assert held == [False] * 4  # each written row releases its result
+    assert scanner.stats.to_dict()["cache"]["misses"] == 3  # copy.py found a.py's row by hash
+    assert [row["path"] for row in scanner.store.query("functions", "a")] == ["a.py", "copy.py"]